@@ -0,0 +1,165 @@
+"""
+Admission control for tool calls.
+
+At most max_in_flight calls run at once. Further calls wait in a bounded
+FIFO queue for at most queue_timeout seconds. A call that finds the queue
+full, or whose deadline passes while queued, is shed immediately with
+Overloaded, so that a slow backend turns into fast, explicit rejections
+instead of unbounded in-flight work.
+"""
+
+import asyncio
+import os
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+ENV_MAX_IN_FLIGHT = "GATEWAY_MAX_IN_FLIGHT"
+ENV_MAX_QUEUE = "GATEWAY_MAX_QUEUE"
+ENV_QUEUE_TIMEOUT = "GATEWAY_QUEUE_TIMEOUT"
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_MAX_QUEUE = 256
+DEFAULT_QUEUE_TIMEOUT = 2.0  # Seconds a call may wait for a slot
+
+
+class Overloaded(Exception):
+    """A call was shed by admission control."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    In-flight limit with a bounded, deadline-aware wait queue.
+
+    Usage:
+        admission = AdmissionController(max_in_flight=64, max_queue=256)
+        async with admission.admit():
+            ...  # Raises Overloaded instead of entering when saturated
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+    ) -> None:
+        """
+        Initialize the controller.
+
+        Args:
+            max_in_flight: Calls allowed to run concurrently
+            max_queue: Calls allowed to wait for a slot (0 sheds immediately)
+            queue_timeout: Seconds a queued call waits before it is shed
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.max_queue_depth = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls currently waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """
+        Take an execution slot, waiting in the queue if needed.
+
+        Raises:
+            Overloaded: If the queue is full or the queue deadline passes
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.shed_queue_full += 1
+            raise Overloaded(
+                f"Gateway overloaded: {self.in_flight} in flight, {len(self._waiters)} queued",
+                retry_after=self.queue_timeout,
+            )
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not _handed_over(waiter):
+                self._discard(waiter)
+                self.shed_deadline += 1
+                raise Overloaded(
+                    f"Gateway overloaded: no slot within {self.queue_timeout:.2f}s",
+                    retry_after=self.queue_timeout,
+                ) from None
+            # The slot arrived right at the deadline: keep it
+        except BaseException:
+            if _handed_over(waiter):
+                self.release()  # Cancelled after being handed a slot: pass it on
+            else:
+                self._discard(waiter)
+            raise
+        self.admitted += 1  # Slot handed over by release()
+
+    def _discard(self, waiter: "asyncio.Future[None]") -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass  # Already popped by release()
+
+    def release(self) -> None:
+        """Give the slot to the oldest live waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Current load, limits and shed counts."""
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_deadline": self.shed_deadline,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+        }
+
+
+def _handed_over(waiter: "asyncio.Future[None]") -> bool:
+    return waiter.done() and not waiter.cancelled()
+
+
+def create_admission_controller() -> AdmissionController:
+    """Build the controller from GATEWAY_MAX_IN_FLIGHT / _MAX_QUEUE / _QUEUE_TIMEOUT."""
+    return AdmissionController(
+        max_in_flight=int(os.getenv(ENV_MAX_IN_FLIGHT, str(DEFAULT_MAX_IN_FLIGHT))),
+        max_queue=int(os.getenv(ENV_MAX_QUEUE, str(DEFAULT_MAX_QUEUE))),
+        queue_timeout=float(os.getenv(ENV_QUEUE_TIMEOUT, str(DEFAULT_QUEUE_TIMEOUT))),
+    )
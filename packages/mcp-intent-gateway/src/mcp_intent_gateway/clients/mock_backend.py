@@ -1,15 +1,24 @@
 """Mock backend client for calling the backend API."""
 
+import asyncio
 import logging
 import os
+import time
+import zlib
 from typing import Any
 
 import httpx
 from pydantic import BaseModel, Field
 
+from ..idempotency import IDEMPOTENCY_HEADER
+from ..tracing import TRACEPARENT, start_span
+from .resilience import BreakerState, CircuitBreaker, LatencyTracker
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_BACKEND_URL = "http://localhost:3001"
+HEALTH_PROBE_INTERVAL = 10.0  # Seconds between background health probes
+HEALTH_PROBE_TIMEOUT = 2.0
 
 
 class Child(BaseModel):
@@ -26,6 +35,10 @@ class EventResponse(BaseModel):
     message: str = Field(..., description="Response message")
     mock_id: str | None = Field(default=None, description="Mock event ID")
     timestamp: str | None = Field(default=None, description="Event timestamp")
+    retryable: bool = Field(
+        default=False,
+        description="Whether a failed request may succeed if retried",
+    )
 
 
 class MockBackendClient:
@@ -35,17 +48,55 @@ class MockBackendClient:
     This client provides methods to:
     - Get child by firstname (mocked - returns deterministic ID)
     - Add events for a child
+
+    Calls to add_event are guarded by a circuit breaker (fail fast while the
+    backend is down) and use a timeout derived from recent latencies.
+    health_check returns the status cached by a background prober. Requests
+    share one HTTP client (connection pool) per event loop.
     """
 
-    def __init__(self, base_url: str | None = None) -> None:
+    def __init__(
+        self,
+        base_url: str | None = None,
+        breaker: CircuitBreaker | None = None,
+        latencies: LatencyTracker | None = None,
+        probe_interval: float = HEALTH_PROBE_INTERVAL,
+    ) -> None:
         """
         Initialize the mock backend client.
 
         Args:
             base_url: Base URL for the backend API. Defaults to BACKEND_URL env var
                       or http://localhost:3001
+            breaker: Circuit breaker for add_event (default: 5 failures, 30s reset)
+            latencies: Latency tracker driving the add_event timeout
+            probe_interval: Seconds between background health probes
         """
         self.base_url = base_url or os.getenv("BACKEND_URL", DEFAULT_BACKEND_URL)
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = latencies or LatencyTracker()
+        self.probe_interval = probe_interval
+        self._healthy: bool | None = None
+        self._checked_at: float | None = None
+        self._probe_task: asyncio.Task[None] | None = None
+        self._http_client: httpx.AsyncClient | None = None
+        self._http_loop: asyncio.AbstractEventLoop | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        """The shared HTTP client, (re)created for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._http_client is None or self._http_loop is not loop:
+            # Connections are bound to their loop; one from a closed loop is dropped
+            self._http_client = httpx.AsyncClient()
+            self._http_loop = loop
+        return self._http_client
+
+    async def aclose(self) -> None:
+        """Stop the health prober and close the shared HTTP client."""
+        await self.stop_health_probe()
+        if self._http_client is not None and self._http_loop is asyncio.get_running_loop():
+            await self._http_client.aclose()
+        self._http_client = self._http_loop = None
 
     async def get_child_by_firstname(self, firstname: str) -> Child | None:
         """
@@ -62,9 +113,10 @@ class MockBackendClient:
             Child object with id and firstname, or None if not found
         """
         # Mock implementation - generate deterministic ID from firstname
-        # This ensures same name always returns same ID (deterministic)
-        fake_id = abs(hash(firstname)) % 1000
-        logger.debug(f"Mock: Resolved child '{firstname}' to ID {fake_id}")
+        # This ensures same name always returns same ID (deterministic).
+        # crc32 rather than hash(): str hashing is salted per process.
+        fake_id = zlib.crc32(firstname.encode("utf-8")) % 1000
+        logger.debug("Mock: Resolved child '%s' to ID %s", firstname, fake_id)
         return Child(id=fake_id, firstname=firstname)
 
     async def add_event(
@@ -72,6 +124,9 @@ class MockBackendClient:
         child_id: int,
         action: str,
         properties: dict[str, Any],
+        idempotency_key: str | None = None,
+        timestamp: str | None = None,
+        traceparent: str | None = None,
     ) -> EventResponse:
         """
         Add an event for a child.
@@ -82,62 +137,180 @@ class MockBackendClient:
             child_id: The child's ID
             action: The action type (e.g., 'record_meal')
             properties: Event properties
+            idempotency_key: Sent as the Idempotency-Key header, so the backend
+                             can deduplicate retries
+            timestamp: Original event time (ISO 8601), for delayed delivery
+            traceparent: Calling span; the request is traced as its child and
+                         sent with a traceparent header
 
         Returns:
             EventResponse with success status and details
         """
+        if not self.breaker.allow_request():
+            return EventResponse(
+                success=False,
+                message="Backend circuit open, failing fast",
+                retryable=True,
+            )
+
+        started = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/child/{child_id}/add_event",
-                    json={"action": action, "properties": properties},
+            with start_span(
+                "backend.add_event", traceparent, child_id=child_id, action=action
+            ) as span:
+                response = await self._post_event(
+                    child_id,
+                    action,
+                    properties,
+                    idempotency_key,
+                    timestamp,
+                    self.latencies.timeout(),
+                    span.traceparent,
                 )
+                span.attributes["result"] = response.message
+                if not response.success:
+                    span.status = "error"
+        except BaseException:
+            # Cancelled without an outcome: free the half-open trial for the next request
+            self.breaker.release_trial()
+            raise
+        if response.success:
+            self.latencies.record(time.perf_counter() - started)
+            self.breaker.record_success()
+        elif response.retryable:
+            self.breaker.record_failure()
+            if self.breaker.state == BreakerState.OPEN:
+                logger.warning("Backend circuit open after: %s", response.message)
+        else:
+            self.breaker.record_success()  # The backend answered; the request was bad
+        return response
 
-                if response.status_code == 200:
-                    data = response.json()
-                    return EventResponse(
-                        success=True,
-                        message=data.get("message", "Event created"),
-                        mock_id=data.get("mockId"),
-                        timestamp=data.get("timestamp"),
-                    )
-                else:
-                    # Handle error response
-                    return EventResponse(
-                        success=False,
-                        message=f"Backend error: {response.status_code}",
-                    )
+    async def _post_event(
+        self,
+        child_id: int,
+        action: str,
+        properties: dict[str, Any],
+        idempotency_key: str | None,
+        timestamp: str | None,
+        timeout: float,
+        traceparent: str | None = None,
+    ) -> EventResponse:
+        headers = {IDEMPOTENCY_HEADER: idempotency_key} if idempotency_key else {}
+        if traceparent:
+            headers[TRACEPARENT] = traceparent
+        body: dict[str, Any] = {"action": action, "properties": properties}
+        if timestamp:
+            body["timestamp"] = timestamp
+        try:
+            response = await self._http().post(
+                f"{self.base_url}/child/{child_id}/add_event",
+                json=body,
+                headers=headers,
+                timeout=timeout,
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                return EventResponse(
+                    success=True,
+                    message=data.get("message", "Event created"),
+                    mock_id=data.get("mockId"),
+                    timestamp=data.get("timestamp"),
+                )
+            else:
+                # Handle error response
+                return EventResponse(
+                    success=False,
+                    message=f"Backend error: {response.status_code}",
+                    retryable=response.status_code == 429 or response.status_code >= 500,
+                )
 
         except httpx.ConnectError as e:
-            logger.warning(f"Cannot connect to backend at {self.base_url}: {e}")
-            # Return mock success for development when backend is not running
+            logger.warning("Cannot connect to backend at %s: %s", self.base_url, e)
             return EventResponse(
-                success=True,
-                message=f"Mock event created (backend unavailable) for child {child_id}",
-                mock_id=f"mock-{child_id}-{hash(action) % 10000}",
+                success=False,
+                message=f"Backend unavailable at {self.base_url}",
+                retryable=True,
             )
         except httpx.TimeoutException:
             return EventResponse(
                 success=False,
-                message="Backend request timed out",
+                message=f"Backend request timed out after {timeout:.2f}s",
+                retryable=True,
             )
         except Exception as e:
-            logger.error(f"Unexpected error calling backend: {e}")
+            logger.error("Unexpected error calling backend: %s", e)
             return EventResponse(
                 success=False,
                 message=f"Unexpected error: {str(e)}",
+                retryable=True,
             )
 
-    async def health_check(self) -> bool:
+    async def probe(self) -> bool:
         """
-        Check if the backend is healthy.
+        Call GET /health now and cache the result.
+
+        A successful probe lets an open circuit breaker try a request early.
 
         Returns:
             True if backend is reachable and healthy, False otherwise
         """
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/health")
-                return response.status_code == 200
+            response = await self._http().get(
+                f"{self.base_url}/health", timeout=HEALTH_PROBE_TIMEOUT
+            )
+            healthy = response.status_code == 200
         except Exception:
-            return False
+            healthy = False
+
+        self._healthy, self._checked_at = healthy, time.time()
+        if healthy:
+            self.breaker.half_open()
+        return healthy
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await self.probe()
+
+    def start_health_probe(self) -> None:
+        """Start the background prober in the running event loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        task = self._probe_task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._probe_task = loop.create_task(self._probe_loop(), name="backend-health-probe")
+
+    async def stop_health_probe(self) -> None:
+        """Stop the background prober."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._probe_task = None
+
+    async def health_check(self) -> bool:
+        """
+        Check if the backend is healthy.
+
+        Returns the status cached by the background prober; only the first
+        call probes the backend, and starts the prober.
+
+        Returns:
+            True if backend is reachable and healthy, False otherwise
+        """
+        self.start_health_probe()
+        if self._healthy is None:
+            return await self.probe()
+        return self._healthy
+
+    def health_report(self) -> dict[str, Any]:
+        """Cached health, circuit breaker state and add_event latency percentiles."""
+        return {
+            "available": self._healthy,
+            "checked_at": self._checked_at,
+            "circuit_breaker": self.breaker.snapshot(),
+            "latency": self.latencies.snapshot(),
+        }
@@ -0,0 +1,173 @@
+"""Latency tracking, adaptive timeouts and a circuit breaker for backend calls."""
+
+import math
+import time
+from collections import deque
+from enum import Enum
+from typing import Any
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent request latencies.
+
+    The adaptive timeout is a multiple of a high percentile of recent
+    successful requests, clamped to [min_timeout, max_timeout]. Until
+    enough samples exist, max_timeout is used.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        percentile: float = 99.0,
+        multiplier: float = 3.0,
+        min_timeout: float = 0.5,
+        max_timeout: float = 30.0,
+        min_samples: int = 20,
+    ) -> None:
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Number of recent latencies kept
+            percentile: Percentile the timeout is derived from
+            multiplier: Headroom applied to that percentile
+            min_timeout: Lower bound for the timeout (seconds)
+            max_timeout: Upper bound, and the timeout before min_samples
+            min_samples: Samples needed before the timeout adapts
+        """
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a successful request."""
+        self._samples.append(seconds)
+
+    def quantile(self, percentile: float) -> float | None:
+        """Nearest-rank percentile of the window (None if empty)."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, math.ceil(percentile / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+    def timeout(self) -> float:
+        """Current request timeout (seconds)."""
+        if len(self._samples) < self.min_samples:
+            return self.max_timeout
+        base = self.quantile(self.percentile) or 0.0
+        return min(self.max_timeout, max(self.min_timeout, base * self.multiplier))
+
+    def snapshot(self) -> dict[str, Any]:
+        """Latency percentiles (milliseconds) and the current timeout."""
+
+        def ms(value: float | None) -> float | None:
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "samples": len(self._samples),
+            "p50_ms": ms(self.quantile(50)),
+            "p95_ms": ms(self.quantile(95)),
+            "p99_ms": ms(self.quantile(99)),
+            "timeout_ms": ms(self.timeout()),
+        }
+
+
+class BreakerState(str, Enum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"  # Requests flow; failures are counted
+    OPEN = "open"  # Requests fail fast until reset_timeout elapses
+    HALF_OPEN = "half_open"  # One trial request decides whether to close
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After failure_threshold consecutive failures the breaker opens and
+    requests fail immediately. After reset_timeout one trial request is let
+    through (half-open): success closes the breaker, failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds to stay open before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> BreakerState:
+        """Current state (an expired OPEN state reads as HALF_OPEN)."""
+        if (
+            self._state == BreakerState.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = BreakerState.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now (claims the half-open trial)."""
+        state = self.state
+        if state == BreakerState.CLOSED:
+            return True
+        if state == BreakerState.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """A request succeeded: close the breaker."""
+        self.consecutive_failures = 0
+        self._state = BreakerState.CLOSED
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """A request failed: open the breaker at the threshold or after a failed trial."""
+        self.consecutive_failures += 1
+        if (
+            self._state == BreakerState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self._state != BreakerState.OPEN:
+                self.times_opened += 1
+            self._state = BreakerState.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """A request ended without an outcome (e.g. cancelled): allow another trial."""
+        if self._state == BreakerState.HALF_OPEN:
+            self._trial_in_flight = False
+
+    def half_open(self) -> None:
+        """Allow a trial request now (e.g. a health probe saw the backend recover)."""
+        if self._state == BreakerState.OPEN:
+            self._state = BreakerState.HALF_OPEN
+            self._trial_in_flight = False
+
+    def snapshot(self) -> dict[str, Any]:
+        """State and counters."""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
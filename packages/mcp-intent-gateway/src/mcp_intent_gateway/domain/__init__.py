@@ -8,6 +8,7 @@ from .constants import (
     Domain,
     IntentionType,
 )
+from .tool_schema import build_openai_tool_schema
 
 __all__ = [
     "Domain",
@@ -16,4 +17,5 @@ __all__ = [
     "DIMENSION_VALUES",
     "DIMENSION_TO_DOMAIN",
     "DIMENSION_DESCRIPTIONS",
+    "build_openai_tool_schema",
 ]
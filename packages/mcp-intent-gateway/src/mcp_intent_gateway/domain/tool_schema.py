@@ -0,0 +1,90 @@
+"""
+LLM tool schema generated from the domain constants.
+
+The MCP signature of process_canonical_fact takes dimension and value as
+free strings, so an LLM can emit pairs the gateway then rejects with
+INVALID_DIMENSION / INVALID_VALUE. The schema built here constrains the
+pair at generation time instead: `fact` is an anyOf with one variant per
+dimension, each carrying its own value enum.
+
+The schema is OpenAI strict-mode compatible (every property required,
+additionalProperties false, no defaults, no oneOf). Clients flatten `fact`
+back into dimension/value before calling process_canonical_fact.
+"""
+
+from typing import Any
+
+from .constants import DIMENSION_DESCRIPTIONS, DIMENSION_VALUES, Dimension
+
+TOOL_NAME = "process_canonical_fact"
+
+TOOL_DESCRIPTION = (
+    "Record a canonical fact extracted from natural language. "
+    "Emit one call per fact; pick the dimension variant that matches the utterance."
+)
+
+
+def build_fact_variant(dimension: Dimension) -> dict[str, Any]:
+    """
+    Build the schema of one dimension/value pair.
+
+    Args:
+        dimension: The dimension the variant is for
+
+    Returns:
+        Object schema with a single-value dimension enum and its value enum
+    """
+    return {
+        "type": "object",
+        "description": DIMENSION_DESCRIPTIONS[dimension],
+        "properties": {
+            "dimension": {"type": "string", "enum": [dimension.value]},
+            "value": {"type": "string", "enum": list(DIMENSION_VALUES[dimension])},
+        },
+        "required": ["dimension", "value"],
+        "additionalProperties": False,
+    }
+
+
+def build_parameters_schema() -> dict[str, Any]:
+    """Build the strict JSON schema of the process_canonical_fact arguments."""
+    return {
+        "type": "object",
+        "properties": {
+            "subjects": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "List of child names (e.g., ['Gabriel'])",
+            },
+            "fact": {
+                "anyOf": [build_fact_variant(dimension) for dimension in Dimension],
+                "description": "The dimension and its value",
+            },
+            "confidence": {
+                "type": "number",
+                "description": "Confidence score 0-1 (use 1.0 when certain)",
+            },
+        },
+        "required": ["subjects", "fact", "confidence"],
+        "additionalProperties": False,
+    }
+
+
+def build_openai_tool_schema() -> list[dict[str, Any]]:
+    """
+    Build the OpenAI function-calling tools for the gateway.
+
+    Returns:
+        List of OpenAI tool definitions with strict mode enabled
+    """
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": TOOL_NAME,
+                "description": TOOL_DESCRIPTION,
+                "strict": True,
+                "parameters": build_parameters_schema(),
+            },
+        }
+    ]
@@ -0,0 +1,180 @@
+"""
+Idempotency keys and duplicate-event suppression.
+
+Every IntentContract gets a deterministic key: a hash of the child, the
+action, the properties and a time bucket. The gateway remembers the
+responses of recently recorded contracts in a bounded, time-expiring
+cache and answers a repeated utterance (or a client retry) with the
+original response instead of writing the event twice. The key is also
+sent to the backend, so it can deduplicate retries on its side.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Duplicates are suppressed within this many seconds (0 disables suppression)
+ENV_WINDOW = "GATEWAY_IDEMPOTENCY_WINDOW"
+ENV_MAX_ENTRIES = "GATEWAY_IDEMPOTENCY_MAX_ENTRIES"
+DEFAULT_WINDOW_SECONDS = 120.0
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+def compute_idempotency_key(
+    child_id: int,
+    action: str,
+    properties: dict[str, Any],
+    timestamp: datetime,
+    window_seconds: float = DEFAULT_WINDOW_SECONDS,
+    bucket_offset: int = 0,
+) -> str:
+    """
+    Compute the idempotency key of a contract.
+
+    Args:
+        child_id: Resolved child ID
+        action: Backend action (e.g., "record_meal")
+        properties: Action properties
+        timestamp: Contract creation time
+        window_seconds: Width of the time bucket
+        bucket_offset: Shift the bucket (-1 for the previous one)
+
+    Returns:
+        Hex SHA-256 digest, stable across processes
+    """
+    bucket = int(timestamp.timestamp() // window_seconds) + bucket_offset if window_seconds else 0
+    payload = json.dumps(
+        {"child_id": child_id, "action": action, "properties": properties, "bucket": bucket},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyCache:
+    """
+    Bounded, time-expiring map of idempotency key to original response.
+
+    Only successful responses are remembered, so failed writes can be
+    retried. Concurrent calls with the same key share one backend write.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_WINDOW_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a response is remembered
+            max_entries: Oldest entries are evicted beyond this size
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.duplicates = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._pending: dict[str, asyncio.Future[dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the remembered response for a key, if not expired."""
+        self._expire(time.monotonic())
+        entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def put(self, key: str, response: dict[str, Any]) -> None:
+        """Remember a response, evicting the oldest entries beyond max_entries."""
+        now = time.monotonic()
+        self._expire(now)
+        self._entries[key] = (now + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def run(
+        self,
+        keys: list[str],
+        record: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> tuple[dict[str, Any], bool]:
+        """
+        Record an event once per key.
+
+        Args:
+            keys: The contract's key first, then keys that also count as a
+                  duplicate (e.g. the previous time bucket)
+            record: Performs the write and returns the response
+
+        Returns:
+            (response, duplicate) - the original response if any key was seen.
+            A failed in-flight write that was joined is returned as is, with
+            duplicate=False, so the caller can retry it.
+        """
+        if self.ttl_seconds <= 0:
+            return await record(), False
+
+        for key in keys:
+            cached = self.get(key)
+            if cached is not None:
+                self.duplicates += 1
+                return cached, True
+            pending = self._pending.get(key)
+            if pending is not None:
+                response = await asyncio.shield(pending)
+                if not response.get("success"):
+                    return response, False
+                self.duplicates += 1
+                return response, True
+
+        key = keys[0]
+        future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            response = await record()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved: waiters are optional
+            raise
+        finally:
+            del self._pending[key]
+
+        if response.get("success"):
+            self.put(key, response)
+        future.set_result(response)
+        return response, False
+
+    def stats(self) -> dict[str, Any]:
+        """Entry count, in-flight writes and suppressed duplicates."""
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._pending),
+            "duplicates_suppressed": self.duplicates,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+def create_idempotency_cache() -> IdempotencyCache:
+    """Build the cache from GATEWAY_IDEMPOTENCY_WINDOW / _MAX_ENTRIES."""
+    return IdempotencyCache(
+        ttl_seconds=float(os.getenv(ENV_WINDOW, str(DEFAULT_WINDOW_SECONDS))),
+        max_entries=int(os.getenv(ENV_MAX_ENTRIES, str(DEFAULT_MAX_ENTRIES))),
+    )
@@ -23,6 +23,18 @@ class IntentContractMetadata(BaseModel):
         default="mcp-intent-gateway",
         description="Source of the contract",
     )
+    idempotency_key: str | None = Field(
+        default=None,
+        description="Stable hash of child, action, properties and time bucket",
+    )
+    trace_id: str | None = Field(
+        default=None,
+        description="Trace of the originating utterance (W3C trace id)",
+    )
+    span_id: str | None = Field(
+        default=None,
+        description="Gateway span that produced the contract",
+    )
 
 
 class IntentContract(BaseModel):
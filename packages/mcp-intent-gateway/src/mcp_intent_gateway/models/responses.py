@@ -26,6 +26,14 @@ class ProcessingResult(BaseModel):
         default=None,
         description="List of validation errors (if failed)",
     )
+    duplicate: bool = Field(
+        default=False,
+        description="True if this is the original response to an already recorded contract",
+    )
+    retry_after_seconds: float | None = Field(
+        default=None,
+        description="Set when the call was shed (OVERLOADED): retry after this delay",
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -0,0 +1,281 @@
+"""
+On-demand CPU and allocation profiling for a running gateway.
+
+A profiling window is opened with the start_profiling tool and closed by
+stop_profiling or when its duration elapses. Nothing runs while no window
+is open, so the hooks cost nothing in normal operation.
+
+- CPU: a background thread samples the stack of every thread at a fixed
+  interval (sys._current_frames) and counts identical stacks. The cost
+  is proportional to the sampling rate, not to the request rate, and no
+  tracing hook is installed in the profiled code.
+- Allocations: tracemalloc records the traceback of every allocation
+  during the window; live allocations are snapshotted when it closes.
+
+Profiles are written in the collapsed-stack format ("frame;frame;frame
+count" per line) read by flamegraph.pl, speedscope and inferno, plus a
+text summary of the top allocation sites. Files go to GATEWAY_PROFILE_DIR
+(default: <tmp>/mcp-intent-gateway-profiles). With several HTTP workers,
+each process profiles itself only.
+
+Closing a window only stops the sampler on the event loop; the allocation
+snapshot and the file writes run in a worker thread, so tool calls in
+flight are not stalled by the profiler's own output.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ENV_PROFILE_DIR = "GATEWAY_PROFILE_DIR"
+
+DEFAULT_INTERVAL = 0.01  # Seconds between stack samples
+DEFAULT_DURATION = 30.0  # Seconds before a window closes on its own
+MAX_DURATION = 600.0
+ALLOCATION_FRAMES = 32  # Traceback depth recorded by tracemalloc
+TOP_ALLOCATIONS = 50
+
+
+def profile_dir() -> Path:
+    """Directory receiving profile files."""
+    default = Path(tempfile.gettempdir()) / "mcp-intent-gateway-profiles"
+    return Path(os.getenv(ENV_PROFILE_DIR) or default)
+
+
+def _frame_label(filename: str, name: str, lineno: int) -> str:
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _folded_stack(frame: FrameType | None) -> list[str]:
+    """Labels from the outermost frame to the innermost."""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(_frame_label(code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class StackSampler:
+    """Samples the stacks of all other threads at a fixed interval."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        """
+        Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start sampling on a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gateway-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = [names.get(ident, f"thread-{ident}"), *_folded_stack(frame)]
+                self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed-stack format."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def allocation_profile(snapshot: tracemalloc.Snapshot) -> tuple[str, str]:
+    """
+    Live allocations of a snapshot.
+
+    Returns:
+        (collapsed stacks weighted by bytes, top allocation sites as text)
+    """
+    snapshot = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ]
+    )
+    folded: Counter[str] = Counter()
+    for stat in snapshot.statistics("traceback"):
+        # tracemalloc lists the most recent frame first
+        frames = [f"{os.path.basename(f.filename)}:{f.lineno}" for f in reversed(stat.traceback)]
+        folded[";".join(frames)] += stat.size
+    collapsed = "".join(f"{stack} {size}\n" for stack, size in folded.most_common())
+
+    lines = [f"Top {TOP_ALLOCATIONS} allocation sites (live at window end)"]
+    for index, stat in enumerate(snapshot.statistics("lineno")[:TOP_ALLOCATIONS], 1):
+        frame = stat.traceback[0]
+        lines.append(
+            f"{index:>3}. {frame.filename}:{frame.lineno}: "
+            f"{stat.size / 1024:.1f} KiB in {stat.count} blocks"
+        )
+    return collapsed, "\n".join(lines) + "\n"
+
+
+class ProfilingSession:
+    """One profiling window: CPU sampling and, optionally, allocation tracing."""
+
+    def __init__(
+        self,
+        duration: float = DEFAULT_DURATION,
+        interval: float = DEFAULT_INTERVAL,
+        trace_allocations: bool = True,
+    ) -> None:
+        """
+        Initialize the session.
+
+        Args:
+            duration: Seconds before the window closes on its own
+            interval: Seconds between stack samples
+            trace_allocations: Also run tracemalloc during the window
+        """
+        self.duration = duration
+        self.trace_allocations = trace_allocations
+        self.sampler = StackSampler(interval)
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._owns_tracemalloc = False
+        self._timer: asyncio.TimerHandle | None = None
+
+    def start(self) -> None:
+        """Open the window (and close it after duration, on the running loop)."""
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(ALLOCATION_FRAMES)
+            self._owns_tracemalloc = True
+        self.sampler.start()
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(self.duration, _expire, self)
+
+    async def stop(self) -> dict[str, Any]:
+        """
+        Close the window and write the profile files (off the event loop).
+
+        Returns:
+            Window summary with the paths of the files written
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+        self.sampler.stop()  # Returns within one sample: the sampler waits on its stop event
+        elapsed = time.perf_counter() - self._started
+        return await asyncio.to_thread(self._write, elapsed)
+
+    def _write(self, elapsed: float) -> dict[str, Any]:
+        """Snapshot allocations and write the profile files (blocking)."""
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        prefix = directory / f"{self.started_at:%Y%m%dT%H%M%SZ}-{os.getpid()}"
+        files = {"cpu": str(prefix) + ".cpu.folded"}
+        Path(files["cpu"]).write_text(self.sampler.collapsed(), encoding="utf-8")
+
+        if self._owns_tracemalloc:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            collapsed, top = allocation_profile(snapshot)
+            files["allocations"] = str(prefix) + ".alloc.folded"
+            files["allocation_sites"] = str(prefix) + ".alloc.txt"
+            Path(files["allocations"]).write_text(collapsed, encoding="utf-8")
+            Path(files["allocation_sites"]).write_text(top, encoding="utf-8")
+
+        logger.info("Profile written: %s", files["cpu"])
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": round(elapsed, 3),
+            "samples": self.sampler.samples,
+            "files": files,
+        }
+
+
+_session: ProfilingSession | None = None
+_last_result: asyncio.Task[dict[str, Any]] | None = None  # Writes the last window's files
+
+
+def _close(session: ProfilingSession) -> None:
+    global _session, _last_result
+    _session = None
+    _last_result = asyncio.get_running_loop().create_task(session.stop(), name="profile-writer")
+
+
+def _expire(session: ProfilingSession) -> None:
+    if _session is session:
+        _close(session)
+
+
+def start_profiling(
+    duration: float = DEFAULT_DURATION,
+    interval: float = DEFAULT_INTERVAL,
+    trace_allocations: bool = True,
+) -> dict[str, Any]:
+    """
+    Open a profiling window (must be called on the event loop).
+
+    Raises:
+        RuntimeError: If a window is already open or its files are still being written
+        ValueError: If duration or interval is out of range
+    """
+    global _session
+    if _session is not None:
+        raise RuntimeError("Profiling is already running; stop it first")
+    if _last_result is not None and not _last_result.done():
+        raise RuntimeError("The previous profile is still being written")
+    if not 0 < duration <= MAX_DURATION:
+        raise ValueError(f"duration must be in (0, {MAX_DURATION:g}] seconds")
+    if not 0.001 <= interval <= 1.0:
+        raise ValueError("interval must be between 0.001 and 1 second")
+    session = ProfilingSession(duration, interval, trace_allocations)
+    session.start()
+    _session = session
+    return {
+        "status": "running",
+        "started_at": session.started_at.isoformat(),
+        "duration_seconds": duration,
+        "interval_seconds": interval,
+        "trace_allocations": trace_allocations,
+    }
+
+
+async def stop_profiling() -> dict[str, Any]:
+    """
+    Close the open window, or report the last one if it already expired.
+
+    Raises:
+        RuntimeError: If no window was ever opened
+    """
+    if _session is not None:
+        _close(_session)
+    writer = _last_result
+    if writer is None:
+        raise RuntimeError("Profiling is not running")
+    # Shielded: a cancelled caller does not abort writing the files
+    return {"status": "stopped", **await asyncio.shield(writer)}
@@ -4,36 +4,139 @@ MCP Intent Gateway Server.
 FastMCP server that exposes the intent processing as an MCP tool.
 Receives canonical facts from LLM, validates them, resolves child entities,
 maps to IntentContract, and calls the backend API.
+
+Importing this module is cheap: the FastMCP server, the mapper and the
+backend client are built on first use, and logging is configured in main().
+The tool functions can therefore be imported and awaited directly.
+
+Transports (see main()):
+- stdio (default): one gateway per client process
+- streamable-http / sse: a network server shared by many clients. HTTP is
+  stateless, so --workers N can run several processes on one socket.
 """
 
+import argparse
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Any
-
-from mcp.server.fastmcp import FastMCP
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, Callable
 
-from .clients.mock_backend import MockBackendClient
+from . import profiling
+from .admission import AdmissionController, Overloaded, create_admission_controller
 from .domain.constants import DIMENSION_VALUES, Dimension
+from .domain.tool_schema import build_openai_tool_schema
+from .idempotency import IdempotencyCache, compute_idempotency_key, create_idempotency_cache
+from .logging_config import configure_logging
 from .mapping.mapper import DeterministicMapper
+from .metrics import REGISTRY, StageTimer
 from .models.canonical_fact import CanonicalFact
 from .models.intent_contract import IntentContract, IntentContractMetadata
 from .models.responses import ProcessingResult, ValidationError
+from .spool import EventSpool, get_spool_path
+from .tracing import TRACEPARENT, Span, inbound_context, inbound_traceparent, start_span
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from mcp.server.fastmcp import FastMCP
+    from mcp.server.fastmcp.tools import Tool
+    from mcp.types import Tool as MCPTool
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+    from .clients.mock_backend import MockBackendClient
+
+# Network configuration (environment variables, overridable on the command line)
+ENV_TRANSPORT = "GATEWAY_TRANSPORT"
+ENV_HOST = "GATEWAY_HOST"
+ENV_PORT = "GATEWAY_PORT"
+ENV_WORKERS = "GATEWAY_WORKERS"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 3002
+TRANSPORTS = ["stdio", "streamable-http", "sse"]
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
-# Initialize FastMCP server
-mcp = FastMCP("Intent Gateway")
+# Components, built on first use
+_server: "FastMCP | None" = None
+_tools: "dict[str, Tool] | None" = None
+_mapper: DeterministicMapper | None = None
+_backend: "MockBackendClient | None" = None
+_schema_hash: str | None = None
+_idempotency: IdempotencyCache | None = None
+_spool: EventSpool | None = None
+_admission: AdmissionController | None = None
+_spool_configured = False
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "gateway_stage_seconds",
+    "Time spent in each stage of process_canonical_fact",
+    ("stage",),
+)
+FACTS_TOTAL = REGISTRY.counter(
+    "gateway_facts_total",
+    "Canonical facts processed, by outcome (success, duplicate or error code)",
+    ("outcome",),
+)
+
+
+def get_mapper() -> DeterministicMapper:
+    """Return the shared DeterministicMapper, creating it on first use."""
+    global _mapper
+    if _mapper is None:
+        _mapper = DeterministicMapper()
+    return _mapper
+
 
-# Initialize components
-mapper = DeterministicMapper()
-backend = MockBackendClient()
+def get_backend() -> "MockBackendClient":
+    """Return the shared backend client, creating it on first use."""
+    global _backend
+    if _backend is None:
+        from .clients.mock_backend import MockBackendClient
+
+        _backend = MockBackendClient()
+    return _backend
+
+
+def get_idempotency_cache() -> IdempotencyCache:
+    """Return the shared duplicate-suppression cache, creating it on first use."""
+    global _idempotency
+    if _idempotency is None:
+        _idempotency = create_idempotency_cache()
+    return _idempotency
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the shared admission controller, creating it on first use."""
+    global _admission
+    if _admission is None:
+        _admission = create_admission_controller()
+    return _admission
+
+
+def get_spool() -> EventSpool | None:
+    """
+    Return the shared event spool, opening it on first use.
+
+    Returns:
+        The spool, or None if GATEWAY_SPOOL_PATH is unset or empty
+        (events are then sent to the backend synchronously)
+    """
+    global _spool, _spool_configured
+    if not _spool_configured:
+        path = get_spool_path()
+        if path is not None:
+            _spool = EventSpool(path, get_backend())
+            logger.info("Spooling events to %s", path)
+        _spool_configured = True
+    return _spool
 
 
-@mcp.tool()
 async def process_canonical_fact(
     subjects: list[str],
     dimension: str,
@@ -56,12 +159,64 @@ async def process_canonical_fact(
     Returns:
         Processing result with success status, message, and intent contract or errors
     """
-    logger.info(
-        f"Processing canonical fact: subjects={subjects}, dimension={dimension}, value={value}"
+    admission = get_admission_controller()
+    started = time.perf_counter()
+    with start_span(
+        "process_canonical_fact",
+        inbound_traceparent(),
+        subjects=subjects,
+        dimension=dimension,
+        value=value,
+    ) as span:
+        try:
+            async with admission.admit():
+                STAGE_SECONDS.labels("admission_wait").observe(time.perf_counter() - started)
+                result = await _process_canonical_fact(subjects, dimension, value, confidence, span)
+        except Overloaded as e:
+            logger.warning("Shedding canonical fact for %s: %s", subjects, e)
+            result = ProcessingResult(
+                success=False,
+                message=str(e),
+                errors=[ValidationError(field="gateway", message=str(e), code="OVERLOADED")],
+                retry_after_seconds=e.retry_after,
+            ).model_dump(mode="json")
+
+        outcome = _outcome(result)
+        span.attributes["outcome"] = outcome
+        if not result.get("success"):
+            span.status = "error"
+
+    STAGE_SECONDS.labels("total").observe(time.perf_counter() - started)
+    FACTS_TOTAL.labels(outcome).inc()
+    return result
+
+
+def _outcome(result: dict[str, Any]) -> str:
+    if not result.get("success"):
+        errors = result.get("errors") or [{}]
+        return str(errors[0].get("code") or "error")
+    return "duplicate" if result.get("duplicate") else "success"
+
+
+async def _process_canonical_fact(
+    subjects: list[str],
+    dimension: str,
+    value: str,
+    confidence: float,
+    span: Span,
+) -> dict[str, Any]:
+    """Validate, map and record a canonical fact (see process_canonical_fact)."""
+    logger.debug(
+        "Processing canonical fact: subjects=%s, dimension=%s, value=%s",
+        subjects,
+        dimension,
+        value,
     )
 
+    timer = StageTimer(STAGE_SECONDS)
     try:
         # 1. Validate dimension
+        timer.start("validation")
         try:
             dim = Dimension(dimension)
         except ValueError:
@@ -76,7 +231,7 @@ async def process_canonical_fact(
                         code="INVALID_DIMENSION",
                     )
                 ],
-            ).model_dump()
+            ).model_dump(mode="json")
 
         # 2. Validate value for dimension
         valid_values = DIMENSION_VALUES.get(dim, [])
@@ -91,7 +246,7 @@ async def process_canonical_fact(
                         code="INVALID_VALUE",
                     )
                 ],
-            ).model_dump()
+            ).model_dump(mode="json")
 
         # 3. Create and validate CanonicalFact
         try:
@@ -112,9 +267,11 @@ async def process_canonical_fact(
                         code="VALIDATION_ERROR",
                     )
                 ],
-            ).model_dump()
+            ).model_dump(mode="json")
 
         # 4. Resolve child from subject
+        timer.start("child_resolution")
+        backend = get_backend()
         child = await backend.get_child_by_firstname(subjects[0])
         if not child:
             return ProcessingResult(
@@ -127,13 +284,14 @@ async def process_canonical_fact(
                         code="CHILD_NOT_FOUND",
                     )
                 ],
-            ).model_dump()
+            ).model_dump(mode="json")
 
-        logger.info(f"Resolved child '{subjects[0]}' to ID {child.id}")
+        logger.debug("Resolved child '%s' to ID %s", subjects[0], child.id)
 
         # 5. Map to MappingResult
+        timer.start("mapping")
         try:
-            mapping_result = mapper.map([fact])
+            mapping_result = get_mapper().map([fact])
         except ValueError as e:
             return ProcessingResult(
                 success=False,
@@ -145,53 +303,110 @@ async def process_canonical_fact(
                         code="MAPPING_ERROR",
                     )
                 ],
-            ).model_dump()
+            ).model_dump(mode="json")
 
         # 6. Construct IntentContract
         domain_lower = mapping_result["domain"].value.lower()
         action = f"record_{domain_lower}"
 
+        metadata = IntentContractMetadata(
+            confidence=mapping_result.get("confidence"),
+            trace_id=span.trace_id,
+            span_id=span.span_id,
+        )
+        idempotency = get_idempotency_cache()
+        keys = [
+            compute_idempotency_key(
+                child.id,
+                action,
+                mapping_result["attributes"],
+                metadata.timestamp,
+                window_seconds=idempotency.ttl_seconds,
+                bucket_offset=offset,
+            )
+            for offset in (0, -1)  # A repeat just after a bucket boundary is still a duplicate
+        ]
+        metadata.idempotency_key = keys[0]
         contract = IntentContract(
             child_id=child.id,
             action=action,
             properties=mapping_result["attributes"],
-            metadata=IntentContractMetadata(
-                confidence=mapping_result.get("confidence"),
-            ),
+            metadata=metadata,
         )
 
-        logger.info(f"Created IntentContract: action={action}, child_id={child.id}")
-
-        # 7. Call mock backend
-        event_response = await backend.add_event(
-            child_id=contract.child_id,
-            action=contract.action,
-            properties=contract.properties,
-        )
+        logger.debug("Created IntentContract: action=%s, child_id=%s", action, child.id)
+
+        # 7. Spool the contract (durable on return) or call the backend directly,
+        #    once per idempotency key
+        timer.start("spool_write" if get_spool() is not None else "backend_write")
+
+        async def record() -> dict[str, Any]:
+            spool = get_spool()
+            if spool is not None:
+                await spool.append(contract)
+                spool.start()
+                logger.info(
+                    "Spooled canonical fact for %s",
+                    subjects[0],
+                    extra={"trace_id": span.trace_id, "child_id": child.id, "action": action},
+                )
+                return ProcessingResult(
+                    success=True,
+                    message=f"Event recorded for {subjects[0]} (queued for delivery)",
+                    intent_contract=contract,
+                ).model_dump(mode="json")
+
+            event_response = await backend.add_event(
+                child_id=contract.child_id,
+                action=contract.action,
+                properties=contract.properties,
+                idempotency_key=keys[0],
+                timestamp=metadata.timestamp.isoformat(),
+                traceparent=span.traceparent,
+            )
 
-        if not event_response.success:
+            if not event_response.success:
+                return ProcessingResult(
+                    success=False,
+                    message=f"Backend error: {event_response.message}",
+                    errors=[
+                        ValidationError(
+                            field="backend",
+                            message=event_response.message,
+                            code="BACKEND_ERROR",
+                        )
+                    ],
+                ).model_dump(mode="json")
+
+            # 8. Return success
+            logger.info(
+                "Successfully processed canonical fact for %s",
+                subjects[0],
+                extra={"trace_id": span.trace_id, "child_id": child.id, "action": action},
+            )
             return ProcessingResult(
-                success=False,
-                message=f"Backend error: {event_response.message}",
-                errors=[
-                    ValidationError(
-                        field="backend",
-                        message=event_response.message,
-                        code="BACKEND_ERROR",
-                    )
-                ],
-            ).model_dump()
-
-        # 8. Return success
-        logger.info(f"Successfully processed canonical fact for {subjects[0]}")
-        return ProcessingResult(
-            success=True,
-            message=f"Event recorded for {subjects[0]}",
-            intent_contract=contract,
-        ).model_dump()
+                success=True,
+                message=f"Event recorded for {subjects[0]}",
+                intent_contract=contract,
+            ).model_dump(mode="json")
+
+        response, duplicate = await idempotency.run(keys, record)
+        if duplicate:
+            logger.info(
+                "Duplicate contract suppressed: key=%s, child_id=%s",
+                keys[0][:12],
+                child.id,
+                extra={"trace_id": span.trace_id},
+            )
+            return {**response, "duplicate": True}
+        return response
 
     except Exception as e:
-        logger.error(f"Unexpected error processing canonical fact: {e}", exc_info=True)
+        logger.exception(
+            "Unexpected error processing canonical fact: %s",
+            e,
+            extra={"trace_id": span.trace_id},
+        )
         return ProcessingResult(
             success=False,
             message=f"Unexpected error: {str(e)}",
@@ -202,10 +417,14 @@ async def process_canonical_fact(
                     code="UNEXPECTED_ERROR",
                 )
             ],
-        ).model_dump()
+        ).model_dump(mode="json")
+    finally:
+        timer.stop()
+        span.attributes["stages_ms"] = {
+            stage: round(seconds * 1000, 3) for stage, seconds in timer.timings.items()
+        }
 
 
-@mcp.tool()
 async def get_valid_dimensions() -> dict[str, Any]:
     """
     Get all valid dimensions and their allowed values.
@@ -220,34 +439,334 @@ async def get_valid_dimensions() -> dict[str, Any]:
         "dimensions": {
             dim.value: {
                 "valid_values": DIMENSION_VALUES[dim],
-                "domain": mapper._mapping_functions[0].__name__,  # Just return structure
+                "domain": get_mapper()._mapping_functions[0].__name__,  # Just return structure
             }
             for dim in Dimension
         }
     }
 
 
-@mcp.tool()
 async def health_check() -> dict[str, Any]:
     """
     Check the health of the MCP Intent Gateway and backend.
 
+    Backend availability comes from a background prober, so this returns
+    immediately even when the backend hangs.
+
     Returns:
-        Health status including backend availability
+        Health status including backend availability, circuit breaker state,
+        backend latency percentiles, duplicate suppression and spool backlog
     """
+    backend = get_backend()
     backend_healthy = await backend.health_check()
+    spool = get_spool()
+    # sqlite queries under the spool lock, which the drainer may hold (busy_timeout)
+    spool_stats = await asyncio.to_thread(spool.stats) if spool is not None else None
     return {
         "status": "ok",
         "service": "mcp-intent-gateway",
         "backend_available": backend_healthy,
         "backend_url": backend.base_url,
+        "backend": backend.health_report(),
+        "idempotency": get_idempotency_cache().stats(),
+        "admission": get_admission_controller().stats(),
+        "spool": spool_stats,
     }
 
 
-def main() -> None:
+async def get_schema_hash() -> dict[str, Any]:
+    """
+    Get a content hash of the tool schemas this gateway advertises.
+
+    Clients cache the converted tool schema keyed by this hash and only
+    call list_tools again when it changes.
+
+    Returns:
+        The schema hash and the advertised tool names
+    """
+    return {"schema_hash": compute_schema_hash(), "tools": list(get_tools())}
+
+
+async def get_metrics() -> dict[str, Any]:
+    """
+    Get the gateway's latency histograms and counters.
+
+    Stage latencies (admission wait, validation, child resolution, mapping,
+    spool or backend write, total) and facts processed by outcome. Also
+    served as Prometheus text on /metrics by the HTTP transports.
+
+    Returns:
+        Prometheus text exposition and a JSON snapshot with p50/p95/p99
+    """
+    return {"prometheus": REGISTRY.render_prometheus(), "metrics": REGISTRY.snapshot()}
+
+
+async def start_profiling(
+    duration_seconds: float = profiling.DEFAULT_DURATION,
+    interval_ms: float = profiling.DEFAULT_INTERVAL * 1000,
+    trace_allocations: bool = True,
+) -> dict[str, Any]:
+    """
+    Start CPU sampling (and allocation tracing) in this gateway process.
+
+    The window closes after duration_seconds or on stop_profiling. CPU
+    stacks and live allocations are written as collapsed stacks, ready for
+    flame graph tools, to GATEWAY_PROFILE_DIR.
+
+    Args:
+        duration_seconds: Window length (at most 600 seconds)
+        interval_ms: Milliseconds between stack samples
+        trace_allocations: Also trace allocations with tracemalloc (slower)
+
+    Returns:
+        Window parameters
+    """
+    return profiling.start_profiling(duration_seconds, interval_ms / 1000, trace_allocations)
+
+
+async def stop_profiling() -> dict[str, Any]:
+    """
+    Stop profiling and write the profile files.
+
+    If the window already expired, its result is returned again.
+
+    Returns:
+        Window duration, number of samples and the paths of the files written
+    """
+    return await profiling.stop_profiling()
+
+
+async def get_openai_tool_schema() -> dict[str, Any]:
+    """
+    Get the LLM tool schema generated from the domain constants.
+
+    Unlike the MCP signature of process_canonical_fact, each dimension only
+    admits its own values, so invalid pairs cannot be generated. The schema
+    is OpenAI strict-mode compatible; `fact` must be flattened into
+    dimension/value before calling process_canonical_fact.
+
+    Returns:
+        OpenAI function-calling tool definitions
+    """
+    return {"tools": build_openai_tool_schema()}
+
+
+# Tools exposed over MCP, in registration order
+TOOLS: list[Callable[..., Any]] = [
+    process_canonical_fact,
+    get_valid_dimensions,
+    health_check,
+    get_schema_hash,
+    get_openai_tool_schema,
+    get_metrics,
+    start_profiling,
+    stop_profiling,
+]
+
+
+@asynccontextmanager
+async def lifespan(server: "FastMCP") -> "AsyncIterator[None]":
+    """Start the backend health prober and resume draining spooled events."""
+    global _spool, _spool_configured
+    get_backend().start_health_probe()
+    spool = get_spool()
+    if spool is not None:
+        spool.start()
+    try:
+        yield
+    finally:
+        if spool is not None:
+            # Undelivered events stay on disk for the next start
+            await spool.stop()
+            spool.close()
+            _spool, _spool_configured = None, False
+        await get_backend().aclose()
+
+
+def create_server() -> "FastMCP":
+    """
+    Build a FastMCP server with all gateway tools registered.
+
+    Host and port (network transports only) come from GATEWAY_HOST and
+    GATEWAY_PORT. Streamable HTTP is stateless with plain JSON responses:
+    any worker can serve any request, and in-flight calls run concurrently.
+    """
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP(
+        "Intent Gateway",
+        host=os.getenv(ENV_HOST, DEFAULT_HOST),
+        port=int(os.getenv(ENV_PORT, str(DEFAULT_PORT))),
+        stateless_http=True,
+        json_response=True,
+        lifespan=lifespan,
+    )
+    for tool in TOOLS:
+        server.add_tool(tool)
+    server.custom_route("/metrics", methods=["GET"], include_in_schema=False)(metrics_endpoint)
+    return server
+
+
+async def metrics_endpoint(request: "Request") -> "Response":
+    """Prometheus scrape endpoint (HTTP transports only)."""
+    from starlette.responses import PlainTextResponse
+
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def get_server() -> "FastMCP":
+    """Return the shared FastMCP server, creating it on first use."""
+    global _server
+    if _server is None:
+        _server = create_server()
+    return _server
+
+
+def get_tools() -> "dict[str, Tool]":
+    """Return the gateway tools by name, with FastMCP argument validation."""
+    global _tools
+    if _tools is None:
+        from mcp.server.fastmcp.tools import Tool
+
+        _tools = {tool.name: tool for tool in map(Tool.from_function, TOOLS)}
+    return _tools
+
+
+def compute_schema_hash() -> str:
+    """
+    Hash the advertised tool schemas (name, description, input schema).
+
+    The hash is stable across processes and changes whenever a tool's
+    signature, docstring, the set of tools or the generated LLM schema
+    changes.
+    """
+    global _schema_hash
+    if _schema_hash is None:
+        tools = [
+            {"name": tool.name, "description": tool.description, "inputSchema": tool.parameters}
+            for tool in get_tools().values()
+        ]
+        payload = json.dumps(
+            {"mcp": tools, "openai": build_openai_tool_schema()},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        _schema_hash = hashlib.sha256(payload.encode()).hexdigest()
+    return _schema_hash
+
+
+async def call_tool_in_process(
+    name: str,
+    arguments: dict[str, Any],
+    meta: dict[str, Any] | None = None,
+) -> Any:
+    """
+    Call a tool directly, without MCP framing or JSON serialization.
+
+    Arguments are validated exactly as the MCP server validates them, and
+    failures raise the same ToolError the server reports over stdio.
+
+    Args:
+        name: Tool name (e.g., "process_canonical_fact")
+        arguments: Tool arguments
+        meta: MCP request metadata (e.g., {"traceparent": ...})
+
+    Returns:
+        The tool's return value (JSON-compatible)
+
+    Raises:
+        ToolError: If the tool is unknown or fails
+    """
+    from mcp.server.fastmcp.exceptions import ToolError
+
+    tool = get_tools().get(name)
+    if tool is None:
+        raise ToolError(f"Unknown tool: {name}")
+    with inbound_context((meta or {}).get(TRACEPARENT)):
+        return await tool.run(arguments)
+
+
+async def list_tools_in_process() -> "list[MCPTool]":
+    """List tools as the MCP server advertises them."""
+    return await get_server().list_tools()
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards-compatible lazy module attributes
+    if name == "mcp":
+        return get_server()
+    if name == "mapper":
+        return get_mapper()
+    if name == "backend":
+        return get_backend()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_http_app() -> "Starlette":
+    """ASGI app for the streamable HTTP transport (uvicorn factory, one per worker)."""
+    configure_logging()
+    return get_server().streamable_http_app()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line options, defaulting to the GATEWAY_* environment variables."""
+    parser = argparse.ArgumentParser(description="MCP Intent Gateway server")
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default=os.getenv(ENV_TRANSPORT, "stdio"),
+    )
+    parser.add_argument("--host", default=os.getenv(ENV_HOST, DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=int(os.getenv(ENV_PORT, str(DEFAULT_PORT))))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv(ENV_WORKERS, "1")),
+        help="Worker processes sharing the listening socket (streamable-http only)",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and args.transport != "streamable-http":
+        parser.error("--workers requires --transport streamable-http")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
     """Run the MCP server."""
-    logger.info("Starting MCP Intent Gateway server...")
-    mcp.run()
+    args = parse_args(argv)
+    configure_logging()
+
+    if args.transport == "stdio":
+        logger.info("Starting MCP Intent Gateway server...")
+        get_server().run()
+        return
+
+    # Workers re-import this module, so hand them the configuration via env
+    os.environ[ENV_HOST] = args.host
+    os.environ[ENV_PORT] = str(args.port)
+    logger.info(
+        "Starting MCP Intent Gateway server (%s) on %s:%s with %s worker(s)...",
+        args.transport,
+        args.host,
+        args.port,
+        args.workers,
+    )
+
+    if args.transport == "sse":
+        get_server().run(transport="sse")
+        return
+
+    import uvicorn
+
+    uvicorn.run(
+        "mcp_intent_gateway.server:create_http_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level="warning",
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,365 @@
+"""
+Durable write-behind spool between the gateway and the backend.
+
+process_canonical_fact appends the IntentContract to a local SQLite
+database (WAL mode, synchronous=FULL) and acknowledges once the commit is
+on disk. A background task drains the spool to the backend in batches,
+retrying with exponential backoff, so caller latency is bounded by local
+disk rather than backend health, and no event is lost while the backend
+is down. Events keep their original timestamps.
+
+Rows are leased before they are sent, so several gateway workers can
+share one spool file without sending an event twice; a lease held by a
+crashed worker simply expires. The Idempotency-Key header lets the
+backend deduplicate the rare resend after a crash mid-request.
+
+Spooling is opt-in: set GATEWAY_SPOOL_PATH to a file on durable storage
+chosen by the operator. Without it the backend is called synchronously.
+Events the backend rejects as non-retryable are kept as "dead" rows,
+logged and counted in gateway_spool_dead_lettered_total.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .metrics import REGISTRY
+from .models.intent_contract import IntentContract
+from .tracing import format_traceparent
+
+if TYPE_CHECKING:
+    from .clients.mock_backend import MockBackendClient
+
+logger = logging.getLogger(__name__)
+
+# Spool file; unset or empty to call the backend synchronously
+ENV_SPOOL_PATH = "GATEWAY_SPOOL_PATH"
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_BASE_BACKOFF = 0.5  # Seconds before the first retry
+DEFAULT_MAX_BACKOFF = 60.0  # Backoff cap
+DEFAULT_LEASE = 60.0  # A claimed row is retried after this long without an ack
+IDLE_POLL_INTERVAL = 5.0  # Wake up at least this often to pick up due retries
+
+STATUS_PENDING = "pending"
+STATUS_DEAD = "dead"  # Rejected by the backend (non-retryable), kept for inspection
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT UNIQUE,
+    child_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    properties TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    traceparent TEXT
+);
+CREATE INDEX IF NOT EXISTS events_due ON events (status, next_attempt_at);
+"""
+
+# Columns added after the first release, for spools created by older versions
+_ADDED_COLUMNS = {"traceparent": "TEXT"}
+
+DEAD_LETTERED = REGISTRY.counter(
+    "gateway_spool_dead_lettered_total",
+    "Spooled events rejected by the backend (non-retryable) and kept as dead rows",
+)
+
+
+def get_spool_path() -> Path | None:
+    """Spool location from GATEWAY_SPOOL_PATH (None if unset or empty: spooling is disabled)."""
+    value = os.getenv(ENV_SPOOL_PATH)
+    return Path(value) if value else None
+
+
+def backoff_delay(attempts: int, base: float, maximum: float) -> float:
+    """Exponential backoff with full jitter, capped at maximum."""
+    return random.uniform(0, min(maximum, base * 2 ** max(0, attempts - 1)))
+
+
+class EventSpool:
+    """
+    Append-only event spool with a background drainer.
+
+    Usage:
+        spool = EventSpool(path, backend)
+        event_id = await spool.append(contract)  # Durable on return
+        spool.start()                             # Drain in the background
+        ...
+        await spool.stop()
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        backend: "MockBackendClient",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        base_backoff: float = DEFAULT_BASE_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        lease_seconds: float = DEFAULT_LEASE,
+    ) -> None:
+        """
+        Open (or create) the spool.
+
+        Args:
+            path: SQLite database file
+            backend: Client used to deliver events
+            batch_size: Events claimed and sent per drain round
+            base_backoff: Delay before the first retry (seconds)
+            max_backoff: Maximum retry delay (seconds)
+            lease_seconds: How long a claimed event is reserved for delivery
+        """
+        self.path = Path(path)
+        self.backend = backend
+        self.batch_size = batch_size
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self.delivered = 0
+        self.failures = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")  # fsync every commit
+        self._db.execute("PRAGMA busy_timeout=5000")  # Other workers may hold the write lock
+        self._db.executescript(_SCHEMA)
+        self._migrate()
+
+        self._task: asyncio.Task[None] | None = None
+        self._wake: asyncio.Event | None = None
+
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(events)")}
+        for name, kind in _ADDED_COLUMNS.items():
+            if name not in columns:
+                try:
+                    self._db.execute(f"ALTER TABLE events ADD COLUMN {name} {kind}")
+                except sqlite3.OperationalError:
+                    pass  # Added concurrently by another worker
+
+    # Writes -----------------------------------------------------------------
+
+    def _insert(self, contract: IntentContract) -> int | None:
+        metadata = contract.metadata
+        timestamp = metadata.timestamp if metadata else None
+        traceparent = (
+            format_traceparent(metadata.trace_id, metadata.span_id)
+            if metadata and metadata.trace_id and metadata.span_id
+            else None
+        )
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO events"
+                " (idempotency_key, child_id, action, properties, timestamp, enqueued_at,"
+                " traceparent) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    metadata.idempotency_key if metadata else None,
+                    contract.child_id,
+                    contract.action,
+                    json.dumps(contract.properties),
+                    (timestamp.isoformat() if timestamp else ""),
+                    time.time(),
+                    traceparent,
+                ),
+            )
+            return cursor.lastrowid if cursor.rowcount else None
+
+    async def append(self, contract: IntentContract) -> int | None:
+        """
+        Durably append a contract and wake the drainer.
+
+        Returns:
+            The spool row id, or None if a contract with the same
+            idempotency key is already spooled
+        """
+        event_id = await asyncio.to_thread(self._insert, contract)
+        if self._wake is not None:
+            self._wake.set()
+        return event_id
+
+    def _claim(self, now: float) -> list[tuple[Any, ...]]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT id, idempotency_key, child_id, action, properties, timestamp, attempts,"
+                    " traceparent FROM events"
+                    " WHERE status = ? AND next_attempt_at <= ? AND lease_until <= ?"
+                    " ORDER BY id LIMIT ?",
+                    (STATUS_PENDING, now, now, self.batch_size),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE events SET lease_until = ? WHERE id = ?",
+                    [(now + self.lease_seconds, row[0]) for row in rows],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return rows
+
+    def _settle(
+        self,
+        delivered: list[int],
+        retries: list[tuple[float, str, int]],
+        dead: list[tuple[str, int]],
+    ) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany("DELETE FROM events WHERE id = ?", [(i,) for i in delivered])
+                self._db.executemany(
+                    "UPDATE events SET attempts = attempts + 1, next_attempt_at = ?,"
+                    " last_error = ?, lease_until = 0 WHERE id = ?",
+                    retries,
+                )
+                self._db.executemany(
+                    "UPDATE events SET attempts = attempts + 1, status = 'dead', last_error = ?"
+                    " WHERE id = ?",
+                    dead,
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    # Draining ---------------------------------------------------------------
+
+    async def drain_once(self) -> int:
+        """
+        Claim one batch of due events and try to deliver it.
+
+        Returns:
+            Number of events claimed
+        """
+        rows = await asyncio.to_thread(self._claim, time.time())
+        if not rows:
+            return 0
+
+        responses = await asyncio.gather(
+            *(
+                self.backend.add_event(
+                    child_id=child_id,
+                    action=action,
+                    properties=json.loads(properties),
+                    idempotency_key=key,
+                    timestamp=timestamp or None,
+                    traceparent=traceparent,
+                )
+                for _, key, child_id, action, properties, timestamp, _, traceparent in rows
+            )
+        )
+
+        now = time.time()
+        delivered: list[int] = []
+        retries: list[tuple[float, str, int]] = []
+        dead: list[tuple[str, int]] = []
+        for row, response in zip(rows, responses, strict=True):
+            event_id, attempts = row[0], row[6] + 1
+            if response.success:
+                delivered.append(event_id)
+            elif response.retryable:
+                delay = backoff_delay(attempts, self.base_backoff, self.max_backoff)
+                retries.append((now + delay, response.message, event_id))
+            else:
+                dead.append((response.message, event_id))
+                logger.error("Spooled event %s rejected by backend: %s", event_id, response.message)
+
+        await asyncio.to_thread(self._settle, delivered, retries, dead)
+        if dead:
+            DEAD_LETTERED.inc(len(dead))
+        self.delivered += len(delivered)
+        self.failures += len(retries) + len(dead)
+        if retries:
+            logger.warning(
+                "Backend delivery failed for %s spooled event(s): %s", len(retries), retries[0][1]
+            )
+        return len(rows)
+
+    def _next_due_in(self) -> float:
+        with self._lock:
+            (due,) = self._db.execute(
+                "SELECT MIN(MAX(next_attempt_at, lease_until)) FROM events WHERE status = ?",
+                (STATUS_PENDING,),
+            ).fetchone()
+        if due is None:
+            return IDLE_POLL_INTERVAL
+        return min(IDLE_POLL_INTERVAL, max(0.0, float(due) - time.time()))
+
+    async def _drain_loop(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                if await self.drain_once():
+                    continue
+                timeout = await asyncio.to_thread(self._next_due_in)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Spool drainer error: %s", e)
+                timeout = self.base_backoff
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Start the background drainer in the running event loop (idempotent)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(
+            self._drain_loop(), name="spool-drainer"
+        )
+
+    async def stop(self) -> None:
+        """Stop the background drainer; spooled events stay on disk."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def close(self) -> None:
+        """Close the database (call stop() first)."""
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Pending and dead event counts, and the age of the oldest pending event."""
+        with self._lock:
+            pending, oldest = self._db.execute(
+                "SELECT COUNT(*), MIN(enqueued_at) FROM events WHERE status = ?",
+                (STATUS_PENDING,),
+            ).fetchone()
+            (dead,) = self._db.execute(
+                "SELECT COUNT(*) FROM events WHERE status = ?", (STATUS_DEAD,)
+            ).fetchone()
+        return {
+            "path": str(self.path),
+            "pending": pending,
+            "dead": dead,
+            "oldest_pending_seconds": round(time.time() - oldest, 3) if oldest else None,
+            "delivered": self.delivered,
+            "delivery_failures": self.failures,
+            "draining": self._task is not None and not self._task.done(),
+        }
@@ -0,0 +1,265 @@
+"""
+Trace context propagation and span export.
+
+Ids follow W3C Trace Context. The normalizer starts a trace per utterance
+and sends a `traceparent` in the MCP request metadata (`_meta`) of each
+tool call. process_canonical_fact records a child span, stores the ids on
+IntentContractMetadata, and every backend write records its own span and
+sends it as the `traceparent` header. One trace therefore links the
+utterance, its tool calls and the backend POSTs, across processes.
+
+Finished spans go to a pluggable SpanExporter. Set GATEWAY_TRACE_FILE to
+append them to a JSON-lines file (written by a background thread, never on
+the event loop); without an exporter, ids are still propagated but nothing
+is recorded.
+"""
+
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import re
+import secrets
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any
+
+from pydantic import BaseModel, Field
+
+TRACEPARENT = "traceparent"  # MCP _meta key and HTTP header
+ENV_TRACE_FILE = "GATEWAY_TRACE_FILE"
+SERVICE_NAME = "mcp-intent-gateway"
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+# traceparent of the calling tool call, for in-process calls (no MCP request)
+_inbound: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "inbound_traceparent", default=None
+)
+
+
+def new_trace_id() -> str:
+    """Random 128-bit trace id (32 hex digits)."""
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    """Random 64-bit span id (16 hex digits)."""
+    return secrets.token_hex(8)
+
+
+def format_traceparent(trace_id: str, span_id: str) -> str:
+    """W3C traceparent header value (version 00, sampled)."""
+    return f"00-{trace_id}-{span_id}-01"
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """(trace_id, span_id) from a traceparent value, or None if absent or malformed."""
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    return (match.group(1), match.group(2)) if match else None
+
+
+class Span(BaseModel):
+    """A timed operation within a trace."""
+
+    trace_id: str = Field(..., description="Trace shared by every span of an utterance")
+    span_id: str = Field(..., description="This span")
+    parent_span_id: str | None = Field(default=None, description="Calling span")
+    name: str = Field(..., description="Operation name")
+    service: str = Field(default=SERVICE_NAME, description="Process that recorded the span")
+    start_time: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    duration_ms: float | None = Field(default=None, description="Set when the span ends")
+    status: str = Field(default="ok", description="ok or error")
+    attributes: dict[str, Any] = Field(default_factory=dict)
+
+    @property
+    def traceparent(self) -> str:
+        """traceparent value that makes this span the parent of the callee."""
+        return format_traceparent(self.trace_id, self.span_id)
+
+
+class SpanExporter:
+    """Receives finished spans. Subclass and pass to set_span_exporter()."""
+
+    def export(self, span: Span) -> None:
+        """Record a finished span (called on the thread that ended it)."""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Block until every exported span is recorded."""
+
+    def shutdown(self) -> None:
+        """Flush and release resources."""
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    Appends one JSON object per span to a file.
+
+    export() only queues the span. A writer thread serializes queued spans
+    and appends them in batches, with one flush per batch.
+    """
+
+    def __init__(self, path: Path | str, max_batch: int = 512) -> None:
+        """
+        Initialize the exporter.
+
+        Args:
+            path: File to append to (created with its parent directory)
+            max_batch: Most spans written per flush
+        """
+        self.path = Path(path)
+        self.max_batch = max_batch
+        self._queue: queue.Queue[Span | None] = queue.Queue()  # None stops the writer
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._write_loop, name="span-exporter", daemon=True
+                    )
+                    self._thread.start()
+        self._queue.put(span)
+
+    def _next_batch(self) -> list[Span | None]:
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self) -> None:
+        file: IO[str] | None = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            file = self.path.open("a", encoding="utf-8")
+        except OSError as e:
+            logger.warning("Cannot open trace file %s, spans are dropped: %s", self.path, e)
+        stopping = False
+        while not stopping:
+            batch = self._next_batch()
+            stopping = None in batch
+            try:
+                if file is not None:
+                    file.writelines(span.model_dump_json() + "\n" for span in batch if span)
+                    file.flush()
+            except OSError as e:
+                logger.warning("Cannot write trace file %s: %s", self.path, e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        if file is not None:
+            file.close()
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+_exporter: SpanExporter | None = None
+_exporter_configured = False
+
+
+def get_span_exporter() -> SpanExporter | None:
+    """The active exporter (from GATEWAY_TRACE_FILE unless set explicitly)."""
+    global _exporter, _exporter_configured
+    if not _exporter_configured:
+        path = os.getenv(ENV_TRACE_FILE)
+        _exporter = JsonLinesSpanExporter(path) if path else None
+        if _exporter is not None:
+            atexit.register(_exporter.shutdown)  # Write queued spans before the process exits
+        _exporter_configured = True
+    return _exporter
+
+
+def set_span_exporter(exporter: SpanExporter | None) -> None:
+    """Replace the active exporter (None disables export)."""
+    global _exporter, _exporter_configured
+    previous = _exporter
+    _exporter, _exporter_configured = exporter, True
+    if previous is not None and previous is not exporter:
+        previous.shutdown()
+
+
+@contextmanager
+def start_span(name: str, traceparent: str | None = None, **attributes: Any) -> Iterator[Span]:
+    """
+    Time a block as a span and export it when the block ends.
+
+    Args:
+        name: Operation name
+        traceparent: Parent context; a new trace is started if None or malformed
+        **attributes: Initial span attributes (more can be added to span.attributes)
+
+    Yields:
+        The span; status becomes "error" if the block raises
+    """
+    parent = parse_traceparent(traceparent)
+    span = Span(
+        trace_id=parent[0] if parent else new_trace_id(),
+        span_id=new_span_id(),
+        parent_span_id=parent[1] if parent else None,
+        name=name,
+        attributes=attributes,
+    )
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException:
+        span.status = "error"
+        raise
+    finally:
+        span.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        exporter = get_span_exporter()
+        if exporter is not None:
+            exporter.export(span)
+
+
+@contextmanager
+def inbound_context(traceparent: str | None) -> Iterator[None]:
+    """Make traceparent the inbound context of tool calls run in this block."""
+    token = _inbound.set(traceparent)
+    try:
+        yield
+    finally:
+        _inbound.reset(token)
+
+
+def inbound_traceparent() -> str | None:
+    """
+    traceparent of the tool call being served.
+
+    Read from the MCP request's `_meta` when serving over MCP, or from
+    inbound_context() for in-process calls.
+    """
+    value = _inbound.get()
+    if value is not None:
+        return value
+    lowlevel = sys.modules.get("mcp.server.lowlevel.server")  # Never import mcp here
+    if lowlevel is None:
+        return None
+    request = lowlevel.request_ctx.get(None)
+    meta = request.meta if request is not None else None
+    value = getattr(meta, TRACEPARENT, None) if meta is not None else None
+    return value if isinstance(value, str) else None
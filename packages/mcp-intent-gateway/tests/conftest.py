@@ -0,0 +1,27 @@
+"""Shared pytest configuration for gateway tests."""
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from mcp_intent_gateway import server
+
+
+@pytest.fixture(autouse=True)
+def fresh_components() -> Iterator[None]:
+    """Duplicate suppression, breaker and admission state must not leak between tests."""
+    server._idempotency, server._backend, server._admission = None, None, None
+    yield
+    server._idempotency, server._backend, server._admission = None, None, None
+
+
+@pytest.fixture(autouse=True)
+def temporary_spool(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[None]:
+    """Spooling is opt-in: enable it per test, in a temporary directory."""
+    monkeypatch.setenv("GATEWAY_SPOOL_PATH", str(tmp_path / "spool.sqlite3"))
+    server._spool, server._spool_configured = None, False
+    yield
+    if server._spool is not None:
+        server._spool.close()
+    server._spool, server._spool_configured = None, False
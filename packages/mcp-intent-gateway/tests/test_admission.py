@@ -0,0 +1,118 @@
+"""Tests for admission control and load shedding."""
+
+import asyncio
+
+import pytest
+
+from mcp_intent_gateway import server
+from mcp_intent_gateway.admission import AdmissionController, Overloaded
+
+
+async def hold(admission: AdmissionController, release: asyncio.Event) -> None:
+    async with admission.admit():
+        await release.wait()
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController."""
+
+    @pytest.mark.asyncio
+    async def test_limits_in_flight_and_queues_fifo(self) -> None:
+        """Calls beyond the limit wait and are admitted in arrival order."""
+        admission = AdmissionController(max_in_flight=1, max_queue=2, queue_timeout=5)
+        release = asyncio.Event()
+        order: list[int] = []
+
+        async def queued(n: int) -> None:
+            async with admission.admit():
+                order.append(n)
+
+        holder = asyncio.create_task(hold(admission, release))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(queued(n)) for n in (1, 2)]
+        await asyncio.sleep(0)
+
+        assert admission.stats()["in_flight"] == 1
+        assert admission.queue_depth == 2
+
+        release.set()
+        await asyncio.gather(holder, *waiters)
+        assert order == [1, 2]
+        assert admission.stats()["in_flight"] == 0
+        assert admission.stats()["max_queue_depth"] == 2
+
+    @pytest.mark.asyncio
+    async def test_sheds_when_queue_full(self) -> None:
+        """A full queue rejects immediately."""
+        admission = AdmissionController(max_in_flight=1, max_queue=0)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(admission, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded):
+            await admission.acquire()
+
+        release.set()
+        await holder
+        assert admission.shed_queue_full == 1
+
+    @pytest.mark.asyncio
+    async def test_sheds_after_queue_deadline(self) -> None:
+        """A queued call gives up after queue_timeout and leaves the queue."""
+        admission = AdmissionController(max_in_flight=1, max_queue=5, queue_timeout=0.01)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(admission, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded) as excinfo:
+            await admission.acquire()
+
+        assert excinfo.value.retry_after == 0.01
+        assert admission.queue_depth == 0
+        release.set()
+        await holder
+        assert admission.stats()["in_flight"] == 0
+        assert admission.shed_deadline == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self) -> None:
+        """Cancelling a queued call keeps the accounting consistent."""
+        admission = AdmissionController(max_in_flight=1, max_queue=5, queue_timeout=5)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(admission, release))
+        await asyncio.sleep(0)
+
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert admission.stats()["in_flight"] == 0
+        assert admission.queue_depth == 0
+
+
+class TestLoadShedding:
+    """Tests for OVERLOADED results from process_canonical_fact."""
+
+    @pytest.mark.asyncio
+    async def test_shed_call_returns_overloaded_result(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A saturated gateway answers fast with OVERLOADED and a retry hint."""
+        server._admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=0.5)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(server._admission, release))
+        await asyncio.sleep(0)
+
+        result = await server.process_canonical_fact(["Gabriel"], "SLEEP_STATE", "ASLEEP")
+        release.set()
+        await holder
+
+        assert result["success"] is False
+        assert result["errors"][0]["code"] == "OVERLOADED"
+        assert result["retry_after_seconds"] == 0.5
+        health = await server.health_check()
+        assert health["admission"]["shed_queue_full"] == 1
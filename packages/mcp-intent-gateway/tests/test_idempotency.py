@@ -0,0 +1,162 @@
+"""Tests for idempotency keys and duplicate suppression."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+
+from mcp_intent_gateway import server
+from mcp_intent_gateway.clients.mock_backend import EventResponse
+from mcp_intent_gateway.idempotency import IdempotencyCache, compute_idempotency_key
+
+NOON = datetime(2024, 12, 24, 12, 0, 30, tzinfo=timezone.utc)
+
+
+class TestIdempotencyKey:
+    """Tests for compute_idempotency_key."""
+
+    def test_key_is_stable_within_bucket(self) -> None:
+        """Same contract in the same bucket, properties in any order: same key."""
+        a = compute_idempotency_key(1, "record_meal", {"a": 1, "b": 2}, NOON)
+        b = compute_idempotency_key(
+            1, "record_meal", {"b": 2, "a": 1}, NOON + timedelta(seconds=30)
+        )
+        assert a == b
+
+    def test_key_depends_on_contract_and_bucket(self) -> None:
+        """Child, action, properties and bucket all change the key."""
+        base = compute_idempotency_key(1, "record_meal", {"a": 1}, NOON)
+
+        assert base != compute_idempotency_key(2, "record_meal", {"a": 1}, NOON)
+        assert base != compute_idempotency_key(1, "record_sleep", {"a": 1}, NOON)
+        assert base != compute_idempotency_key(1, "record_meal", {"a": 2}, NOON)
+        assert base != compute_idempotency_key(
+            1, "record_meal", {"a": 1}, NOON + timedelta(minutes=5)
+        )
+        assert base == compute_idempotency_key(
+            1, "record_meal", {"a": 1}, NOON + timedelta(minutes=2), bucket_offset=-1
+        )
+
+
+class TestIdempotencyCache:
+    """Tests for IdempotencyCache."""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_returns_original_response(self) -> None:
+        """The second call with the same key does not record again."""
+        cache = IdempotencyCache()
+        record = AsyncMock(return_value={"success": True, "message": "first"})
+
+        first = await cache.run(["k"], record)
+        second = await cache.run(["k"], record)
+
+        assert first == ({"success": True, "message": "first"}, False)
+        assert second == ({"success": True, "message": "first"}, True)
+        assert record.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_share_one_write(self) -> None:
+        """A repeat arriving while the first write is in flight waits for it."""
+        cache = IdempotencyCache()
+        calls = 0
+
+        async def record() -> dict[str, Any]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"success": True}
+
+        results = await asyncio.gather(*(cache.run(["k"], record) for _ in range(3)))
+
+        assert calls == 1
+        assert [duplicate for _, duplicate in results] == [False, True, True]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_remembered(self) -> None:
+        """Failed writes can be retried."""
+        cache = IdempotencyCache()
+        record = AsyncMock(return_value={"success": False})
+
+        await cache.run(["k"], record)
+        _, duplicate = await cache.run(["k"], record)
+
+        assert duplicate is False
+        assert record.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_joined_failures_are_not_duplicates(self) -> None:
+        """A repeat that joins a failed in-flight write gets the failure, not a duplicate."""
+        cache = IdempotencyCache()
+
+        async def record() -> dict[str, Any]:
+            await asyncio.sleep(0.01)
+            return {"success": False}
+
+        results = await asyncio.gather(*(cache.run(["k"], record) for _ in range(3)))
+
+        assert [duplicate for _, duplicate in results] == [False, False, False]
+        assert cache.duplicates == 0
+
+    def test_entries_expire_and_are_bounded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Entries expire after the TTL; the oldest are evicted beyond max_entries."""
+        now = 1000.0
+        monkeypatch.setattr("mcp_intent_gateway.idempotency.time.monotonic", lambda: now)
+        cache = IdempotencyCache(ttl_seconds=10, max_entries=2)
+
+        for key in ("a", "b", "c"):
+            cache.put(key, {"success": True})
+        assert cache.get("a") is None
+        assert len(cache) == 2
+
+        now += 11
+        assert cache.get("c") is None
+        assert len(cache) == 0
+
+
+class TestDuplicateSuppression:
+    """Tests for duplicate suppression in process_canonical_fact."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_fact_is_recorded_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A repeated utterance returns the original response without a second write."""
+        monkeypatch.setenv("GATEWAY_SPOOL_PATH", "")  # Synchronous backend calls
+        add_event = AsyncMock(return_value=EventResponse(success=True, message="ok"))
+        monkeypatch.setattr(server.get_backend(), "add_event", add_event)
+        first = await server.process_canonical_fact(["Gabriel"], "MEAL_MAIN_CONSUMPTION", "ALL")
+        second = await server.process_canonical_fact(["Gabriel"], "MEAL_MAIN_CONSUMPTION", "ALL")
+        other = await server.process_canonical_fact(["Gabriel"], "MEAL_MAIN_CONSUMPTION", "HALF")
+
+        key = first["intent_contract"]["metadata"]["idempotency_key"]
+        assert add_event.await_count == 2
+        assert add_event.await_args_list[0].kwargs["idempotency_key"] == key
+        assert second["duplicate"] is True
+        assert second["intent_contract"] == first["intent_contract"]
+        assert other["duplicate"] is False
+
+    @pytest.mark.asyncio
+    async def test_key_is_sent_as_header(self) -> None:
+        """The backend receives the Idempotency-Key header."""
+        import httpx
+
+        seen: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, json={"message": "created"})
+
+        transport = httpx.MockTransport(handler)
+        original = httpx.AsyncClient.__init__
+
+        def patched(self: httpx.AsyncClient, *args: Any, **kwargs: Any) -> None:
+            original(self, *args, transport=transport, **kwargs)
+
+        with pytest.MonkeyPatch.context() as m:
+            m.setattr(httpx.AsyncClient, "__init__", patched)
+            response = await server.get_backend().add_event(
+                1, "record_meal", {"consumption": "ALL"}, idempotency_key="abc"
+            )
+
+        assert response.success
+        assert seen[0].headers["Idempotency-Key"] == "abc"
@@ -0,0 +1,133 @@
+"""Tests for queue-based, sampled logging."""
+
+import io
+import json
+import logging
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from mcp_intent_gateway.logging_config import (
+    SamplingFilter,
+    configure_logging,
+    parse_sample_rates,
+    stop_logging,
+)
+
+
+@pytest.fixture
+def restore_root_logger() -> Iterator[None]:
+    """configure_logging replaces the root handlers: put pytest's back afterwards."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def record(name: str, level: int) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, "message", None, None)
+
+
+class TestSamplingFilter:
+    """Tests for SamplingFilter."""
+
+    def test_warnings_are_always_kept(self) -> None:
+        """A zero rate drops successes but never warnings or errors."""
+        sampler = SamplingFilter(default_rate=0.0)
+
+        assert not sampler.filter(record("mcp_intent_gateway.server", logging.INFO))
+        assert sampler.filter(record("mcp_intent_gateway.server", logging.WARNING))
+        assert sampler.filter(record("mcp_intent_gateway.server", logging.ERROR))
+
+    def test_most_specific_logger_rate_applies(self) -> None:
+        """Per-logger rates cover child loggers and override the default."""
+        sampler = SamplingFilter(
+            default_rate=0.5,
+            rates=parse_sample_rates("mcp_intent_gateway=0, mcp_intent_gateway.spool=1"),
+        )
+
+        assert sampler.rate_for("mcp_intent_gateway.server") == 0.0
+        assert sampler.rate_for("mcp_intent_gateway.spool") == 1.0
+        assert sampler.rate_for("httpx") == 0.5
+        assert sampler.filter(record("mcp_intent_gateway.spool", logging.INFO))
+        assert not sampler.filter(record("mcp_intent_gateway.server", logging.INFO))
+
+
+class TestConfigureLogging:
+    """Tests for the queue handler and listener."""
+
+    @pytest.mark.usefixtures("restore_root_logger")
+    def test_json_records_are_formatted_off_thread(self) -> None:
+        """The listener thread writes the JSON; extras become JSON keys."""
+        written_on: list[str] = []
+        stream = io.StringIO()
+
+        class Stream(io.StringIO):
+            def write(self, text: str) -> int:
+                written_on.append(threading.current_thread().name)
+                return stream.write(text)
+
+        configure_logging(level="INFO", json_format=True, sample_rate=1.0, stream=Stream())
+        logging.getLogger("mcp_intent_gateway.server").info(
+            "Event recorded for %s", "Gabriel", extra={"trace_id": "abc"}
+        )
+        logging.getLogger("mcp_intent_gateway.server").debug("below the level")
+        stop_logging()
+
+        (line,) = stream.getvalue().splitlines()
+        entry = json.loads(line)
+        assert entry["message"] == "Event recorded for Gabriel"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "mcp_intent_gateway.server"
+        assert entry["trace_id"] == "abc"
+        assert written_on and threading.current_thread().name not in written_on
+
+    @pytest.mark.usefixtures("restore_root_logger")
+    def test_arguments_are_frozen_when_enqueued(self) -> None:
+        """Kept records capture their arguments at the call; dropped ones never format them."""
+        formatted: list[str] = []
+
+        class Subject:
+            def __init__(self, name: str) -> None:
+                self.name = name
+
+            def __str__(self) -> str:
+                formatted.append(self.name)
+                return self.name
+
+        stream = io.StringIO()
+        configure_logging(
+            level="INFO",
+            sample_rates={"mcp_intent_gateway.spool": 0.0},
+            stream=stream,
+        )
+        subjects = ["Gabriel"]
+        logging.getLogger("mcp_intent_gateway.server").info("Recorded for %s", subjects)
+        subjects.append("Léa")
+        logging.getLogger("mcp_intent_gateway.server").debug("%s", Subject("below the level"))
+        logging.getLogger("mcp_intent_gateway.spool").info("%s", Subject("sampled out"))
+        stop_logging()
+
+        assert "Recorded for ['Gabriel']" in stream.getvalue()
+        assert formatted == []
+
+    @pytest.mark.usefixtures("restore_root_logger")
+    def test_errors_only_with_sampled_successes(self) -> None:
+        """A zero sample rate keeps errors (with tracebacks) and drops successes."""
+        stream = io.StringIO()
+        configure_logging(level="INFO", json_format=False, sample_rate=0.0, stream=stream)
+        logger = logging.getLogger("mcp_intent_gateway.server")
+        logger.info("Event recorded")
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logger.exception("Unexpected error")
+        stop_logging()
+
+        output = stream.getvalue()
+        assert "Event recorded" not in output
+        assert "ERROR - Unexpected error" in output
+        assert "RuntimeError: boom" in output
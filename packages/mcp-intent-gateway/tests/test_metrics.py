@@ -0,0 +1,128 @@
+"""Tests for the metrics registry and gateway instrumentation."""
+
+from collections.abc import Iterator
+
+import pytest
+
+from mcp_intent_gateway import server
+from mcp_intent_gateway.metrics import REGISTRY, MetricsRegistry, StageTimer
+
+
+@pytest.fixture(autouse=True)
+def clear_registry() -> Iterator[None]:
+    """Metrics are process-global: start every test from zero."""
+    REGISTRY.clear()
+    yield
+    REGISTRY.clear()
+
+
+class TestMetricsRegistry:
+    """Tests for MetricsRegistry, Counter and Histogram."""
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        """Observations land in the first bucket whose bound is >= the value."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ("stage",), (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.labels("mapping").observe(value)
+
+        text = registry.render_prometheus()
+
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{stage="mapping",le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{stage="mapping",le="1"} 3' in text
+        assert 'latency_seconds_bucket{stage="mapping",le="+Inf"} 4' in text
+        assert 'latency_seconds_count{stage="mapping"} 4' in text
+        assert 'latency_seconds_sum{stage="mapping"} 2.65' in text
+
+    def test_snapshot_reports_bucket_quantiles(self) -> None:
+        """p50/p95/p99 are the upper bounds of the buckets holding them."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for _ in range(98):
+            histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+
+        snapshot = registry.snapshot()["latency_seconds"][""]
+
+        assert snapshot["count"] == 100
+        assert snapshot["p50"] == 0.1
+        assert snapshot["p99"] == 1.0
+        assert histogram.labels().quantile(1.0) == float("inf")
+
+    def test_counters_and_reregistration(self) -> None:
+        """Registering the same metric twice returns it; a conflicting definition fails."""
+        registry = MetricsRegistry()
+        counter = registry.counter("facts_total", "Facts", ("outcome",))
+        counter.labels("success").inc()
+        registry.counter("facts_total", "Facts", ("outcome",)).labels("success").inc(2)
+
+        assert registry.snapshot()["facts_total"] == {"success": 3.0}
+        assert 'facts_total{outcome="success"} 3' in registry.render_prometheus()
+        with pytest.raises(ValueError):
+            registry.histogram("facts_total", "Facts", ("outcome",))
+        with pytest.raises(ValueError):
+            counter.labels("success", "extra")
+
+    def test_stage_timer(self) -> None:
+        """Each started stage is observed once when the next one starts or on stop."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stages", ("stage",))
+        timer = StageTimer(histogram)
+        timer.start("validation")
+        timer.start("mapping")
+        timer.stop()
+        timer.stop()
+
+        assert set(timer.timings) == {"validation", "mapping"}
+        assert histogram.labels("validation").count == 1
+        assert histogram.labels("mapping").count == 1
+
+
+class TestGatewayMetrics:
+    """Tests for the gateway's stage histograms and get_metrics tool."""
+
+    @pytest.mark.asyncio
+    async def test_process_canonical_fact_records_stages_and_outcomes(self) -> None:
+        """Every stage reached is timed and every call is counted by outcome."""
+        await server.process_canonical_fact(["Gabriel"], "MEAL_MAIN_CONSUMPTION", "ALL")
+        await server.process_canonical_fact(["Gabriel"], "MEAL_MAIN_CONSUMPTION", "ALL")
+        await server.process_canonical_fact(["Gabriel"], "NOT_A_DIMENSION", "ALL")
+
+        result = await server.get_metrics()
+        stages = result["metrics"]["gateway_stage_seconds"]
+        outcomes = result["metrics"]["gateway_facts_total"]
+
+        assert stages["total"]["count"] == 3
+        assert stages["admission_wait"]["count"] == 3
+        assert stages["validation"]["count"] == 3
+        assert stages["child_resolution"]["count"] == 2
+        assert stages["mapping"]["count"] == 2
+        assert stages["spool_write"]["count"] == 2
+        assert outcomes == {"INVALID_DIMENSION": 1.0, "duplicate": 1.0, "success": 1.0}
+        assert 'gateway_facts_total{outcome="success"} 1' in result["prometheus"]
+
+    def test_failures_are_classified_by_error_code(self) -> None:
+        """A failed result counts under its error code even if it was marked duplicate."""
+        failed = {"success": False, "duplicate": True, "errors": [{"code": "BACKEND_ERROR"}]}
+
+        assert server._outcome(failed) == "BACKEND_ERROR"
+        assert server._outcome({"success": False}) == "error"
+        assert server._outcome({"success": True, "duplicate": True}) == "duplicate"
+        assert server._outcome({"success": True, "duplicate": False}) == "success"
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint(self) -> None:
+        """The HTTP app serves the Prometheus text on /metrics."""
+        import httpx
+
+        server.FACTS_TOTAL.labels("success").inc()
+        app = server.create_server().streamable_http_app()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+            response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'gateway_facts_total{outcome="success"} 1' in response.text
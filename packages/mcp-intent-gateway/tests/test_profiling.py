@@ -0,0 +1,107 @@
+"""Tests for on-demand profiling."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from mcp_intent_gateway import profiling, server
+
+
+@pytest.fixture
+def profile_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[Path]:
+    """Write profiles to a temporary directory and start without a window."""
+    monkeypatch.setenv(profiling.ENV_PROFILE_DIR, str(tmp_path))
+    profiling._session, profiling._last_result = None, None
+    yield tmp_path
+    if profiling._session is not None:
+        asyncio.run(profiling.stop_profiling())
+    profiling._last_result = None
+
+
+def busy_work(seconds: float) -> list[bytes]:
+    """Burn CPU and keep some allocations alive."""
+    kept = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        kept.append(bytes(1024))
+    return kept
+
+
+class TestProfilingTools:
+    """Tests for the start_profiling and stop_profiling tools."""
+
+    @pytest.mark.asyncio
+    async def test_window_writes_flame_graph_files(self, profile_dir: Path) -> None:
+        """CPU stacks and allocations of the window are written as collapsed stacks."""
+        started = await server.start_profiling(duration_seconds=30, interval_ms=2)
+        kept = busy_work(0.3)
+        with pytest.raises(RuntimeError, match="already running"):
+            await server.start_profiling()
+        result = await server.stop_profiling()
+
+        assert started["status"] == "running"
+        assert result["status"] == "stopped"
+        assert result["samples"] > 0
+        cpu = Path(result["files"]["cpu"]).read_text()
+        assert cpu.startswith("MainThread;")
+        assert "busy_work (test_profiling.py:" in cpu
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in cpu.splitlines())
+        assert "test_profiling.py:" in Path(result["files"]["allocations"]).read_text()
+        assert Path(result["files"]["allocation_sites"]).read_text().startswith("Top ")
+        assert Path(result["files"]["cpu"]).parent == profile_dir
+        assert kept
+
+    @pytest.mark.asyncio
+    async def test_window_expires_on_its_own(self, profile_dir: Path) -> None:
+        """An expired window stops sampling; stop_profiling returns its result."""
+        with pytest.raises(RuntimeError, match="not running"):
+            await server.stop_profiling()
+
+        await server.start_profiling(duration_seconds=0.05, trace_allocations=False)
+        await asyncio.sleep(0.2)
+
+        assert profiling._session is None
+        result = await server.stop_profiling()
+        assert set(result["files"]) == {"cpu"}
+        assert result["duration_seconds"] < 0.2
+
+    @pytest.mark.asyncio
+    async def test_files_are_written_off_the_event_loop(
+        self, profile_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The loop keeps serving while the window's files are written."""
+        loop_thread = threading.get_ident()
+        writer_threads = []
+        write = profiling.ProfilingSession._write
+
+        def slow_write(self: profiling.ProfilingSession, elapsed: float) -> dict[str, Any]:
+            writer_threads.append(threading.get_ident())
+            time.sleep(0.2)
+            return write(self, elapsed)
+
+        monkeypatch.setattr(profiling.ProfilingSession, "_write", slow_write)
+        await server.start_profiling(duration_seconds=30)
+        stopping = asyncio.create_task(server.stop_profiling())
+        ticks = 0
+        while not stopping.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        result = await stopping
+
+        assert writer_threads and writer_threads[0] != loop_thread
+        assert ticks >= 5
+        assert Path(result["files"]["allocations"]).exists()
+
+    @pytest.mark.asyncio
+    async def test_invalid_window_is_rejected(self, profile_dir: Path) -> None:
+        """Out-of-range durations and intervals are refused."""
+        with pytest.raises(ValueError, match="duration"):
+            await server.start_profiling(duration_seconds=3600)
+        with pytest.raises(ValueError, match="interval"):
+            await server.start_profiling(interval_ms=0)
+        assert profiling._session is None
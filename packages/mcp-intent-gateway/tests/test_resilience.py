@@ -0,0 +1,199 @@
+"""Tests for backend client resilience (timeouts, circuit breaker, cached health)."""
+
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+
+from mcp_intent_gateway.clients.mock_backend import EventResponse, MockBackendClient
+from mcp_intent_gateway.clients.resilience import BreakerState, CircuitBreaker, LatencyTracker
+
+
+class FakeClock:
+    """Replaces time.monotonic in the resilience module."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.now = 1000.0
+        monkeypatch.setattr(
+            "mcp_intent_gateway.clients.resilience.time.monotonic", lambda: self.now
+        )
+
+
+class TestLatencyTracker:
+    """Tests for LatencyTracker."""
+
+    def test_uses_max_timeout_until_enough_samples(self) -> None:
+        """Without history the conservative timeout applies."""
+        tracker = LatencyTracker(min_samples=5, max_timeout=30.0)
+        for _ in range(4):
+            tracker.record(0.01)
+        assert tracker.timeout() == 30.0
+
+    def test_timeout_follows_percentile(self) -> None:
+        """The timeout is the percentile times the multiplier, clamped."""
+        tracker = LatencyTracker(percentile=99, multiplier=3.0, min_timeout=0.5, min_samples=10)
+        for i in range(100):
+            tracker.record(0.1 + i * 0.01)  # 0.10 .. 1.09 s
+
+        assert tracker.quantile(50) == pytest.approx(0.59)
+        assert tracker.timeout() == pytest.approx(1.08 * 3)
+        assert tracker.snapshot()["p99_ms"] == pytest.approx(1080.0)
+
+        fast = LatencyTracker(min_timeout=0.5, min_samples=1)
+        fast.record(0.001)
+        assert fast.timeout() == 0.5
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def test_opens_after_threshold_and_fails_fast(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Consecutive failures open the breaker; requests are then rejected."""
+        FakeClock(monkeypatch)
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+
+        for _ in range(3):
+            assert breaker.allow_request()
+            breaker.record_failure()
+
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow_request()
+        assert breaker.snapshot()["rejected"] == 1
+
+    def test_half_open_trial(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """After reset_timeout a single trial decides between closed and open."""
+        clock = FakeClock(monkeypatch)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+
+        clock.now += 10
+        assert breaker.state == BreakerState.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()  # Only one trial in flight
+
+        breaker.record_failure()
+        assert breaker.snapshot()["state"] == "open"
+
+        clock.now += 10
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.snapshot()["state"] == "closed"
+        assert breaker.times_opened == 2
+
+
+class TestResilientBackendClient:
+    """Tests for MockBackendClient with breaker and cached health."""
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_http(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """While the breaker is open, add_event returns without calling the backend."""
+        client = MockBackendClient(breaker=CircuitBreaker(failure_threshold=2))
+        posts = 0
+
+        async def down(*args: Any) -> EventResponse:
+            nonlocal posts
+            posts += 1
+            return EventResponse(success=False, message="down", retryable=True)
+
+        monkeypatch.setattr(client, "_post_event", down)
+        for _ in range(5):
+            response = await client.add_event(1, "record_meal", {})
+
+        assert posts == 2
+        assert response.retryable and "circuit open" in response.message
+        assert client.health_report()["circuit_breaker"]["state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_open_breaker(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A 4xx means the backend is up."""
+        client = MockBackendClient(breaker=CircuitBreaker(failure_threshold=1))
+
+        async def bad_request(*args: Any) -> EventResponse:
+            return EventResponse(success=False, message="Backend error: 400")
+
+        monkeypatch.setattr(client, "_post_event", bad_request)
+        await client.add_event(1, "record_meal", {})
+
+        assert client.breaker.state == BreakerState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_health_check_is_cached(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Only the first health_check probes; later calls read the cached status."""
+        client = MockBackendClient(probe_interval=3600)
+        probes = 0
+
+        async def probe() -> bool:
+            nonlocal probes
+            probes += 1
+            client._healthy = True
+            return True
+
+        monkeypatch.setattr(client, "probe", probe)
+        assert await client.health_check() is True
+        assert await client.health_check() is True
+        await client.stop_health_probe()
+
+        assert probes == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_releases_half_open_breaker(self) -> None:
+        """A trial cancelled mid-request does not leave the breaker rejecting everything."""
+        client = MockBackendClient(breaker=CircuitBreaker(failure_threshold=1))
+        client.breaker.record_failure()
+        client.breaker.half_open()
+        started = asyncio.Event()
+
+        async def hang(*args: Any) -> EventResponse:
+            started.set()
+            await asyncio.sleep(3600)
+            raise AssertionError("unreachable")
+
+        with pytest.MonkeyPatch.context() as m:
+            m.setattr(client, "_post_event", hang)
+            trial = asyncio.create_task(client.add_event(1, "record_meal", {}))
+            await started.wait()
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+
+        assert client.breaker.state == BreakerState.HALF_OPEN
+        assert client.breaker.allow_request()
+
+    @pytest.mark.asyncio
+    async def test_requests_share_one_http_client(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """add_event and probe reuse a single connection pool."""
+        client = MockBackendClient()
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+        created = 0
+        original = httpx.AsyncClient.__init__
+
+        def patched(self: httpx.AsyncClient, *args: Any, **kwargs: Any) -> None:
+            nonlocal created
+            created += 1
+            original(self, *args, transport=transport, **kwargs)
+
+        monkeypatch.setattr(httpx.AsyncClient, "__init__", patched)
+        for _ in range(3):
+            assert (await client.add_event(1, "record_meal", {})).success
+        assert await client.probe() is True
+        await client.aclose()
+
+        assert created == 1
+
+    @pytest.mark.asyncio
+    async def test_successful_probe_half_opens_breaker(self) -> None:
+        """A recovered backend does not wait for the full reset timeout."""
+        client = MockBackendClient(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=3600))
+        client.breaker.record_failure()
+        transport = httpx.MockTransport(lambda request: httpx.Response(200))
+        original = httpx.AsyncClient.__init__
+
+        def patched(self: httpx.AsyncClient, *args: Any, **kwargs: Any) -> None:
+            original(self, *args, transport=transport, **kwargs)
+
+        with pytest.MonkeyPatch.context() as m:
+            m.setattr(httpx.AsyncClient, "__init__", patched)
+            assert await client.probe() is True
+
+        assert client.breaker.state == BreakerState.HALF_OPEN
@@ -1,5 +1,10 @@
 """Tests for MCP server tools."""
 
+import os
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 
 from mcp_intent_gateway.server import (
@@ -137,3 +142,128 @@ class TestHealthCheck:
         assert result["service"] == "mcp-intent-gateway"
         assert "backend_available" in result
         assert "backend_url" in result
+
+
+class TestLazyStartup:
+    """Tests for deferred server construction."""
+
+    def test_import_does_not_build_server(self) -> None:
+        """Importing the server module must not import mcp or build components."""
+        code = (
+            "import sys, mcp_intent_gateway.server as s; "
+            "print('mcp' in sys.modules, s._server is None, s._backend is None)"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            env={**os.environ, "PYTHONPATH": str(Path(__file__).parents[1] / "src")},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert proc.stdout.split() == ["False", "True", "True"]
+
+    @pytest.mark.asyncio
+    async def test_server_registers_all_tools(self) -> None:
+        """The lazily built FastMCP server exposes every gateway tool."""
+        from mcp_intent_gateway.server import get_server
+
+        tools = await get_server().list_tools()
+
+        assert [t.name for t in tools] == [
+            "process_canonical_fact",
+            "get_valid_dimensions",
+            "health_check",
+            "get_schema_hash",
+            "get_openai_tool_schema",
+            "get_metrics",
+            "start_profiling",
+            "stop_profiling",
+        ]
+
+
+class TestSchemaHash:
+    """Tests for the get_schema_hash tool."""
+
+    @pytest.mark.asyncio
+    async def test_hash_is_stable_across_processes(self) -> None:
+        """The hash depends only on the advertised schemas."""
+        from mcp_intent_gateway.server import get_schema_hash
+
+        result = await get_schema_hash()
+        proc = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "from mcp_intent_gateway.server import compute_schema_hash; "
+                "print(compute_schema_hash())",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert len(result["schema_hash"]) == 64
+        assert proc.stdout.strip() == result["schema_hash"]
+        assert "process_canonical_fact" in result["tools"]
+
+
+class TestInProcessCalls:
+    """Tests for direct (in-process) tool calls."""
+
+    @pytest.mark.asyncio
+    async def test_call_tool_in_process_returns_json_compatible_result(self) -> None:
+        """Results are identical to what the MCP server serializes."""
+        from mcp_intent_gateway.server import call_tool_in_process
+
+        result = await call_tool_in_process(
+            "process_canonical_fact",
+            {"subjects": ["Gabriel"], "dimension": "SLEEP_STATE", "value": "ASLEEP"},
+        )
+
+        assert result["success"] is True
+        assert isinstance(result["intent_contract"]["metadata"]["timestamp"], str)
+
+    @pytest.mark.asyncio
+    async def test_call_tool_in_process_errors(self) -> None:
+        """Unknown tools and invalid arguments raise ToolError like the server."""
+        from mcp.server.fastmcp.exceptions import ToolError
+
+        from mcp_intent_gateway.server import call_tool_in_process
+
+        with pytest.raises(ToolError, match="Unknown tool"):
+            await call_tool_in_process("nope", {})
+        with pytest.raises(ToolError):
+            await call_tool_in_process("process_canonical_fact", {"subjects": "Gabriel"})
+
+
+class TestNetworkTransport:
+    """Tests for the network transport options."""
+
+    def test_defaults_to_stdio(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Without flags or environment the gateway speaks stdio."""
+        from mcp_intent_gateway.server import parse_args
+
+        monkeypatch.delenv("GATEWAY_TRANSPORT", raising=False)
+        args = parse_args([])
+
+        assert args.transport == "stdio"
+        assert args.workers == 1
+
+    def test_environment_provides_defaults(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """GATEWAY_* variables configure the transport."""
+        from mcp_intent_gateway.server import parse_args
+
+        monkeypatch.setenv("GATEWAY_TRANSPORT", "streamable-http")
+        monkeypatch.setenv("GATEWAY_PORT", "4000")
+        monkeypatch.setenv("GATEWAY_WORKERS", "4")
+        args = parse_args([])
+
+        assert (args.transport, args.port, args.workers) == ("streamable-http", 4000, 4)
+
+    @pytest.mark.parametrize("transport", ["stdio", "sse"])
+    def test_workers_require_streamable_http(self, transport: str) -> None:
+        """Only the stateless HTTP transport can be shared between workers."""
+        from mcp_intent_gateway.server import parse_args
+
+        with pytest.raises(SystemExit):
+            parse_args(["--transport", transport, "--workers", "2"])
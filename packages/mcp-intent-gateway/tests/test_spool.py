@@ -0,0 +1,221 @@
+"""Tests for the durable event spool."""
+
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from mcp_intent_gateway import server
+from mcp_intent_gateway.clients.mock_backend import EventResponse, MockBackendClient
+from mcp_intent_gateway.metrics import REGISTRY
+from mcp_intent_gateway.models.intent_contract import IntentContract, IntentContractMetadata
+from mcp_intent_gateway.spool import DEAD_LETTERED, EventSpool, get_spool_path
+
+TIMESTAMP = datetime(2024, 12, 24, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeBackend(MockBackendClient):
+    """Records deliveries; responds with a configurable outcome."""
+
+    def __init__(self) -> None:
+        super().__init__(base_url="http://backend.invalid")
+        self.calls: list[dict[str, Any]] = []
+        self.response = EventResponse(success=True, message="created")
+
+    async def add_event(  # type: ignore[override]
+        self, child_id: int, action: str, properties: dict[str, Any], **kwargs: Any
+    ) -> EventResponse:
+        self.calls.append({"child_id": child_id, "action": action, **kwargs})
+        return self.response
+
+
+def contract(key: str, child_id: int = 1) -> IntentContract:
+    return IntentContract(
+        child_id=child_id,
+        action="record_meal",
+        properties={"main": "ALL"},
+        metadata=IntentContractMetadata(timestamp=TIMESTAMP, idempotency_key=key),
+    )
+
+
+@pytest.fixture
+def backend() -> FakeBackend:
+    return FakeBackend()
+
+
+@pytest.fixture
+def spool(tmp_path: Path, backend: FakeBackend) -> EventSpool:
+    return EventSpool(tmp_path / "spool.sqlite3", backend, base_backoff=0.0, max_backoff=0.0)
+
+
+class TestEventSpool:
+    """Tests for EventSpool."""
+
+    @pytest.mark.asyncio
+    async def test_append_survives_reopen(self, tmp_path: Path, backend: FakeBackend) -> None:
+        """Appended events are on disk, deduplicated by idempotency key."""
+        first = EventSpool(tmp_path / "spool.sqlite3", backend)
+        assert await first.append(contract("a")) is not None
+        assert await first.append(contract("a")) is None
+        first.close()
+
+        reopened = EventSpool(tmp_path / "spool.sqlite3", backend)
+        assert reopened.stats()["pending"] == 1
+
+    @pytest.mark.asyncio
+    async def test_older_spool_is_migrated(self, tmp_path: Path, backend: FakeBackend) -> None:
+        """Spools created before the traceparent column keep working."""
+        import sqlite3
+
+        path = tmp_path / "spool.sqlite3"
+        db = sqlite3.connect(path)
+        db.execute(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " idempotency_key TEXT UNIQUE, child_id INTEGER NOT NULL, action TEXT NOT NULL,"
+            " properties TEXT NOT NULL, timestamp TEXT NOT NULL, enqueued_at REAL NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL DEFAULT 0, lease_until REAL NOT NULL DEFAULT 0,"
+            " last_error TEXT)"
+        )
+        db.execute(
+            "INSERT INTO events (idempotency_key, child_id, action, properties, timestamp,"
+            " enqueued_at) VALUES ('old', 1, 'record_meal', '{}', '', 0)"
+        )
+        db.commit()
+        db.close()
+
+        spool = EventSpool(path, backend)
+        await spool.append(contract("new"))
+
+        assert await spool.drain_once() == 2
+        assert [c["traceparent"] for c in backend.calls] == [None, None]
+
+    @pytest.mark.asyncio
+    async def test_drain_keeps_timestamp_and_key(
+        self, spool: EventSpool, backend: FakeBackend
+    ) -> None:
+        """Delivered events carry their original timestamp and are removed."""
+        await spool.append(contract("a"))
+        await spool.append(contract("b", child_id=2))
+
+        assert await spool.drain_once() == 2
+        assert backend.calls[0]["timestamp"] == TIMESTAMP.isoformat()
+        assert [c["idempotency_key"] for c in backend.calls] == ["a", "b"]
+        assert spool.stats()["pending"] == 0
+        assert spool.stats()["delivered"] == 2
+
+    @pytest.mark.asyncio
+    async def test_retryable_failure_is_retried(
+        self, spool: EventSpool, backend: FakeBackend
+    ) -> None:
+        """Events stay spooled while the backend is down, then get delivered."""
+        backend.response = EventResponse(success=False, message="down", retryable=True)
+        await spool.append(contract("a"))
+
+        await spool.drain_once()
+        assert spool.stats()["pending"] == 1
+
+        backend.response = EventResponse(success=True, message="created")
+        await spool.drain_once()
+        assert spool.stats()["pending"] == 0
+        assert len(backend.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_rejected_event_is_dead_lettered(
+        self, spool: EventSpool, backend: FakeBackend
+    ) -> None:
+        """Non-retryable rejections are kept aside, not retried, and counted."""
+        REGISTRY.clear()
+        backend.response = EventResponse(success=False, message="Backend error: 400")
+        await spool.append(contract("a"))
+
+        await spool.drain_once()
+        await spool.drain_once()
+
+        assert spool.stats()["dead"] == 1
+        assert len(backend.calls) == 1
+        assert DEAD_LETTERED.labels().value == 1
+        REGISTRY.clear()
+
+    @pytest.mark.asyncio
+    async def test_workers_sharing_a_spool_claim_disjoint_events(
+        self, tmp_path: Path, backend: FakeBackend
+    ) -> None:
+        """A leased event is not sent by another worker."""
+        path = tmp_path / "spool.sqlite3"
+        worker_a = EventSpool(path, backend, batch_size=2)
+        worker_b = EventSpool(path, backend, batch_size=2)
+        for key in "abc":
+            await worker_a.append(contract(key))
+
+        claimed_a = worker_a._claim(1e12)
+        claimed_b = worker_b._claim(1e12)
+
+        assert len(claimed_a) == 2
+        assert {row[0] for row in claimed_a}.isdisjoint(row[0] for row in claimed_b)
+
+    @pytest.mark.asyncio
+    async def test_background_drainer(self, spool: EventSpool, backend: FakeBackend) -> None:
+        """The drainer delivers appended events without being polled."""
+        spool.start()
+        await spool.append(contract("a"))
+        for _ in range(100):
+            if backend.calls:
+                break
+            await asyncio.sleep(0.01)
+        await spool.stop()
+
+        assert len(backend.calls) == 1
+
+
+class TestSpooledProcessing:
+    """Tests for process_canonical_fact with the spool."""
+
+    def test_spooling_is_opt_in(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        """Without GATEWAY_SPOOL_PATH (or with it empty) the backend is called directly."""
+        monkeypatch.delenv("GATEWAY_SPOOL_PATH")
+        assert get_spool_path() is None
+        monkeypatch.setenv("GATEWAY_SPOOL_PATH", "")
+        assert get_spool_path() is None
+        monkeypatch.setenv("GATEWAY_SPOOL_PATH", str(tmp_path / "spool.sqlite3"))
+        assert get_spool_path() == tmp_path / "spool.sqlite3"
+
+    @pytest.mark.asyncio
+    async def test_lifespan_stops_and_closes_the_spool(self) -> None:
+        """Shutdown stops the drainer and closes the database; events stay on disk."""
+        async with server.lifespan(None):  # type: ignore[arg-type]
+            spool = server.get_spool()
+            assert spool is not None
+            assert spool.stats()["draining"] is True
+
+        assert server._spool is None
+        with pytest.raises(sqlite3.ProgrammingError):
+            spool.stats()
+
+    @pytest.mark.asyncio
+    async def test_acknowledged_without_backend(self) -> None:
+        """With the backend unreachable, the event is accepted and kept on disk."""
+        result = await server.process_canonical_fact(["Gabriel"], "SLEEP_STATE", "ASLEEP")
+        spool = server.get_spool()
+        assert spool is not None
+        await spool.stop()
+
+        assert result["success"] is True
+        assert "queued" in result["message"]
+        assert spool.stats()["pending"] == 1
+
+    @pytest.mark.asyncio
+    async def test_direct_mode_reports_unreachable_backend(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Without the spool, an unreachable backend is an error, not a fake success."""
+        monkeypatch.setenv("GATEWAY_SPOOL_PATH", "")
+        monkeypatch.setattr(server.get_backend(), "base_url", "http://127.0.0.1:9")
+
+        result = await server.process_canonical_fact(["Gabriel"], "SLEEP_STATE", "ASLEEP")
+
+        assert result["success"] is False
+        assert result["errors"][0]["code"] == "BACKEND_ERROR"
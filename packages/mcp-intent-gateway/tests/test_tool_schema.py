@@ -0,0 +1,63 @@
+"""Tests for the generated LLM tool schema."""
+
+from typing import Any
+
+import pytest
+
+from mcp_intent_gateway.domain.constants import DIMENSION_VALUES, Dimension
+from mcp_intent_gateway.domain.tool_schema import build_openai_tool_schema, build_parameters_schema
+
+
+def _walk_objects(schema: dict[str, Any]) -> list[dict[str, Any]]:
+    """Collect every object schema, including anyOf variants."""
+    found = [schema] if schema.get("type") == "object" else []
+    for child in schema.get("properties", {}).values():
+        found += _walk_objects(child)
+    for variant in schema.get("anyOf", []):
+        found += _walk_objects(variant)
+    if "items" in schema:
+        found += _walk_objects(schema["items"])
+    return found
+
+
+class TestToolSchema:
+    """Tests for build_openai_tool_schema."""
+
+    def test_one_variant_per_dimension(self) -> None:
+        """Each dimension variant lists exactly its own values."""
+        variants = build_parameters_schema()["properties"]["fact"]["anyOf"]
+
+        assert len(variants) == len(Dimension)
+        for variant, dimension in zip(variants, Dimension, strict=True):
+            assert variant["properties"]["dimension"]["enum"] == [dimension.value]
+            assert variant["properties"]["value"]["enum"] == DIMENSION_VALUES[dimension]
+
+    def test_strict_mode_compatible(self) -> None:
+        """Strict mode: all properties required, no extras, no defaults or oneOf."""
+        tool = build_openai_tool_schema()[0]["function"]
+        parameters = tool["parameters"]
+
+        assert tool["strict"] is True
+        for schema in _walk_objects(parameters):
+            assert schema["additionalProperties"] is False
+            assert set(schema["required"]) == set(schema["properties"])
+        assert "default" not in str(parameters)
+        assert "oneOf" not in str(parameters)
+
+    def test_invalid_pairs_are_rejected_by_schema(self) -> None:
+        """Pairs the gateway would reject cannot satisfy the schema."""
+        jsonschema = pytest.importorskip("jsonschema")
+        parameters = build_parameters_schema()
+
+        def is_valid(dimension: str, value: str) -> bool:
+            arguments = {
+                "subjects": ["Gabriel"],
+                "fact": {"dimension": dimension, "value": value},
+                "confidence": 1.0,
+            }
+            return bool(jsonschema.Draft202012Validator(parameters).is_valid(arguments))
+
+        assert is_valid("MEAL_MAIN_CONSUMPTION", "ALL")
+        assert not is_valid("MEAL_MAIN_CONSUMPTION", "HALF_EATEN")
+        assert not is_valid("MEAL_TYPE", "ALL")
+        assert not is_valid("NAP", "ASLEEP")
@@ -0,0 +1,165 @@
+"""Tests for trace context propagation and span export."""
+
+import json
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+
+from mcp_intent_gateway import server
+from mcp_intent_gateway.tracing import (
+    JsonLinesSpanExporter,
+    Span,
+    format_traceparent,
+    get_span_exporter,
+    parse_traceparent,
+    set_span_exporter,
+    start_span,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def trace_file(tmp_path: Path) -> Iterator[Path]:
+    """Export spans to a JSON-lines file for the duration of the test."""
+    path = tmp_path / "spans.jsonl"
+    set_span_exporter(JsonLinesSpanExporter(path))
+    yield path
+    set_span_exporter(None)
+
+
+def read_spans(path: Path) -> list[dict[str, Any]]:
+    exporter = get_span_exporter()
+    if exporter is not None:
+        exporter.flush()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestTraceContext:
+    """Tests for traceparent handling and start_span."""
+
+    def test_traceparent_round_trip(self) -> None:
+        """Well-formed values parse; malformed ones start a new trace."""
+        value = format_traceparent(TRACE_ID, PARENT_SPAN_ID)
+
+        assert value == f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"
+        assert parse_traceparent(value) == (TRACE_ID, PARENT_SPAN_ID)
+        assert parse_traceparent("00-xyz-123-01") is None
+        assert parse_traceparent(None) is None
+
+    def test_spans_are_exported_with_parent_and_status(self, trace_file: Path) -> None:
+        """Child spans join the parent trace; a raising block is marked as an error."""
+        with start_span("ok", format_traceparent(TRACE_ID, PARENT_SPAN_ID), answer=42):
+            pass
+        with pytest.raises(RuntimeError), start_span("failing"):
+            raise RuntimeError("boom")
+
+        ok, failing = read_spans(trace_file)
+
+        assert ok["trace_id"] == TRACE_ID
+        assert ok["parent_span_id"] == PARENT_SPAN_ID
+        assert ok["attributes"] == {"answer": 42}
+        assert ok["status"] == "ok"
+        assert ok["duration_ms"] >= 0
+        assert failing["trace_id"] != TRACE_ID
+        assert failing["parent_span_id"] is None
+        assert failing["status"] == "error"
+
+    def test_spans_are_written_off_the_calling_thread(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        """export() only queues; the writer thread appends every span before shutdown returns."""
+        exporter = JsonLinesSpanExporter(tmp_path / "spans.jsonl", max_batch=16)
+        writers = set()
+        original = Span.model_dump_json
+
+        def recording(self: Span, **kwargs: Any) -> str:
+            writers.add(threading.current_thread().name)
+            return original(self, **kwargs)
+
+        monkeypatch.setattr(Span, "model_dump_json", recording)
+        for i in range(100):
+            exporter.export(Span(trace_id=TRACE_ID, span_id=f"{i:016x}", name="span"))
+        exporter.shutdown()
+
+        spans = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+        assert [span["span_id"] for span in spans] == [f"{i:016x}" for i in range(100)]
+        assert writers == {"span-exporter"}
+
+
+class TestGatewayTracing:
+    """Tests for trace propagation through process_canonical_fact."""
+
+    @pytest.mark.asyncio
+    async def test_trace_reaches_contract_and_backend(
+        self, monkeypatch: pytest.MonkeyPatch, trace_file: Path
+    ) -> None:
+        """The inbound traceparent links the gateway span, the contract and the backend POST."""
+        monkeypatch.setenv("GATEWAY_SPOOL_PATH", "")
+        server._spool, server._spool_configured = None, False
+        seen: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, json={"message": "created"})
+
+        transport = httpx.MockTransport(handler)
+        original = httpx.AsyncClient.__init__
+
+        def patched(self: httpx.AsyncClient, *args: Any, **kwargs: Any) -> None:
+            original(self, *args, transport=transport, **kwargs)
+
+        monkeypatch.setattr(httpx.AsyncClient, "__init__", patched)
+        result = await server.call_tool_in_process(
+            "process_canonical_fact",
+            {"subjects": ["Gabriel"], "dimension": "SLEEP_STATE", "value": "ASLEEP"},
+            meta={"traceparent": format_traceparent(TRACE_ID, PARENT_SPAN_ID)},
+        )
+
+        backend_span, gateway_span = read_spans(trace_file)
+        metadata = result["intent_contract"]["metadata"]
+
+        assert result["success"]
+        assert gateway_span["name"] == "process_canonical_fact"
+        assert gateway_span["parent_span_id"] == PARENT_SPAN_ID
+        assert gateway_span["attributes"]["outcome"] == "success"
+        assert set(gateway_span["attributes"]["stages_ms"]) >= {"validation", "backend_write"}
+        assert metadata["trace_id"] == TRACE_ID
+        assert metadata["span_id"] == gateway_span["span_id"]
+        assert backend_span["name"] == "backend.add_event"
+        assert backend_span["parent_span_id"] == gateway_span["span_id"]
+        assert seen[0].headers["traceparent"] == format_traceparent(
+            TRACE_ID, backend_span["span_id"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_spooled_events_keep_their_trace(self) -> None:
+        """Delivery from the spool is traced as a child of the original gateway span."""
+        traceparent = format_traceparent(TRACE_ID, PARENT_SPAN_ID)
+        result = await server.call_tool_in_process(
+            "process_canonical_fact",
+            {"subjects": ["Gabriel"], "dimension": "SLEEP_STATE", "value": "ASLEEP"},
+            meta={"traceparent": traceparent},
+        )
+        spool = server.get_spool()
+        assert spool is not None
+        await spool.stop()
+
+        sent: list[str | None] = []
+
+        async def add_event(*args: Any, traceparent: str | None = None, **kwargs: Any) -> Any:
+            from mcp_intent_gateway.clients.mock_backend import EventResponse
+
+            sent.append(traceparent)
+            return EventResponse(success=True, message="created")
+
+        spool.backend.add_event = add_event  # type: ignore[method-assign]
+        await spool.drain_once()
+
+        metadata = result["intent_contract"]["metadata"]
+        assert sent == [format_traceparent(TRACE_ID, metadata["span_id"])]
@@ -4,7 +4,10 @@ Build ChromaDB collection for semantic compatibility rules.
 import json
 import os
 import chromadb
-from chromadb.utils import embedding_functions
+
+# Embedding backends live in the semantic-normalization package so that
+# builders and retrievers are guaranteed to share the same implementation.
+from semantic_normalization.embeddings import get_embedding_backend, METADATA_SPACE_KEY
 
 # Configuration
 COMPATIBILITY_PATH = os.path.join(os.path.dirname(__file__), "../data/semantic_compatibility.json")
@@ -18,19 +21,17 @@ def load_compatibility_rules():
         return json.load(f)
 
 
-def init_db():
+def init_db(db_path=VECTOR_DB_PATH):
     """Initialize compatibility rules collection"""
-    print(f"Initializing Compatibility Rules at {VECTOR_DB_PATH}...")
+    print(f"Initializing Compatibility Rules at {db_path}...")
 
     # Ensure dist directory exists
-    os.makedirs(os.path.dirname(VECTOR_DB_PATH), exist_ok=True)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
-    client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
+    client = chromadb.PersistentClient(path=db_path)
 
-    # CRITICAL: Use SAME embedding function as lexical RAG
-    ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="paraphrase-multilingual-MiniLM-L12-v2"
-    )
+    # CRITICAL: Use SAME embedding backend as lexical RAG
+    backend = get_embedding_backend()
 
     # Delete existing collection
     try:
@@ -39,7 +40,11 @@ def init_db():
     except Exception:
         pass
 
-    collection = client.create_collection(name=COLLECTION_NAME, embedding_function=ef)
+    collection = client.create_collection(
+        name=COLLECTION_NAME,
+        embedding_function=None,
+        metadata={METADATA_SPACE_KEY: backend.space},
+    )
 
     rules_data = load_compatibility_rules()
 
@@ -93,12 +98,13 @@ def init_db():
     # Add to collection
     collection.add(
         documents=documents,
+        embeddings=backend.embed(documents),
         metadatas=metadatas,
         ids=ids
     )
 
     print(f"Successfully embedded {count} compatibility rules into '{COLLECTION_NAME}'.")
-    print(f"Database ready at {VECTOR_DB_PATH}")
+    print(f"Database ready at {db_path}")
 
 
 if __name__ == "__main__":
@@ -5,7 +5,10 @@ Reads the initial lexicon and embeds it into a ChromaDB persistent store.
 import json
 import os
 import chromadb
-from chromadb.utils import embedding_functions
+
+# Embedding backends live in the semantic-normalization package so that
+# builders and retrievers are guaranteed to share the same implementation.
+from semantic_normalization.embeddings import get_embedding_backend, METADATA_SPACE_KEY
 
 # Configuration
 LEXICON_PATH = os.path.join(os.path.dirname(__file__), "../data/initial_lexicon.json")
@@ -17,17 +20,17 @@ def load_lexicon():
     with open(LEXICON_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def init_db():
+def init_db(db_path=VECTOR_DB_PATH):
     """Initialize ChromaDB and populate it"""
-    print(f"Initializing Vector DB at {VECTOR_DB_PATH}...")
+    print(f"Initializing Vector DB at {db_path}...")
     
     # Ensure dist directory exists
-    os.makedirs(os.path.dirname(VECTOR_DB_PATH), exist_ok=True)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
-    client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
+    client = chromadb.PersistentClient(path=db_path)
     
-    # Use multilingual model for better French support
-    ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name="paraphrase-multilingual-MiniLM-L12-v2")
+    # Backend selected by EMBEDDING_BACKEND (multilingual MiniLM by default for French support)
+    backend = get_embedding_backend()
     
     # Get or create collection
     try:
@@ -36,7 +39,11 @@ def init_db():
     except Exception:
         pass
         
-    collection = client.create_collection(name=COLLECTION_NAME, embedding_function=ef)
+    collection = client.create_collection(
+        name=COLLECTION_NAME,
+        embedding_function=None,
+        metadata={METADATA_SPACE_KEY: backend.space},
+    )
 
     lexicon = load_lexicon()
     
@@ -61,12 +68,13 @@ def init_db():
     # Add to collection in batches to be safe, though volume is low here
     collection.add(
         documents=documents,
+        embeddings=backend.embed(documents),
         metadatas=metadatas,
         ids=ids
     )
     
     print(f"Successfully embedded {count} items into '{COLLECTION_NAME}'.")
-    print(f"Database ready at {VECTOR_DB_PATH}")
+    print(f"Database ready at {db_path}")
 
 if __name__ == "__main__":
     # Build lexical RAG collection
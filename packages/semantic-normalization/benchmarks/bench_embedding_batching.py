@@ -0,0 +1,174 @@
+"""
+Micro-batching benchmark: per-request encoding vs MicroBatchingBackend.
+
+C client threads each encode single lexicon phrases back to back (as
+concurrent requests do in the retrievers). "direct" calls the backend from
+every thread; "batched" goes through a MicroBatchingBackend. Reported per
+mode and concurrency: encodes/s over the run, p50 and p99 request latency,
+and the mean texts per encoder call.
+
+The "synthetic" backend is a numpy stand-in with a transformer's cost
+profile (per-call overhead, then matrix products over batch x tokens), for
+machines without the model; the hashing backend has no per-call overhead
+to amortize and shows no gain.
+
+Usage:
+    python benchmarks/bench_embedding_batching.py                        # synthetic
+    python benchmarks/bench_embedding_batching.py --backend sentence-transformers
+    python benchmarks/bench_embedding_batching.py --concurrency 1 8 32 --wait-ms 1 5
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src")
+sys.path.insert(0, SRC_DIR)
+
+from bench_embeddings import load_phrases  # noqa: E402
+from semantic_normalization.embeddings import (  # noqa: E402
+    EmbeddingBackend,
+    MicroBatchingBackend,
+    get_embedding_backend,
+)
+
+BACKENDS = ["synthetic", "hashing", "sentence-transformers", "onnx"]
+
+
+class SyntheticEncoder(EmbeddingBackend):
+    """Numpy stand-in for MiniLM: tokenization, then MLP layers over every token."""
+
+    name = "synthetic"
+
+    def __init__(self, layers: int = 4, width: int = 384, tokens: int = 16):
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        scale = 1 / np.sqrt(width)
+        self.tokens = tokens
+        self.width = width
+        self.vocabulary = rng.standard_normal((4096, width)).astype(np.float32)
+        self.layers = [
+            (
+                (rng.standard_normal((width, 2 * width)) * scale).astype(np.float32),
+                (rng.standard_normal((2 * width, width)) * scale).astype(np.float32),
+            )
+            for _ in range(layers)
+        ]
+
+    @property
+    def space(self) -> str:
+        return "synthetic"
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        import numpy as np
+
+        ids = np.zeros((len(texts), self.tokens), dtype=np.int64)
+        for row, text in enumerate(texts):
+            pieces = [text[i:i + 3] for i in range(0, len(text), 3)][:self.tokens]
+            ids[row, :len(pieces)] = [hash(piece) % len(self.vocabulary) for piece in pieces]
+        x = self.vocabulary[ids].reshape(-1, self.width)
+        for up, down in self.layers:
+            x = x + np.maximum(x @ up, 0) @ down
+        return x.reshape(len(texts), self.tokens, self.width).mean(axis=1).tolist()
+
+
+class CountingBackend(EmbeddingBackend):
+    """Counts encoder calls and texts."""
+
+    name = "counting"
+
+    def __init__(self, backend: EmbeddingBackend):
+        self.backend = backend
+        self.calls = 0
+        self.texts = 0
+
+    @property
+    def space(self) -> str:
+        return self.backend.space
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        self.texts += len(texts)
+        return self.backend.embed(texts)
+
+
+def run_clients(backend: EmbeddingBackend, phrases: list[str], concurrency: int, requests: int) -> dict:
+    """C threads, `requests` single-phrase encodes each; latencies in ms."""
+    latencies: list[float] = []
+    start = threading.Barrier(concurrency + 1)
+
+    def client(offset: int):
+        own = []
+        start.wait()
+        for i in range(requests):
+            phrase = phrases[(offset + i) % len(phrases)]
+            t = time.perf_counter()
+            backend.embed([phrase])
+            own.append((time.perf_counter() - t) * 1000)
+        latencies.extend(own)
+
+    threads = [threading.Thread(target=client, args=(c * requests,)) for c in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "encodes_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="synthetic", choices=BACKENDS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[2.0],
+                        help="MicroBatchingBackend max wait(s) to compare")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="Encodes per client thread")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    args = parser.parse_args()
+
+    inner = SyntheticEncoder() if args.backend == "synthetic" else get_embedding_backend(args.backend)
+    phrases = load_phrases()
+    inner.embed(phrases[:8])  # Load the model outside the measurements
+
+    modes = [("direct", None)] + [(f"batched {wait:g}ms", wait) for wait in args.wait_ms]
+    if not args.json:
+        header = f"{'concurrency':>11}  {'mode':<16}{'encodes/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'texts/call':>12}"
+        print(f"backend: {args.backend}, batch size <= {args.batch_size}")
+        print(header)
+        print("-" * len(header))
+    for concurrency in args.concurrency:
+        for mode, wait in modes:
+            counting = CountingBackend(inner)
+            backend = counting if wait is None else MicroBatchingBackend(counting, wait, args.batch_size)
+            result = run_clients(backend, phrases, concurrency, args.requests)
+            if isinstance(backend, MicroBatchingBackend):
+                backend.close()
+            result.update({
+                "concurrency": concurrency,
+                "mode": mode,
+                "texts_per_call": round(counting.texts / max(counting.calls, 1), 2),
+            })
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(
+                    f"{concurrency:>11}  {mode:<16}{result['encodes_per_s']:>11}{result['p50_ms']:>9}"
+                    f"{result['p99_ms']:>9}{result['texts_per_call']:>12}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Embedding backend benchmark: encode latency and memory per backend.
+
+Each backend runs in its own subprocess so load time and peak RSS are not
+polluted by the other backends.
+
+Usage:
+    python benchmarks/bench_embeddings.py                      # all available backends
+    python benchmarks/bench_embeddings.py --backends hashing onnx
+    EMBEDDING_ONNX_DIR=models/minilm-onnx EMBEDDING_ONNX_INT8=1 python benchmarks/bench_embeddings.py
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src")
+LEXICON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../rag-knowledge-base/data/initial_lexicon.json",
+)
+BACKENDS = ["hashing", "sentence-transformers", "onnx"]
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def load_phrases() -> list[str]:
+    with open(LEXICON_PATH, "r", encoding="utf-8") as f:
+        lexicon = json.load(f)
+    return [p for mapping in lexicon.values() for phrases in mapping.values() for p in phrases]
+
+
+def run_backend(name: str, repeats: int) -> dict:
+    """Measure one backend in the current process."""
+    sys.path.insert(0, SRC_DIR)
+    rss_start = _max_rss_mb()
+
+    t0 = time.perf_counter()
+    from semantic_normalization.embeddings import get_embedding_backend
+    backend = get_embedding_backend(name)
+    backend.embed(["warm-up"])
+    load_s = time.perf_counter() - t0
+
+    phrases = load_phrases()
+    latencies = []
+    for _ in range(repeats):
+        for phrase in phrases:
+            t = time.perf_counter()
+            backend.embed([phrase])
+            latencies.append((time.perf_counter() - t) * 1000)
+    latencies.sort()
+
+    t = time.perf_counter()
+    for _ in range(repeats):
+        backend.embed(phrases)
+    batch_s = (time.perf_counter() - t) / repeats
+
+    return {
+        "backend": name,
+        "load_s": round(load_s, 3),
+        "single_p50_ms": round(statistics.median(latencies), 3),
+        "single_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+        "batch_texts_per_s": round(len(phrases) / batch_s, 1),
+        "rss_delta_mb": round(_max_rss_mb() - rss_start, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.repeats)))
+        return
+
+    header = f"{'backend':<24}{'load s':>9}{'p50 ms':>9}{'p99 ms':>9}{'batch/s':>11}{'RSS MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for name in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", name, "--repeats", str(args.repeats)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            reason = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+            print(f"{name:<24}unavailable: {reason}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(
+            f"{r['backend']:<24}{r['load_s']:>9}{r['single_p50_ms']:>9}"
+            f"{r['single_p99_ms']:>9}{r['batch_texts_per_s']:>11}{r['rss_delta_mb']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Gateway throughput over streamable HTTP as a function of uvicorn workers.
+
+Starts `python -m mcp_intent_gateway.server --transport streamable-http
+--workers N` on a free port for each N, drives it with K concurrent client
+sessions (IntentGatewayClient transport="http") and reports facts/sec.
+
+The fact is rejected at validation, so the numbers measure transport,
+framing and gateway CPU rather than the backend.
+
+Usage:
+    python benchmarks/bench_gateway_http.py
+    python benchmarks/bench_gateway_http.py --workers 1 2 4 --sessions 8 --calls 2000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NORMALIZATION_SRC = os.path.abspath(os.path.join(HERE, "../src"))
+GATEWAY_SRC = os.path.abspath(os.path.join(HERE, "../../mcp-intent-gateway/src"))
+sys.path[:0] = [NORMALIZATION_SRC, GATEWAY_SRC]
+
+import httpx  # noqa: E402
+
+from semantic_normalization.mcp_client import IntentGatewayClient  # noqa: E402
+
+FACT = {"subjects": ["Gabriel"], "dimension": "MEAL_MAIN_CONSUMPTION", "value": "HALF_EATEN"}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gateway(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([GATEWAY_SRC, os.environ.get("PYTHONPATH", "")])}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mcp_intent_gateway.server", "--transport", "streamable-http",
+         "--port", str(port), "--workers", str(workers)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/mcp", timeout=0.2)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Gateway with {workers} worker(s) did not start")
+
+
+async def measure(url: str, sessions: int, calls: int) -> float:
+    async with IntentGatewayClient(transport="http", url=url, pool_size=sessions, health_check_interval=None) as client:
+        for _ in range(sessions * 5):  # Warm-up: every worker imports and maps once
+            await client.execute_tool_call("process_canonical_fact", FACT)
+
+        semaphore = asyncio.Semaphore(sessions * 2)
+
+        async def one():
+            async with semaphore:
+                await client.execute_tool_call("process_canonical_fact", FACT)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(calls)))
+        return calls / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent client sessions")
+    parser.add_argument("--calls", type=int, default=1000)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    print(f"{'workers':>8}{'sessions':>10}{'facts/s':>10}")
+    for workers in args.workers:
+        port = free_port()
+        gateway = start_gateway(workers, port)
+        try:
+            rate = asyncio.run(measure(f"http://127.0.0.1:{port}/mcp", args.sessions, args.calls))
+        finally:
+            gateway.terminate()
+            gateway.wait(timeout=10)
+        print(f"{workers:>8}{args.sessions:>10}{rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Per-fact overhead of the gateway transports: stdio subprocess vs in-process.
+
+Two facts are measured through IntentGatewayClient.execute_tool_call:
+- rejected: invalid value, stops at validation (transport + framing cost only)
+- accepted: valid fact, goes through mapping and the backend client
+  (unreachable backend by default, so this includes a refused connection)
+
+Usage:
+    python benchmarks/bench_gateway_transport.py
+    python benchmarks/bench_gateway_transport.py --calls 2000 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NORMALIZATION_SRC = os.path.abspath(os.path.join(HERE, "../src"))
+GATEWAY_SRC = os.path.abspath(os.path.join(HERE, "../../mcp-intent-gateway/src"))
+sys.path[:0] = [NORMALIZATION_SRC, GATEWAY_SRC]
+
+from semantic_normalization.mcp_client import IntentGatewayClient  # noqa: E402
+
+FACTS = {
+    "rejected": {"subjects": ["Gabriel"], "dimension": "MEAL_MAIN_CONSUMPTION", "value": "HALF_EATEN"},
+    "accepted": {"subjects": ["Gabriel"], "dimension": "MEAL_MAIN_CONSUMPTION", "value": "ALL"},
+}
+
+
+async def measure(client: IntentGatewayClient, arguments: dict, calls: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            t = time.perf_counter()
+            await client.execute_tool_call("process_canonical_fact", arguments)
+            latencies.append((time.perf_counter() - t) * 1e6)
+
+    for _ in range(min(50, calls)):  # Warm-up
+        await client.execute_tool_call("process_canonical_fact", arguments)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "p50_us": statistics.median(latencies),
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1],
+        "facts_per_s": calls / elapsed,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    # Silence per-call logs: they would dominate the in-process numbers
+    import logging
+    logging.disable(logging.WARNING)
+
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([GATEWAY_SRC, os.environ.get("PYTHONPATH", "")])}
+
+    print(f"{'transport':<12}{'fact':<10}{'p50 us':>10}{'p99 us':>10}{'facts/s':>10}")
+    for transport in ("stdio", "inprocess"):
+        client = IntentGatewayClient(transport=transport, env=env, health_check_interval=None)
+        async with client:
+            for fact_name, arguments in FACTS.items():
+                r = await measure(client, arguments, args.calls, args.concurrency)
+                print(
+                    f"{transport:<12}{fact_name:<10}{r['p50_us']:>10.0f}"
+                    f"{r['p99_us']:>10.0f}{r['facts_per_s']:>10.0f}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
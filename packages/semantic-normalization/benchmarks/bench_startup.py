@@ -0,0 +1,116 @@
+"""
+Startup benchmark for the per-process entry points.
+
+Measures, in fresh interpreters, the cost paid before useful work starts:
+- gateway: import mcp_intent_gateway.server and build the FastMCP server
+  (everything `python -m mcp_intent_gateway.server` does before serving stdio)
+- cli: `python -m semantic_normalization.cli` up to argument handling
+
+For each target it reports the median wall time over several runs and the
+imports (by self time) from `-X importtime`.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --save benchmarks/baselines/startup.json
+    python benchmarks/bench_startup.py --compare benchmarks/baselines/startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NORMALIZATION_SRC = os.path.abspath(os.path.join(HERE, "../src"))
+GATEWAY_SRC = os.path.abspath(os.path.join(HERE, "../../mcp-intent-gateway/src"))
+
+TARGETS = {
+    "gateway": [
+        "-c",
+        "import mcp_intent_gateway.server as s; s.get_server()",
+    ],
+    "cli": ["-m", "semantic_normalization.cli"],
+}
+
+# Fail --compare when a target is this much slower than its baseline
+REGRESSION_TOLERANCE = 0.25
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    paths = [NORMALIZATION_SRC, GATEWAY_SRC, env.get("PYTHONPATH", "")]
+    env["PYTHONPATH"] = os.pathsep.join(p for p in paths if p)
+    return env
+
+
+def wall_time(args: list[str], runs: int) -> float:
+    """Median wall time in ms of running the interpreter with args."""
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, *args], env=_env(), capture_output=True)
+        samples.append((time.perf_counter() - t) * 1000)
+    return statistics.median(samples)
+
+
+def import_profile(args: list[str], top: int) -> tuple[float, list[tuple[str, float]]]:
+    """Total import time and modules with the highest self time (ms) from -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], env=_env(), capture_output=True, text=True
+    )
+    total_ms = 0.0
+    heaviest = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        heaviest.append((name.strip(), int(self_us) / 1000))
+        # Top-level imports are indented by a single space
+        if name.startswith(" ") and not name.startswith("  "):
+            total_ms += int(cumulative) / 1000
+    heaviest.sort(key=lambda item: item[1], reverse=True)
+    return total_ms, heaviest[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--save", help="Write results as a JSON baseline")
+    parser.add_argument("--compare", help="Compare against a JSON baseline, exit 1 on regression")
+    args = parser.parse_args()
+
+    results = {}
+    for name, target_args in TARGETS.items():
+        wall_ms = wall_time(target_args, args.runs)
+        import_ms, heaviest = import_profile(target_args, args.top)
+        results[name] = {"wall_ms": round(wall_ms, 1), "import_ms": round(import_ms, 1)}
+
+        print(f"[{name}] wall {wall_ms:.1f} ms, imports {import_ms:.1f} ms")
+        for module, ms in heaviest:
+            print(f"    {ms:9.1f} ms  {module}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressed = False
+        for name, current in results.items():
+            if name not in baseline:
+                continue
+            ratio = current["wall_ms"] / baseline[name]["wall_ms"]
+            status = "REGRESSION" if ratio > 1 + REGRESSION_TOLERANCE else "ok"
+            regressed |= status != "ok"
+            print(f"{name:<10}{baseline[name]['wall_ms']:>10.1f} -> {current['wall_ms']:>8.1f} ms  ({ratio:.2f}x) {status}")
+        sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
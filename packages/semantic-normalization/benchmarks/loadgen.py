@@ -0,0 +1,735 @@
+"""
+Offline load generator for capacity planning.
+
+Replays an utterance corpus through the full normalizer -> gateway ->
+backend path without OpenAI quota or the Node backend:
+
+- LLM: a local OpenAI-compatible server (POST /v1/chat/completions,
+  GET /v1/models/{model}) answering from the corpus answer key after a
+  sampled latency. The normalizer reaches it through the real OpenAI
+  client (OPENAI_BASE_URL), so HTTP and JSON costs are included.
+- Gateway: in-process (IntentGatewayClient transport="inprocess"), with
+  its real validation, mapping, duplicate suppression, admission control
+  and circuit breaker.
+- Backend: MockBackendClient with the HTTP POST replaced by a sampled
+  latency and a configurable failure rate.
+- RAG: the configured vector retrievers (--rag real, needs the embedding
+  model) or a stub with a sampled latency (--rag stub).
+
+Corpus: the STT mock's sample-utterances.ts (expected facts from its
+section comments) and the TEST_CASES of src/test_semantic_normalization.py.
+Subject names are replaced by children of the modelled nursery, so
+duplicate suppression sees realistic keys.
+
+Load model: N rooms x M children, each child producing K utterances over
+a meal-time peak of P minutes (mostly meal events, see --meal-share).
+Open-loop Poisson arrivals are offered at multiples of that rate (--sweep)
+and latency is measured from the scheduled arrival, so queueing behind a
+saturated stage is counted. A step is saturated when p95 latency exceeds
+--slo or throughput falls below 90% of the offered rate; the report gives
+the last sustainable rate and the number of rooms it supports.
+--concurrency C runs a closed loop instead (C utterances in flight).
+
+Latency specs (milliseconds): "fixed:300", "uniform:200,800",
+"lognormal:600,0.5" (median, sigma), "exp:400" (mean).
+
+Usage:
+    python benchmarks/loadgen.py --rag stub
+    python benchmarks/loadgen.py --rooms 20 --children 15 --sweep 1 5 10 20 50 --duration 30
+    python benchmarks/loadgen.py --rag stub --concurrency 8 --requests 400
+    python benchmarks/loadgen.py --rag stub --backend-latency lognormal:80,0.8 \\
+        --backend-failure-rate 0.05 --json loadgen-report.json
+"""
+import argparse
+import ast
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import secrets
+import socket
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NORMALIZATION_SRC = os.path.abspath(os.path.join(HERE, "../src"))
+GATEWAY_SRC = os.path.abspath(os.path.join(HERE, "../../mcp-intent-gateway/src"))
+sys.path[:0] = [NORMALIZATION_SRC, GATEWAY_SRC]
+
+STT_UTTERANCES_PATH = os.path.abspath(os.path.join(HERE, "../../speech-to-text-mock/src/sample-utterances.ts"))
+TEST_CASES_PATH = os.path.join(NORMALIZATION_SRC, "test_semantic_normalization.py")
+
+SATURATION_THROUGHPUT = 0.9  # Achieved / offered below this = saturated
+
+# Expected fact for each section of sample-utterances.ts ("// MEAL - half consumed")
+STT_SECTION_FACTS = {
+    "MEAL - half consumed": ("MEAL_MAIN_CONSUMPTION", "HALF"),
+    "MEAL - all consumed": ("MEAL_DESSERT_CONSUMPTION", "ALL"),
+    "MEAL - nothing consumed": ("MEAL_MAIN_CONSUMPTION", "NOTHING"),
+    "MEAL - three quarters": ("MEAL_MAIN_CONSUMPTION", "THREE_QUARTERS"),
+    "MEAL - multiple children": ("MEAL_MAIN_CONSUMPTION", "ALL"),
+    "SLEEP - nap started": ("SLEEP_STATE", "ASLEEP"),
+    "SLEEP - wake up": ("SLEEP_STATE", "WOKE_UP"),
+    "DIAPER - wet": ("DIAPER_CHANGE_TYPE", "WET"),
+    "DIAPER - dirty": ("DIAPER_CHANGE_TYPE", "DIRTY"),
+    "MOOD - happy": ("CHILD_MOOD", "HAPPY"),
+    "MOOD - crying": ("CHILD_MOOD", "UPSET"),
+    "MOOD - grumpy": ("CHILD_MOOD", "CRANKY"),
+    "ACTIVITIES - outdoor": ("ACTIVITY_TYPE", "OUTDOOR_PLAY"),
+    "ACTIVITIES - arts": ("ACTIVITY_TYPE", "CRAFT"),
+    "ACTIVITIES - multiple children": ("ACTIVITY_TYPE", "OUTDOOR_PLAY"),
+}
+# Capitalized words that start sentences rather than name children
+NOT_NAMES = {"La", "Le", "Les", "Il", "Elle", "Gros"}
+NAME_RE = re.compile(r"(?:^|[\s'’])([A-ZÀ-Ý][a-zà-ÿ]+)")
+INPUT_RE = re.compile(r'Input: "(.*)"\s*$', re.DOTALL)
+
+
+# ---------------------------------------------------------------------------
+# Latency distributions
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Latency:
+    """A latency distribution, sampled in seconds."""
+    kind: str
+    a: float = 0.0  # Milliseconds
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.a
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.a, self.b)
+        elif self.kind == "lognormal":
+            ms = self.a * math.exp(rng.gauss(0.0, self.b))
+        else:  # exp
+            ms = rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        return max(ms, 0.0) / 1000
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.a:g}" + (f",{self.b:g}" if self.kind in ("uniform", "lognormal") else "")
+
+
+def parse_latency(spec: str) -> Latency:
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v.strip()]
+    arity = {"fixed": 1, "exp": 1, "uniform": 2, "lognormal": 2}
+    if kind not in arity or len(values) != arity[kind]:
+        raise argparse.ArgumentTypeError(
+            f"Invalid latency '{spec}': use fixed:MS, exp:MEAN_MS, uniform:LO,HI or lognormal:MEDIAN_MS,SIGMA"
+        )
+    return Latency(kind, *values)
+
+
+# ---------------------------------------------------------------------------
+# Corpus and load model
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Utterance:
+    """An utterance and the fact a correct normalizer would extract."""
+    text: str
+    subjects: tuple[str, ...]
+    dimension: str
+    value: str
+    source: str
+
+    @property
+    def is_meal(self) -> bool:
+        return self.dimension.startswith("MEAL_")
+
+
+def load_stt_utterances(path: str = STT_UTTERANCES_PATH) -> list[Utterance]:
+    """SAMPLE_UTTERANCES, with the expected fact of their section comment."""
+    utterances = []
+    section = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("//"):
+                section = line.lstrip("/ ").split(" (")[0]
+                continue
+            match = re.match(r'^"(.*)",?$', line)
+            if match and section in STT_SECTION_FACTS:
+                text = match.group(1)
+                names = tuple(n for n in NAME_RE.findall(text) if n not in NOT_NAMES)
+                dimension, value = STT_SECTION_FACTS[section]
+                utterances.append(Utterance(text, names, dimension, value, "stt"))
+    return utterances
+
+
+def load_test_cases(path: str = TEST_CASES_PATH) -> list[Utterance]:
+    """TEST_CASES phrases (read with ast: importing the script loads .env and OpenAI)."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], "id", None) == "TEST_CASES":
+            cases = ast.literal_eval(node.value)
+            break
+    else:
+        raise ValueError(f"No TEST_CASES in {path}")
+    return [
+        Utterance(
+            phrase,
+            tuple(case["expected"]["subjects"]),
+            case["expected"]["dimension"],
+            case["expected"]["value"],
+            "test_cases",
+        )
+        for case in cases
+        for phrase in case["phrases"]
+    ]
+
+
+def personalize(utterance: Utterance, names: list[str]) -> Utterance:
+    """Replace the utterance's subjects by the given children (in order)."""
+    text = utterance.text
+    for original, name in zip(utterance.subjects, names):
+        text = re.sub(rf"\b{re.escape(original)}\b", name, text)
+    return replace(utterance, text=text, subjects=tuple(names[:len(utterance.subjects)]))
+
+
+@dataclass
+class NurseryModel:
+    """N rooms x M children producing K utterances each over a peak window."""
+    rooms: int
+    children: int
+    utterances_per_child: float
+    peak_minutes: float
+    meal_share: float
+
+    @property
+    def room_rate(self) -> float:
+        """Utterances per second from one room at peak."""
+        return self.children * self.utterances_per_child / (self.peak_minutes * 60)
+
+    @property
+    def rate(self) -> float:
+        return self.rooms * self.room_rate
+
+    def roster(self) -> list[list[str]]:
+        """Children's first names, per room (unique across the nursery)."""
+        base = ["Lucas", "Emma", "Paul", "Léa", "Hugo", "Manon", "Zoé", "Tom", "Inès", "Jules", "Lina", "Nathan"]
+        return [
+            [f"{base[c % len(base)]}{room + 1:02d}{c + 1:02d}" for c in range(self.children)]
+            for room in range(self.rooms)
+        ]
+
+
+class UtteranceSource:
+    """Draws personalized utterances: meal-heavy, children of one room per utterance."""
+
+    def __init__(self, corpus: list[Utterance], model: NurseryModel, rng: random.Random):
+        self.meal = [u for u in corpus if u.is_meal]
+        self.other = [u for u in corpus if not u.is_meal]
+        self.model = model
+        self.roster = model.roster()
+        self.rng = rng
+
+    def next(self) -> Utterance:
+        use_meal = self.meal and (not self.other or self.rng.random() < self.model.meal_share)
+        template = self.rng.choice(self.meal if use_meal else self.other)
+        room = self.rng.choice(self.roster)
+        names = self.rng.sample(room, min(len(template.subjects), len(room)))
+        return personalize(template, names)
+
+
+# ---------------------------------------------------------------------------
+# Stubs
+# ---------------------------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StubLLM:
+    """
+    OpenAI-compatible chat completions server on a background thread.
+
+    Answers with a process_canonical_fact tool call for utterances in the
+    answer key, plain text otherwise. Token usage is approximated from
+    message lengths (4 characters per token; the system prompt counts as
+    cached, as a prompt-caching provider would report it).
+    """
+
+    def __init__(self, latency: Latency, seed: Optional[int] = None):
+        self.latency = latency
+        self.answers: dict[str, Utterance] = {}
+        self.rng = random.Random(seed)
+        self.port = free_port()
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def learn(self, utterance: Utterance) -> None:
+        self.answers[utterance.text] = utterance
+
+    async def chat_completions(self, request):
+        from starlette.responses import JSONResponse
+
+        body = await request.json()
+        messages = body.get("messages", [])
+        match = INPUT_RE.search(messages[-1].get("content") or "") if messages else None
+        utterance = self.answers.get(match.group(1)) if match else None
+        await asyncio.sleep(self.latency.sample(self.rng))
+
+        message = {"role": "assistant", "content": None}
+        if utterance is not None:
+            arguments = {
+                "subjects": list(utterance.subjects),
+                "dimension": utterance.dimension,
+                "value": utterance.value,
+                "confidence": 0.95,
+            }
+            message["tool_calls"] = [{
+                "id": f"call_{secrets.token_hex(8)}",
+                "type": "function",
+                "function": {"name": "process_canonical_fact", "arguments": json.dumps(arguments)},
+            }]
+        else:
+            message["content"] = "No event recognised."
+
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+        cached_tokens = len(messages[0].get("content") or "") // 4 if len(messages) > 1 else 0
+        completion_tokens = len(json.dumps(message)) // 4
+        return JSONResponse({
+            "id": f"chatcmpl-{secrets.token_hex(12)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if utterance is not None else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        })
+
+    async def model(self, request):
+        from starlette.responses import JSONResponse
+
+        return JSONResponse({"id": request.path_params["model"], "object": "model", "created": 0, "owned_by": "stub"})
+
+    def start(self) -> None:
+        import uvicorn
+        from starlette.applications import Starlette
+        from starlette.routing import Route
+
+        app = Starlette(routes=[
+            Route("/v1/chat/completions", self.chat_completions, methods=["POST"]),
+            Route("/v1/models/{model:path}", self.model, methods=["GET"]),
+        ])
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="stub-llm", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Stub LLM server did not start")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+
+def make_stub_backend(latency: Latency, failure_rate: float, seed: Optional[int] = None):
+    """MockBackendClient whose POST is a sampled sleep (retryable 503s at failure_rate)."""
+    from mcp_intent_gateway.clients.mock_backend import EventResponse, MockBackendClient
+
+    rng = random.Random(seed)
+
+    class StubBackend(MockBackendClient):
+        async def _post_event(self, *args, **kwargs) -> EventResponse:
+            await asyncio.sleep(latency.sample(rng))
+            if rng.random() < failure_rate:
+                return EventResponse(success=False, message="Backend error: 503", retryable=True)
+            return EventResponse(success=True, message="Event created", mock_id=secrets.token_hex(6))
+
+    return StubBackend(base_url="http://backend.stub")
+
+
+def make_stub_retrievers(answers: dict[str, Utterance], latency: Latency, seed: Optional[int] = None):
+    """Lexical and compatibility retrievers that sleep, then return a plausible context."""
+    from semantic_normalization.rag_interface import RAGRetriever, format_lexical_context
+
+    rng = random.Random(seed)
+
+    class StubLexicalRetriever(RAGRetriever):
+        def retrieve_context(self, query: str, top_k: int = 5) -> str:
+            time.sleep(latency.sample(rng))  # Blocking, like a real vector search
+            utterance = answers.get(query)
+            if utterance is None:
+                return format_lexical_context([], [], [])
+            return format_lexical_context(
+                [{"dimension": utterance.dimension, "canonical_value": utterance.value}],
+                [query],
+                [0.1],
+            )
+
+    class StubCompatibilityRetriever(RAGRetriever):
+        def retrieve_context(self, query: str, top_k: int = 3) -> str:
+            time.sleep(latency.sample(rng))
+            return ""
+
+    return StubLexicalRetriever(), StubCompatibilityRetriever()
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """Nearest-rank p50/p95/p99 (None for an empty list)."""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    ordered = sorted(values)
+    rank = lambda q: ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]  # noqa: E731
+    return {"p50": rank(0.50), "p95": rank(0.95), "p99": rank(0.99)}
+
+
+@dataclass
+class StepResult:
+    """Outcome of one load step."""
+    mode: str
+    offered_rate: Optional[float]  # Utterances/s (None in closed loop)
+    concurrency: Optional[int]
+    sent: int = 0
+    completed: int = 0
+    failed: int = 0
+    dropped: int = 0  # Not sent: --max-in-flight reached
+    elapsed: float = 0.0
+    latency: dict[str, float] = field(default_factory=dict)  # Seconds, from scheduled arrival
+    stages: dict[str, dict[str, float]] = field(default_factory=dict)  # Seconds
+    saturated: bool = False
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+
+class GatewayStageCollector:
+    """Gateway span exporter keeping the per-stage timings of process_canonical_fact."""
+
+    def __init__(self):
+        from mcp_intent_gateway.tracing import SpanExporter
+
+        collector = self
+
+        class Exporter(SpanExporter):
+            def export(self, span) -> None:
+                if span.name == "process_canonical_fact":
+                    collector.samples.append(span.attributes.get("stages_ms") or {})
+
+        self.samples: list[dict[str, float]] = []
+        self.exporter = Exporter()
+
+    def drain(self) -> list[dict[str, float]]:
+        samples, self.samples = self.samples, []
+        return samples
+
+
+class LoadRunner:
+    """Drives normalize_and_dispatch and aggregates latencies per step."""
+
+    def __init__(self, normalizer, mcp_client, source: UtteranceSource, llm: StubLLM,
+                 collector: GatewayStageCollector, rng: random.Random):
+        self.normalizer = normalizer
+        self.mcp_client = mcp_client
+        self.source = source
+        self.llm = llm
+        self.collector = collector
+        self.rng = rng
+
+    async def _one(self, scheduled: float, step: StepResult, latencies: list, stages: list) -> None:
+        loop = asyncio.get_running_loop()
+        utterance = self.source.next()
+        self.llm.learn(utterance)
+        try:
+            result = await self.normalizer.normalize_and_dispatch(utterance.text, self.mcp_client)
+            ok = result.all_succeeded and bool(result.tool_calls)
+            stages.append(result.timings)
+        except Exception as e:
+            ok = False
+            print(f"  request failed: {e}", file=sys.stderr)
+        latencies.append(loop.time() - scheduled)
+        step.completed += 1
+        if not ok:
+            step.failed += 1
+
+    async def open_loop(self, rate: float, duration: float, max_in_flight: int) -> StepResult:
+        """Poisson arrivals at `rate` for `duration` seconds, then drain."""
+        loop = asyncio.get_running_loop()
+        step = StepResult(mode="open", offered_rate=rate, concurrency=None)
+        latencies: list[float] = []
+        stages: list[dict[str, float]] = []
+        tasks: set[asyncio.Task] = set()
+        started = loop.time()
+        offset = 0.0
+        while True:
+            offset += self.rng.expovariate(rate)
+            if offset > duration:
+                break
+            delay = started + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(tasks) >= max_in_flight:
+                step.dropped += 1
+                continue
+            step.sent += 1
+            task = asyncio.create_task(self._one(started + offset, step, latencies, stages))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        step.elapsed = max(loop.time() - started, duration)
+        return self._finish(step, latencies, stages)
+
+    async def closed_loop(self, concurrency: int, requests: int) -> StepResult:
+        """`concurrency` workers sending back to back until `requests` are done."""
+        loop = asyncio.get_running_loop()
+        step = StepResult(mode="closed", offered_rate=None, concurrency=concurrency)
+        latencies: list[float] = []
+        stages: list[dict[str, float]] = []
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                step.sent += 1
+                await self._one(loop.time(), step, latencies, stages)
+
+        started = loop.time()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        step.elapsed = loop.time() - started
+        return self._finish(step, latencies, stages)
+
+    def _finish(self, step: StepResult, latencies: list[float], stages: list[dict[str, float]]) -> StepResult:
+        step.latency = percentiles(latencies)
+        by_stage: dict[str, list[float]] = {}
+        for timings in stages:
+            for stage, seconds in timings.items():
+                by_stage.setdefault(stage, []).append(seconds)
+        for timings in self.collector.drain():
+            for stage, ms in timings.items():
+                by_stage.setdefault(f"gateway.{stage}", []).append(ms / 1000)
+        step.stages = {stage: percentiles(values) for stage, values in by_stage.items()}
+        return step
+
+
+def is_saturated(step: StepResult, slo: float) -> bool:
+    p95 = step.latency.get("p95")
+    if step.dropped or (p95 is not None and p95 > slo):
+        return True
+    offered = step.sent / step.elapsed if step.elapsed else 0.0
+    return step.offered_rate is not None and step.throughput < SATURATION_THROUGHPUT * offered
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def print_step(step: StepResult) -> None:
+    if step.offered_rate is not None:
+        load, status = f"{step.offered_rate:.2f}/s", "SATURATED" if step.saturated else "ok"
+    else:
+        load, status = f"c={step.concurrency}", "-"
+    lat = step.latency
+    print(
+        f"{load:>10} {step.sent:>6} {step.throughput:>9.2f} {step.failed:>6} {step.dropped:>6} "
+        f"{ms(lat['p50']):>9} {ms(lat['p95']):>9} {ms(lat['p99']):>9}  {status}"
+    )
+
+
+def print_stages(step: StepResult) -> None:
+    print(f"\n{'stage (ms)':<28} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for stage, values in sorted(step.stages.items(), key=lambda item: -(item[1]["p95"] or 0)):
+        print(f"{stage:<28} {ms(values['p50']):>9} {ms(values['p95']):>9} {ms(values['p99']):>9}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+async def run(args) -> dict:
+    from semantic_normalization.logging_config import configure_logging
+
+    # Before the gateway import: FastMCP would otherwise install an INFO console handler
+    configure_logging(level="WARNING")
+
+    llm = StubLLM(args.llm_latency, seed=args.seed)
+    llm.start()
+    os.environ["OPENAI_BASE_URL"] = llm.base_url
+    os.environ["OPENAI_API_KEY"] = "stub"
+
+    from mcp_intent_gateway import server as gateway
+    from mcp_intent_gateway.tracing import set_span_exporter
+    from semantic_normalization.mcp_client import IntentGatewayClient
+    from semantic_normalization.normalizer import SemanticNormalizer
+    from semantic_normalization.tool_schema import fetch_tool_schema_from_gateway
+
+    rng = random.Random(args.seed)
+    corpus = load_stt_utterances() + load_test_cases()
+    model = NurseryModel(args.rooms, args.children, args.utterances_per_child, args.peak_minutes, args.meal_share)
+    source = UtteranceSource(corpus, model, rng)
+
+    gateway._backend = make_stub_backend(args.backend_latency, args.backend_failure_rate, seed=args.seed)
+    collector = GatewayStageCollector()
+    set_span_exporter(collector.exporter)
+
+    retrievers = {}
+    if args.rag == "stub":
+        lexical, compatibility = make_stub_retrievers(llm.answers, args.rag_latency, seed=args.seed)
+        retrievers = {"rag_retriever": lexical, "compatibility_rag_retriever": compatibility}
+
+    print(
+        f"Model: {model.rooms} rooms x {model.children} children, {model.utterances_per_child:g} utterances "
+        f"each over {model.peak_minutes:g} min -> {model.rate:.3f} utterances/s "
+        f"({model.room_rate:.4f}/s per room)",
+        file=sys.stderr,
+    )
+    print(
+        f"Stubs: llm {args.llm_latency}, backend {args.backend_latency} "
+        f"(failure rate {args.backend_failure_rate:g}), rag {args.rag}"
+        + (f" {args.rag_latency}" if args.rag == "stub" else ""),
+        file=sys.stderr,
+    )
+
+    try:
+        async with IntentGatewayClient(transport="inprocess") as client:
+            normalizer = SemanticNormalizer(warm_up=True, **retrievers)
+            normalizer.tool_schema = await fetch_tool_schema_from_gateway(client, use_disk_cache=False)
+            await normalizer.ready()
+            runner = LoadRunner(normalizer, client, source, llm, collector, rng)
+
+            for _ in range(args.warm_up):
+                await runner.closed_loop(1, 1)
+
+            print(f"\n{'load':>10} {'sent':>6} {'done/s':>9} {'failed':>6} {'drop':>6} "
+                  f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  status")
+            steps: list[StepResult] = []
+            if args.concurrency:
+                for concurrency in args.concurrency:
+                    step = await runner.closed_loop(concurrency, args.requests)
+                    print_step(step)
+                    steps.append(step)
+            else:
+                for multiplier in args.sweep:
+                    step = await runner.open_loop(model.rate * multiplier, args.duration, args.max_in_flight)
+                    step.saturated = is_saturated(step, args.slo)
+                    print_step(step)
+                    steps.append(step)
+                    if step.saturated and not args.keep_going:
+                        break
+    finally:
+        set_span_exporter(None)
+        llm.stop()
+
+    sustainable = [s for s in steps if s.offered_rate is not None and not s.saturated]
+    detail = (sustainable or steps)[-1]
+    print_stages(detail)
+
+    report = {
+        "model": {**asdict(model), "rate": model.rate, "room_rate": model.room_rate},
+        "stubs": {
+            "llm_latency": str(args.llm_latency),
+            "backend_latency": str(args.backend_latency),
+            "backend_failure_rate": args.backend_failure_rate,
+            "rag": args.rag if args.rag == "real" else f"stub {args.rag_latency}",
+        },
+        "slo_seconds": args.slo,
+        "steps": [{**asdict(s), "throughput": s.throughput} for s in steps],
+    }
+    if not args.concurrency:
+        saturated = next((s for s in steps if s.saturated), None)
+        report["saturation"] = {
+            "sustainable_rate": sustainable[-1].offered_rate if sustainable else None,
+            "sustainable_rooms": (
+                math.floor(sustainable[-1].offered_rate / model.room_rate) if sustainable else 0
+            ),
+            "saturated_rate": saturated.offered_rate if saturated else None,
+        }
+        summary = report["saturation"]
+        if sustainable:
+            print(
+                f"\nSustainable: {summary['sustainable_rate']:.2f} utterances/s "
+                f"= {summary['sustainable_rooms']} rooms of {model.children} children at this peak"
+            )
+        if saturated:
+            print(f"Saturated at: {saturated.offered_rate:.2f} utterances/s")
+        else:
+            print("No saturation reached: extend --sweep")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    model = parser.add_argument_group("load model")
+    model.add_argument("--rooms", type=int, default=10)
+    model.add_argument("--children", type=int, default=12, help="Children per room")
+    model.add_argument("--utterances-per-child", type=float, default=3,
+                       help="Utterances per child during the peak (main, dessert, mood...)")
+    model.add_argument("--peak-minutes", type=float, default=30)
+    model.add_argument("--meal-share", type=float, default=0.8, help="Fraction of meal utterances at peak")
+
+    load = parser.add_argument_group("load")
+    load.add_argument("--sweep", type=float, nargs="+", default=[1, 2, 5, 10, 20, 50],
+                      help="Offered rates as multiples of the modelled peak rate (open loop)")
+    load.add_argument("--duration", type=float, default=20, help="Seconds per open-loop step")
+    load.add_argument("--slo", type=float, default=5.0, help="p95 latency (s) above which a step is saturated")
+    load.add_argument("--max-in-flight", type=int, default=1000)
+    load.add_argument("--keep-going", action="store_true", help="Run every step, even after saturation")
+    load.add_argument("--concurrency", type=int, nargs="+", help="Closed loop with these concurrencies instead")
+    load.add_argument("--requests", type=int, default=200, help="Utterances per closed-loop step")
+    load.add_argument("--warm-up", type=int, default=3, help="Unmeasured utterances before the first step")
+
+    stubs = parser.add_argument_group("stubs")
+    stubs.add_argument("--llm-latency", type=parse_latency, default=parse_latency("lognormal:600,0.4"))
+    stubs.add_argument("--backend-latency", type=parse_latency, default=parse_latency("lognormal:40,0.5"))
+    stubs.add_argument("--backend-failure-rate", type=float, default=0.0)
+    stubs.add_argument("--rag", choices=["real", "stub"], default="real",
+                       help="Vector retrievers as configured (EMBEDDING_BACKEND) or a latency stub")
+    stubs.add_argument("--rag-latency", type=parse_latency, default=parse_latency("lognormal:15,0.3"))
+    stubs.add_argument("--spool", action="store_true", help="Keep the gateway's delivery spool (default: off)")
+
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if not args.spool:
+        os.environ["GATEWAY_SPOOL_PATH"] = ""
+    os.environ.pop("GATEWAY_TRACE_FILE", None)
+    os.environ.pop("NORMALIZER_TRACE_FILE", None)
+
+    report = asyncio.run(run(args))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report written to {args.json_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Microbenchmarks for the pipeline's pure hot paths, with stored baselines.
+
+Benchmarks (time per operation, best of --repeats rounds):
+- canonical_fact: CanonicalFact construction and validation
+- mapper_map_1 / _10 / _1000: DeterministicMapper.map on 1/10/1000-fact lists
+- process_canonical_fact: the gateway tool end to end with a stubbed backend
+  (no HTTP, no spool, no duplicate suppression)
+- processing_result_dump: ProcessingResult.model_dump(mode="json") with a contract
+- mcp_to_openai_tool: conversion of the gateway's MCP tool schemas
+- rag_lexical_format / rag_compatibility_format: RAG context formatting
+
+Baselines live in benchmarks/baselines/microbench.json. They are only
+comparable on the machine that recorded them: refresh them with --save
+after an intended change, or before comparing on a new machine.
+
+compare checks the median round against the baseline median (the best
+round is reported too, but one lucky round makes a poor reference), and
+re-measures a benchmark once before calling it a regression, so a noisy
+neighbour does not fail the check on its own.
+
+Usage:
+    python benchmarks/microbench.py run                  # print results
+    python benchmarks/microbench.py run --save           # record the baseline
+    python benchmarks/microbench.py compare              # exit 1 on regression
+    python benchmarks/microbench.py compare --threshold 0.5 -k mapper
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NORMALIZATION_SRC = os.path.abspath(os.path.join(HERE, "../src"))
+GATEWAY_SRC = os.path.abspath(os.path.join(HERE, "../../mcp-intent-gateway/src"))
+sys.path[:0] = [NORMALIZATION_SRC, GATEWAY_SRC]
+
+BASELINE_PATH = os.path.join(HERE, "baselines", "microbench.json")
+DEFAULT_THRESHOLD = 0.25  # Slower than baseline by more than this fraction = regression
+
+# Gateway components read these on first use: direct backend calls, every call recorded
+os.environ["GATEWAY_SPOOL_PATH"] = ""
+os.environ["GATEWAY_IDEMPOTENCY_WINDOW"] = "0"
+os.environ.pop("GATEWAY_TRACE_FILE", None)
+
+# Runner: (number of operations) -> elapsed seconds
+Runner = Callable[[int], float]
+
+
+def sync_runner(fn: Callable[[], object]) -> Runner:
+    def run(number: int) -> float:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - started
+    return run
+
+
+def async_runner(fn, loop: asyncio.AbstractEventLoop) -> Runner:
+    async def timed(number: int) -> float:
+        started = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        return time.perf_counter() - started
+
+    def run(number: int) -> float:
+        return loop.run_until_complete(timed(number))
+    return run
+
+
+def build_benchmarks(loop: asyncio.AbstractEventLoop) -> dict[str, Runner]:
+    from mcp_intent_gateway import server
+    from mcp_intent_gateway.logging_config import configure_logging
+    from mcp_intent_gateway.clients.mock_backend import EventResponse, MockBackendClient
+    from mcp_intent_gateway.domain.constants import Dimension
+    from mcp_intent_gateway.mapping.mapper import DeterministicMapper
+    from mcp_intent_gateway.models.canonical_fact import CanonicalFact
+    from mcp_intent_gateway.models.intent_contract import IntentContract, IntentContractMetadata
+    from mcp_intent_gateway.models.responses import ProcessingResult
+    from semantic_normalization.rag_interface import (
+        format_compatibility_context,
+        format_lexical_context,
+    )
+    from semantic_normalization.tool_schema import mcp_to_openai_tool
+
+    class StubBackend(MockBackendClient):
+        """Answers every write immediately (breaker and latency tracking still run)."""
+
+        async def _post_event(self, *args, **kwargs) -> EventResponse:
+            return EventResponse(success=True, message="created")
+
+    # Measure the code, not log I/O (FastMCP would otherwise install a console handler)
+    configure_logging(level="WARNING", stream=open(os.devnull, "w"))
+    server._backend = StubBackend(base_url="http://backend.invalid")
+
+    mapper = DeterministicMapper()
+
+    def facts(count: int) -> list:
+        return [
+            CanonicalFact(subjects=["Gabriel"], dimension=Dimension.MEAL_MAIN_CONSUMPTION, value="ALL")
+            for _ in range(count)
+        ]
+
+    fact_lists = {count: facts(count) for count in (1, 10, 1000)}
+
+    result = ProcessingResult(
+        success=True,
+        message="Event recorded for Gabriel",
+        intent_contract=IntentContract(
+            child_id=42,
+            action="record_meal",
+            properties={"main": "ALL"},
+            metadata=IntentContractMetadata(confidence=0.95, idempotency_key="0" * 64),
+        ),
+    )
+
+    mcp_tools = [
+        tool.model_dump(mode="json", by_alias=True, exclude_none=True)
+        for tool in loop.run_until_complete(server.list_tools_in_process())
+    ]
+
+    hits = 5
+    lexical = (
+        [{"dimension": "MEAL_MAIN_CONSUMPTION", "canonical_value": "ALL"}] * hits,
+        ["a tout mangé"] * hits,
+        [0.12] * hits,
+    )
+    rules = (
+        [{"rule_type": "exclusive"}] * 10,
+        ["MEAL_MAIN_CONSUMPTION and SLEEP_STATE describe different events"] * 10,
+    )
+
+    return {
+        "canonical_fact": sync_runner(lambda: CanonicalFact(
+            subjects=["Gabriel"], dimension=Dimension.MEAL_MAIN_CONSUMPTION, value="ALL", confidence=0.9
+        )),
+        "mapper_map_1": sync_runner(lambda: mapper.map(fact_lists[1])),
+        "mapper_map_10": sync_runner(lambda: mapper.map(fact_lists[10])),
+        "mapper_map_1000": sync_runner(lambda: mapper.map(fact_lists[1000])),
+        "process_canonical_fact": async_runner(
+            lambda: server.process_canonical_fact(["Gabriel"], "MEAL_MAIN_CONSUMPTION", "ALL"), loop
+        ),
+        "processing_result_dump": sync_runner(lambda: result.model_dump(mode="json")),
+        "mcp_to_openai_tool": sync_runner(lambda: [mcp_to_openai_tool(t) for t in mcp_tools]),
+        "rag_lexical_format": sync_runner(lambda: format_lexical_context(*lexical)),
+        "rag_compatibility_format": sync_runner(lambda: format_compatibility_context(*rules)),
+    }
+
+
+def measure(run: Runner, repeats: int, min_time: float) -> dict:
+    """Calibrate the operation count to min_time per round, then keep the best round."""
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= min_time / 10 or number >= 1 << 24:
+            break
+        number *= 10
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+
+    gc_enabled = gc.isenabled()
+    gc.disable()  # As timeit: collections would land in random rounds
+    try:
+        rounds = [run(number) / number for _ in range(repeats)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {
+        "ns_per_op": round(min(rounds) * 1e9, 1),
+        "median_ns": round(statistics.median(rounds) * 1e9, 1),
+        "ops_per_round": number,
+    }
+
+
+def run_suite(
+    names: list[str], repeats: int, min_time: float, confirm: Optional[Callable[[dict], list[str]]] = None
+) -> dict:
+    """
+    Measure the selected benchmarks.
+
+    confirm, if given, receives the results and returns the names to
+    measure again; the second measurement replaces the first.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        benchmarks = build_benchmarks(loop)
+        selected = [n for n in benchmarks if not names or any(k in n for k in names)]
+        results = {}
+        for name in selected:
+            results[name] = measure(benchmarks[name], repeats, min_time)
+            print(f"  {name:<26} {format_ns(results[name]['median_ns']):>12}", file=sys.stderr)
+        for name in confirm(results) if confirm else []:
+            results[name] = measure(benchmarks[name], repeats, min_time)
+            print(f"  {name:<26} {format_ns(results[name]['median_ns']):>12} (re-run)", file=sys.stderr)
+    finally:
+        loop.close()
+    return {"machine": machine_info(), "results": results}
+
+
+def machine_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
+
+
+def change(base: dict, result: dict) -> float:
+    """Relative change of the median time (positive = slower)."""
+    return result["median_ns"] / base["median_ns"] - 1
+
+
+def regressed(baseline: dict, results: dict, threshold: float) -> list[str]:
+    return [
+        name for name, result in results.items()
+        if name in baseline["results"] and change(baseline["results"][name], result) > threshold
+    ]
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Print a comparison table of medians; return the names of regressed benchmarks."""
+    regressions = []
+    print(f"{'benchmark':<26} {'baseline':>12} {'current':>12} {'change':>9}  status")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<26} {'-':>12} {format_ns(result['median_ns']):>12} {'':>9}  new")
+            continue
+        delta = change(base, result)
+        status = "ok"
+        if delta > threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif delta < -threshold:
+            status = "faster (update the baseline?)"
+        print(
+            f"{name:<26} {format_ns(base['median_ns']):>12} {format_ns(result['median_ns']):>12} "
+            f"{delta:>+8.1%}  {status}"
+        )
+    if baseline.get("machine") != current["machine"]:
+        print(f"\nNote: baseline recorded on {baseline.get('machine')}, not this machine.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["run", "compare"])
+    parser.add_argument("-k", dest="names", nargs="*", default=[], help="Only benchmarks containing these substrings")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per round")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save", action="store_true", help="Write the results as the baseline (run only)")
+    args = parser.parse_args()
+
+    baseline = None
+    confirm = None
+    if args.command == "compare":
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        def confirm(results: dict) -> list[str]:
+            return regressed(baseline, results, args.threshold)
+
+    current = run_suite(args.names, args.repeats, args.min_time, confirm)
+
+    if args.command == "run":
+        if args.save:
+            merged = current
+            if args.names and os.path.exists(args.baseline):
+                with open(args.baseline, "r", encoding="utf-8") as f:
+                    merged = json.load(f)
+                merged["machine"] = current["machine"]
+                merged["results"].update(current["results"])
+            os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+            with open(args.baseline, "w", encoding="utf-8") as f:
+                json.dump(merged, f, indent=2, sort_keys=True)
+                f.write("\n")
+            print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        print(json.dumps(current, indent=2))
+        return
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
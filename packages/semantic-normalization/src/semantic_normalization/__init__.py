@@ -1,22 +1,48 @@
 """
 Semantic Normalization Layer
 LLM-based classification for speech-to-act system
+
+Public names are loaded lazily on first access so that importing a single
+submodule (or the CLI) does not pull in openai, chromadb or mcp.
 """
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .normalizer import SemanticNormalizer, NormalizationResult, ToolCallResult
+    from .mcp_client import IntentGatewayClient
+    from .tool_schema import get_fallback_schema, fetch_tool_schema_from_gateway
+    from .rag_interface import VectorRAGRetriever, CompatibilityRAGRetriever, HybridRAGRetriever
+    from .embeddings import EmbeddingBackend, get_embedding_backend
 
-from .normalizer import SemanticNormalizer, NormalizationResult, ToolCallResult
-from .mcp_client import IntentGatewayClient
-from .tool_schema import get_fallback_schema, fetch_tool_schema_from_gateway
-from .rag_interface import VectorRAGRetriever, CompatibilityRAGRetriever
-
-__all__ = [
-    "SemanticNormalizer",
-    "NormalizationResult",
-    "ToolCallResult",
-    "IntentGatewayClient",
-    "get_fallback_schema",
-    "fetch_tool_schema_from_gateway",
-    "VectorRAGRetriever",
-    "CompatibilityRAGRetriever",
-]
+# Public name -> defining submodule
+_LAZY_ATTRIBUTES = {
+    "SemanticNormalizer": ".normalizer",
+    "NormalizationResult": ".normalizer",
+    "ToolCallResult": ".normalizer",
+    "IntentGatewayClient": ".mcp_client",
+    "get_fallback_schema": ".tool_schema",
+    "fetch_tool_schema_from_gateway": ".tool_schema",
+    "VectorRAGRetriever": ".rag_interface",
+    "CompatibilityRAGRetriever": ".rag_interface",
+    "HybridRAGRetriever": ".rag_interface",
+    "EmbeddingBackend": ".embeddings",
+    "get_embedding_backend": ".embeddings",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
 
 __version__ = "1.0.0"
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Cache so __getattr__ is not hit again
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,283 @@
+"""
+Streaming batch normalization: JSON lines in, JSON lines out.
+
+One warm normalizer (embedding model, vector store, OpenAI connection and,
+with --dispatch, gateway sessions) serves every line, with up to
+--concurrency utterances in flight.
+
+Input: one utterance per line, either a JSON object with a "text" field
+(an "id" field is copied to the result) or a JSON string. Blank lines are
+skipped.
+
+Output: one JSON object per non-blank input line, in input order, with
+"line" (0-based input line number). A line that cannot be processed gets
+an "error" field instead of failing the batch. At most --concurrency
+results are held in memory, however long the input is.
+
+Resume: results are flushed line by line, so after a crash --resume reads
+the last complete result of --output, drops a partially written or
+unreadable final line and continues with the next input line. Utterances
+that were in flight at the crash (up to --concurrency) are processed
+again. With --dispatch this is at-least-once: their facts may already have
+reached the backend and are then recorded twice. The gateway's idempotency
+cache does not prevent it (it lives in the gateway process, which exits
+with the batch, and its keys are bucketed by time).
+
+Usage:
+    python -m semantic_normalization.cli --batch transcripts.jsonl --output results.jsonl
+    cat transcripts.jsonl | python -m semantic_normalization.cli --batch --dispatch > results.jsonl
+    python -m semantic_normalization.cli --batch transcripts.jsonl --output results.jsonl --resume
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Any, Awaitable, Callable, Optional
+
+from .metrics import StageTimer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+
+# (utterance text) -> result fields
+Processor = Callable[[str], Awaitable[dict[str, Any]]]
+
+
+@dataclass
+class BatchStats:
+    """Counts for one batch run."""
+    skipped: int = 0  # Lines already completed (resume)
+    succeeded: int = 0
+    failed: int = 0
+
+
+def parse_line(raw: str) -> tuple[str, Any]:
+    """
+    Utterance text and id of an input line.
+
+    Raises:
+        ValueError: If the line is not valid JSON or has no text
+    """
+    item = json.loads(raw)
+    if isinstance(item, str):
+        return item, None
+    if isinstance(item, dict) and isinstance(item.get("text"), str):
+        return item["text"], item.get("id")
+    raise ValueError('Expected a JSON string or an object with a "text" field')
+
+
+def resume_point(path: str) -> int:
+    """
+    First input line to process after the results already in `path`.
+
+    Partially written or unreadable final lines (crash during a write) are
+    truncated.
+    """
+    if not os.path.exists(path):
+        return 0
+    last_line, valid_end, offset = None, 0, 0
+    with open(path, "rb+") as f:
+        for raw in f:  # One result in memory at a time
+            offset += len(raw)
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue  # Dropped below unless a valid result follows
+            if isinstance(record, dict) and isinstance(record.get("line"), int):
+                last_line, valid_end = record["line"], offset
+        if f.seek(0, os.SEEK_END) > valid_end:
+            logger.warning("Dropping a partially written result at the end of %s", path)
+            f.truncate(valid_end)
+    return 0 if last_line is None else last_line + 1
+
+
+async def run_batch(
+    source: IO[str],
+    sink: IO[str],
+    process: Processor,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    start_line: int = 0,
+) -> BatchStats:
+    """
+    Process input lines with bounded concurrency, writing results in order.
+
+    Args:
+        source: Input JSON lines
+        sink: Output, one JSON object per processed line (flushed per line)
+        process: Produces the result fields of one utterance
+        concurrency: Utterances in flight (and results held for ordering)
+        start_line: Input lines before this one are skipped (resume)
+
+    Returns:
+        Batch counts
+    """
+    stats = BatchStats()
+    window = asyncio.Semaphore(concurrency)
+    pending: dict[int, Optional[dict[str, Any]]] = {}
+    next_to_write = start_line
+    tasks: set[asyncio.Task] = set()
+
+    def emit(index: int, record: Optional[dict[str, Any]]):
+        nonlocal next_to_write
+        pending[index] = record
+        while next_to_write in pending:
+            ready = pending.pop(next_to_write)
+            if ready is not None:
+                sink.write(json.dumps(ready, ensure_ascii=False) + "\n")
+            next_to_write += 1
+            window.release()
+        sink.flush()
+
+    async def handle(index: int, raw: str):
+        record: dict[str, Any] = {"line": index}
+        try:
+            text, item_id = parse_line(raw)
+            if item_id is not None:
+                record["id"] = item_id
+            record.update(await process(text))
+            stats.succeeded += 1
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            stats.failed += 1
+            logger.warning("Line %d failed: %s", index, e)
+        emit(index, record)
+
+    index = 0
+    while index < start_line:
+        if not source.readline():
+            return stats
+        index += 1
+        stats.skipped += 1
+
+    while True:
+        raw = await asyncio.to_thread(source.readline)  # stdin may be a slow producer
+        if not raw:
+            break
+        await window.acquire()
+        if raw.strip():
+            task = asyncio.create_task(handle(index, raw))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        else:
+            emit(index, None)
+        index += 1
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return stats
+
+
+def normalize_only(normalizer) -> Processor:
+    """Processor returning the tool calls without executing them."""
+    from .normalizer import STAGE_SECONDS
+
+    async def process(text: str) -> dict[str, Any]:
+        timer = StageTimer(STAGE_SECONDS)
+        usage: dict[str, int] = {}
+        tool_calls, _ = await asyncio.to_thread(normalizer.normalize, text, timer, usage)
+        return {
+            "input": text,
+            "tool_calls": tool_calls,
+            "timings_ms": {stage: round(seconds * 1000, 2) for stage, seconds in timer.timings.items()},
+            "usage": usage,
+        }
+
+    return process
+
+
+def normalize_and_dispatch(normalizer, mcp_client) -> Processor:
+    """Processor dispatching the tool calls through the gateway."""
+
+    async def process(text: str) -> dict[str, Any]:
+        result = await normalizer.normalize_and_dispatch(text, mcp_client)
+        return result.to_dict(include_context=False)
+
+    return process
+
+
+async def _main(args) -> BatchStats:
+    from .cassette import CassetteGatewayClient
+    from .mcp_client import IntentGatewayClient
+    from .normalizer import SemanticNormalizer
+
+    # Blocking RAG and LLM calls run on the loop's executor: size it to the window
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(args.concurrency + 1))
+
+    start_line = resume_point(args.output) if args.resume else 0
+    source = sys.stdin if args.input in (None, "-") else open(args.input, "r", encoding="utf-8")
+    sink = sys.stdout if args.output is None else open(args.output, "a" if args.resume else "w", encoding="utf-8")
+    if start_line:
+        print(f"Resuming at input line {start_line}", file=sys.stderr)
+        if args.dispatch:
+            print(
+                f"WARNING: dispatch is at-least-once: up to {args.concurrency} utterance(s) in flight "
+                "at the interruption are dispatched again",
+                file=sys.stderr,
+            )
+
+    try:
+        normalizer = SemanticNormalizer(warm_up=True)
+        if not args.dispatch:
+            await normalizer.ready()
+            return await run_batch(source, sink, normalize_only(normalizer), args.concurrency, start_line)
+
+        gateway = IntentGatewayClient(pool_size=args.gateway_pool)
+        if normalizer.cassette is not None:
+            gateway = CassetteGatewayClient(normalizer.cassette, gateway)
+        async with gateway as mcp_client:
+            from .tool_schema import fetch_tool_schema_from_gateway
+            normalizer.tool_schema = await fetch_tool_schema_from_gateway(mcp_client)
+            await normalizer.ready()
+            process = normalize_and_dispatch(normalizer, mcp_client)
+            return await run_batch(source, sink, process, args.concurrency, start_line)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+def main(argv: Optional[list[str]] = None):
+    """Batch entry point (python -m semantic_normalization.cli --batch ...)."""
+    parser = argparse.ArgumentParser(
+        prog="python -m semantic_normalization.cli --batch",
+        description="Normalize JSON-lines utterances with one warm normalizer.",
+    )
+    parser.add_argument("input", nargs="?", help="Input JSON lines (default: stdin)")
+    parser.add_argument("--output", "-o", help="Output JSON lines (default: stdout)")
+    parser.add_argument("--concurrency", "-c", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Utterances in flight")
+    parser.add_argument("--dispatch", action="store_true", help="Dispatch tool calls through the gateway")
+    parser.add_argument("--gateway-pool", type=int, default=1, help="Gateway sessions (with --dispatch)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue after the last complete result in --output")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+
+    stats = asyncio.run(_main(args))
+    print(
+        f"Batch done: {stats.succeeded} succeeded, {stats.failed} failed"
+        + (f", {stats.skipped} skipped (resumed)" if stats.skipped else ""),
+        file=sys.stderr,
+    )
+    if stats.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from .logging_config import configure_logging
+
+    load_dotenv()
+    configure_logging()
+    main()
@@ -0,0 +1,335 @@
+"""
+Record/replay cassettes for LLM completions and gateway tool calls.
+
+In record mode every chat completion and gateway tool call goes through
+to the real service, and its response and latency are appended to a
+cassette file. In replay mode they are served from the cassette, with
+their original latency or none, without OpenAI or a gateway: regression
+and benchmark runs become fast, free and reproducible.
+
+Cassettes are content-addressed: an interaction is keyed by the SHA-256
+of its canonical request (model, messages, tools and sampling parameters
+for the LLM; tool name and arguments for the gateway). Per-call metadata
+such as the traceparent is not part of the key, and a request repeated
+during a recording is stored once. The file holds one compact JSON
+object per interaction (key, kind, short label, latency, response), and
+is gzipped when the path ends in ".gz".
+
+The LLM key includes the RAG context of the prompt, so replay needs the
+knowledge base and embedding backend used for the recording.
+
+Configuration (read by SemanticNormalizer and the CLI):
+- NORMALIZER_CASSETTE: cassette path (unset disables cassettes)
+- NORMALIZER_CASSETTE_MODE: "replay" (default), "record" (start a new
+  cassette) or "auto" (replay what is recorded, record the rest)
+- NORMALIZER_CASSETTE_LATENCY: "zero" (default) or "original"
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+ENV_CASSETTE = "NORMALIZER_CASSETTE"
+ENV_MODE = "NORMALIZER_CASSETTE_MODE"
+ENV_LATENCY = "NORMALIZER_CASSETTE_LATENCY"
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODE_AUTO = "auto"
+MODES = (MODE_RECORD, MODE_REPLAY, MODE_AUTO)
+
+LATENCY_ORIGINAL = "original"
+LATENCY_ZERO = "zero"
+LATENCIES = (LATENCY_ORIGINAL, LATENCY_ZERO)
+
+KIND_LLM = "llm"
+KIND_TOOL = "tool"
+KIND_LIST_TOOLS = "list_tools"
+
+LABEL_LENGTH = 120
+
+
+class CassetteMiss(LookupError):
+    """A replayed request is not in the cassette."""
+
+
+@dataclass
+class Interaction:
+    """One recorded request/response pair."""
+    key: str
+    kind: str
+    label: str  # Human-readable hint (utterance or tool name), not used for lookup
+    latency: float  # Seconds taken by the real call
+    response: Any  # JSON form of the response
+    error: Optional[str] = None  # Gateway tool error message, raised again on replay
+
+
+def request_key(kind: str, request: Any) -> str:
+    """Content address of a request: SHA-256 of its canonical JSON."""
+    canonical = json.dumps(
+        {"kind": kind, "request": request},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    A cassette file and its record/replay policy.
+
+    Usage:
+        cassette = Cassette("runs/eval.jsonl.gz", mode="record")
+        normalizer = SemanticNormalizer(cassette=cassette)
+        async with CassetteGatewayClient(cassette, IntentGatewayClient()) as client:
+            ...
+    """
+
+    def __init__(self, path, mode: str = MODE_REPLAY, latency: str = LATENCY_ZERO):
+        """
+        Open a cassette.
+
+        Args:
+            path: Cassette file (".gz" suffix for gzip)
+            mode: "record" (truncate and record), "replay" (file must exist,
+                  misses raise CassetteMiss) or "auto" (replay hits, record misses)
+            latency: Replayed latency, "original" or "zero"
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (expected one of {', '.join(MODES)})")
+        if latency not in LATENCIES:
+            raise ValueError(f"Unknown cassette latency: {latency} (expected one of {', '.join(LATENCIES)})")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.hits = 0
+        self.recorded = 0
+        self._interactions: dict[str, Interaction] = {}
+        self._file: Optional[IO[str]] = None
+        self._truncate = mode == MODE_RECORD  # A recording starts a new cassette
+        self._lock = threading.Lock()
+
+        if mode == MODE_REPLAY and not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        if mode != MODE_RECORD and self.path.exists():
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        """Cassette configured by NORMALIZER_CASSETTE*, or None."""
+        path = os.getenv(ENV_CASSETTE)
+        if not path:
+            return None
+        return cls(
+            path,
+            mode=os.getenv(ENV_MODE, MODE_REPLAY).strip().lower(),
+            latency=os.getenv(ENV_LATENCY, LATENCY_ZERO).strip().lower(),
+        )
+
+    @property
+    def replay_only(self) -> bool:
+        """True when no real service is needed."""
+        return self.mode == MODE_REPLAY
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def _open(self, mode: str) -> IO[str]:
+        if self.path.suffix == ".gz":
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return self.path.open(mode, encoding="utf-8")
+
+    def _load(self):
+        with self._open("r") as f:
+            for line in f:
+                if line.strip():
+                    interaction = Interaction(**json.loads(line))
+                    self._interactions.setdefault(interaction.key, interaction)
+
+    def _lookup(self, key: str, kind: str, label: str) -> Optional[Interaction]:
+        if self.mode == MODE_RECORD:
+            return None
+        interaction = self._interactions.get(key)
+        if interaction is None:
+            if self.mode == MODE_REPLAY:
+                raise CassetteMiss(f"No recorded {kind} interaction for {label!r} (key {key[:12]}) in {self.path}")
+            return None
+        self.hits += 1
+        return interaction
+
+    def _record(self, interaction: Interaction):
+        line = json.dumps(asdict(interaction), ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            if interaction.key in self._interactions:
+                return
+            self._interactions[interaction.key] = interaction
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self._open("w" if self._truncate else "a")
+                self._truncate = False
+                logger.info("Recording to cassette %s", self.path)
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self):
+        """Close the cassette file (a later recording reopens it for append)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _replay_delay(self, interaction: Interaction) -> float:
+        return interaction.latency if self.latency == LATENCY_ORIGINAL else 0.0
+
+    def complete(self, request: dict[str, Any], create: Callable[[], Any]) -> Any:
+        """
+        Chat completion through the cassette.
+
+        Args:
+            request: Keyword arguments of chat.completions.create
+            create: Performs the real request (called on record or miss)
+
+        Returns:
+            The real ChatCompletion, or one rebuilt from the cassette
+        """
+        key = request_key(KIND_LLM, request)
+        messages = request.get("messages") or [{}]
+        content = str(messages[-1].get("content") or "").strip()
+        label = content.splitlines()[-1][:LABEL_LENGTH] if content else ""
+
+        interaction = self._lookup(key, KIND_LLM, label)
+        if interaction is not None:
+            delay = self._replay_delay(interaction)
+            if delay:
+                time.sleep(delay)
+            from openai.types.chat import ChatCompletion
+            return ChatCompletion.model_validate(interaction.response)
+
+        started = time.perf_counter()
+        response = create()
+        elapsed = time.perf_counter() - started
+        self._record(Interaction(key, KIND_LLM, label, round(elapsed, 6), response.model_dump(mode="json")))
+        return response
+
+    async def call_tool(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        call: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """
+        Gateway tool call through the cassette.
+
+        Gateway tool errors (GatewayToolError) are recorded and raised again
+        on replay; other failures are not recorded.
+
+        Args:
+            tool_name: MCP tool name
+            arguments: Tool arguments (the key; request metadata is not)
+            call: Performs the real call (called on record or miss)
+        """
+        from .mcp_client import GatewayToolError
+
+        key = request_key(KIND_TOOL, {"name": tool_name, "arguments": arguments})
+        interaction = self._lookup(key, KIND_TOOL, tool_name)
+        if interaction is not None:
+            delay = self._replay_delay(interaction)
+            if delay:
+                await asyncio.sleep(delay)
+            if interaction.error is not None:
+                raise GatewayToolError(interaction.error)
+            return interaction.response
+
+        started = time.perf_counter()
+        try:
+            response = await call()
+        except GatewayToolError as e:
+            elapsed = round(time.perf_counter() - started, 6)
+            self._record(Interaction(key, KIND_TOOL, tool_name, elapsed, None, error=str(e)))
+            raise
+        elapsed = round(time.perf_counter() - started, 6)
+        self._record(Interaction(key, KIND_TOOL, tool_name, elapsed, response))
+        return response
+
+    async def list_tools(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """The gateway's MCP tool list through the cassette (a ListToolsResult)."""
+        from mcp.types import ListToolsResult
+
+        key = request_key(KIND_LIST_TOOLS, {})
+        interaction = self._lookup(key, KIND_LIST_TOOLS, KIND_LIST_TOOLS)
+        if interaction is not None:
+            return ListToolsResult.model_validate(interaction.response)
+
+        started = time.perf_counter()
+        result = await call()
+        elapsed = round(time.perf_counter() - started, 6)
+        self._record(Interaction(
+            key, KIND_LIST_TOOLS, KIND_LIST_TOOLS, elapsed, result.model_dump(mode="json", by_alias=True)
+        ))
+        return result
+
+
+class CassetteGatewayClient:
+    """
+    IntentGatewayClient stand-in that records or replays tool calls.
+
+    The wrapped client is only entered when the cassette may need it, so
+    a replay runs without starting or reaching a gateway.
+    """
+
+    def __init__(self, cassette: Cassette, client=None):
+        """
+        Args:
+            cassette: Cassette to record to or replay from
+            client: Real IntentGatewayClient (not needed for replay-only cassettes)
+        """
+        if client is None and not cassette.replay_only:
+            raise ValueError(f"A gateway client is required in {cassette.mode} mode")
+        self.cassette = cassette
+        self.client = client
+        self._entered = False
+
+    async def __aenter__(self):
+        if self.client is not None and not self.cassette.replay_only:
+            await self.client.__aenter__()
+            self._entered = True
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._entered:
+            self._entered = False
+            await self.client.__aexit__(exc_type, exc_val, exc_tb)
+
+    def _require_client(self):
+        if self.client is None:
+            raise RuntimeError("No gateway client to record from")
+        return self.client
+
+    async def execute_tool_call(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        meta: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """Same contract as IntentGatewayClient.execute_tool_call."""
+        return await self.cassette.call_tool(
+            tool_name,
+            arguments,
+            lambda: self._require_client().execute_tool_call(tool_name, arguments, meta=meta),
+        )
+
+    async def list_tools(self):
+        """Same contract as IntentGatewayClient.list_tools."""
+        return await self.cassette.list_tools(lambda: self._require_client().list_tools())
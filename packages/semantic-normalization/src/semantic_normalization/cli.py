@@ -1,35 +1,77 @@
 """
 CLI for testing semantic normalization
+
+--profile[=PREFIX] writes a cProfile dump (PREFIX.pstats) and sampled
+stacks for flame graphs (PREFIX.cpu.folded), and prints per-stage
+timings (see profiling.py). PREFIX defaults to "normalizer-profile".
+
+--batch [FILE] normalizes JSON lines from FILE or stdin (see batch.py).
 """
 
 import sys
 import json
+import time
+from contextlib import nullcontext
+from typing import Optional
 from dotenv import load_dotenv
-from .normalizer import SemanticNormalizer
+from .normalizer import STAGE_SECONDS, SemanticNormalizer
 from .mcp_client import IntentGatewayClient
+from .cassette import CassetteGatewayClient
+from .logging_config import configure_logging
+from .metrics import StageTimer
+from .profiling import DEFAULT_PREFIX, format_stage_table, profile_run
+
+
+def _parse_args(example: str) -> tuple[str, Optional[str]]:
+    """Input text and profile prefix (None: no profiling) from sys.argv."""
+    profile = None
+    words = []
+    for arg in sys.argv[1:]:
+        if arg == "--profile":
+            profile = DEFAULT_PREFIX
+        elif arg.startswith("--profile="):
+            profile = arg.split("=", 1)[1] or DEFAULT_PREFIX
+        else:
+            words.append(arg)
+
+    if not words:
+        print("Usage: python -m semantic_normalization.cli [--profile[=PREFIX]] \"<text to normalize>\"")
+        print(f"Example: python -m semantic_normalization.cli \"{example}\"")
+        sys.exit(1)
+    return " ".join(words), profile
+
+
+def _report_profile(timings: dict[str, float], files: dict[str, str]):
+    print(file=sys.stderr)
+    print(format_stage_table(timings), file=sys.stderr)
+    for kind, path in files.items():
+        print(f"Profile ({kind}): {path}", file=sys.stderr)
 
 
 def main():
     """Main CLI entry point for simple normalization (no MCP dispatch)"""
     # Load environment variables
     load_dotenv()
+    configure_logging()
 
-    if len(sys.argv) < 2:
-        print("Usage: python -m semantic_normalization.cli \"<text to normalize>\"")
-        print("Example: python -m semantic_normalization.cli \"il a mangé la moitié\"")
-        sys.exit(1)
-
-    input_text = " ".join(sys.argv[1:])
+    if "--batch" in sys.argv[1:]:
+        from .batch import main as batch_main
+        batch_main([arg for arg in sys.argv[1:] if arg != "--batch"])
+        return
 
-    # Initialize normalizer
-    normalizer = SemanticNormalizer()
+    input_text, profile = _parse_args("il a mangé la moitié")
 
     # Normalize (returns tool calls without executing them)
     print(f"Input: {input_text}")
     print("-" * 50)
 
     try:
-        tool_calls, rag_context = normalizer.normalize(input_text)
+        timer = StageTimer(STAGE_SECONDS)
+        with profile_run(profile) if profile else nullcontext({}) as profile_files:
+            started = time.perf_counter()
+            normalizer = SemanticNormalizer()
+            tool_calls, rag_context = normalizer.normalize(input_text, timer=timer)
+            timer.timings["total"] = time.perf_counter() - started
 
         result = {
             "input": input_text,
@@ -38,6 +80,8 @@ def main():
         }
 
         print(json.dumps(result, indent=2, ensure_ascii=True))
+        if profile:
+            _report_profile(timer.timings, profile_files)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         import traceback
@@ -49,48 +93,36 @@ async def main_with_dispatch():
     """Main entry point with MCP dispatch (async)"""
     # Load environment variables
     load_dotenv()
+    configure_logging()
 
-    if len(sys.argv) < 2:
-        print("Usage: python -m semantic_normalization.cli \"<text to normalize>\"")
-        print("Example: python -m semantic_normalization.cli \"Gabriel a tout mangé\"")
-        sys.exit(1)
-
-    input_text = " ".join(sys.argv[1:])
+    input_text, profile = _parse_args("Gabriel a tout mangé")
 
     print(f"Input: {input_text}")
     print("-" * 50)
 
     try:
-        # Connect to MCP gateway
-        async with IntentGatewayClient() as mcp_client:
-            # Get tool schema from gateway
-            from .tool_schema import fetch_tool_schema_from_gateway
-            tool_schema = await fetch_tool_schema_from_gateway(mcp_client)
-
-            # Initialize normalizer with gateway schema
-            normalizer = SemanticNormalizer(tool_schema=tool_schema)
-
-            # Normalize and dispatch
-            result = await normalizer.normalize_and_dispatch(input_text, mcp_client)
-
-            # Print results
-            output = {
-                "input": result.input_text,
-                "rag_context": result.rag_context,
-                "tool_calls": [
-                    {
-                        "tool_name": tc.tool_name,
-                        "arguments": tc.arguments,
-                        "success": tc.success,
-                        "gateway_response": tc.gateway_response,
-                        "error": tc.error
-                    }
-                    for tc in result.tool_calls
-                ],
-                "all_succeeded": result.all_succeeded
-            }
-
-            print(json.dumps(output, indent=2, ensure_ascii=True))
+        with profile_run(profile) if profile else nullcontext({}) as profile_files:
+            # Warm models and RAG in the background while the gateway starts
+            normalizer = SemanticNormalizer(warm_up=True)
+
+            # Connect to MCP gateway (through the cassette, if one is configured)
+            gateway = IntentGatewayClient()
+            if normalizer.cassette is not None:
+                gateway = CassetteGatewayClient(normalizer.cassette, gateway)
+            async with gateway as mcp_client:
+                # Use the gateway's tool schema
+                from .tool_schema import fetch_tool_schema_from_gateway
+                normalizer.tool_schema = await fetch_tool_schema_from_gateway(mcp_client)
+
+                # Normalize and dispatch
+                result = await normalizer.normalize_and_dispatch(input_text, mcp_client)
+
+                # Print results
+                output = result.to_dict()
+
+                print(json.dumps(output, indent=2, ensure_ascii=True))
+        if profile:
+            _report_profile(result.timings, profile_files)
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -0,0 +1,24 @@
+"""
+Shared copy of the gateway's dimension table.
+
+Mirrored from packages/mcp-intent-gateway/src/mcp_intent_gateway/domain/constants.py
+(DIMENSION_VALUES), which remains the single source of truth. Kept as plain
+strings so the normalizer does not import the gateway package; a test fails
+when the two drift apart.
+"""
+
+# Valid values for each dimension - MUST match the gateway exactly
+DIMENSION_VALUES: dict[str, list[str]] = {
+    "MEAL_MAIN_CONSUMPTION": ["NOTHING", "QUARTER", "HALF", "THREE_QUARTERS", "ALL"],
+    "MEAL_DESSERT_CONSUMPTION": ["NOTHING", "QUARTER", "HALF", "THREE_QUARTERS", "ALL"],
+    "MEAL_VEGETABLE_CONSUMPTION": ["NOTHING", "QUARTER", "HALF", "THREE_QUARTERS", "ALL"],
+    "MEAL_TYPE": ["BREAKFAST", "LUNCH", "SNACK", "DINNER"],
+    "SLEEP_STATE": ["ASLEEP", "WOKE_UP", "RESTING", "REFUSED_SLEEP"],
+    "DIAPER_CHANGE_TYPE": ["WET", "DIRTY", "BOTH", "DRY"],
+    "ACTIVITY_TYPE": [
+        "OUTDOOR_PLAY", "INDOOR_PLAY", "CRAFT", "READING", "MUSIC", "MOTOR_SKILLS", "FREE_PLAY",
+    ],
+    "CHILD_MOOD": ["HAPPY", "CALM", "TIRED", "UPSET", "EXCITED", "CRANKY"],
+    "HEALTH_STATUS": ["HEALTHY", "FEVER", "COUGH", "RUNNY_NOSE", "RASH", "VOMITING", "DIARRHEA"],
+    "MEDICATION_TYPE": ["PAIN_RELIEVER", "ANTIBIOTIC", "ALLERGY", "VITAMIN", "OTHER"],
+}
@@ -0,0 +1,411 @@
+"""
+Pluggable embedding backends for the RAG layer.
+
+Three implementations share the same interface:
+- SentenceTransformerBackend: the reference model (requires torch)
+- OnnxEmbeddingBackend: same model exported to ONNX, run with onnxruntime on CPU
+- HashingEmbeddingBackend: deterministic, dependency-free fake for tests
+
+MicroBatchingBackend wraps any of them to encode the queries of concurrent
+requests together.
+
+The backend is selected through configuration (see get_embedding_backend).
+Indexes must be built and queried in the same embedding space: builders record
+the backend's space in the collection metadata and retrievers refuse a mismatch.
+The sentence-transformers and ONNX backends share a space for the same model.
+"""
+
+import hashlib
+import math
+import os
+import queue
+import re
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Optional
+
+from .metrics import REGISTRY
+
+DEFAULT_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+DEFAULT_BACKEND = "sentence-transformers"
+DEFAULT_DIMENSION = 384  # MiniLM-L12 output size
+
+# Configuration keys (environment variables)
+ENV_BACKEND = "EMBEDDING_BACKEND"
+ENV_MODEL_NAME = "EMBEDDING_MODEL_NAME"
+ENV_ONNX_DIR = "EMBEDDING_ONNX_DIR"
+ENV_ONNX_INT8 = "EMBEDDING_ONNX_INT8"
+ENV_BATCH_WAIT_MS = "EMBEDDING_BATCH_WAIT_MS"  # Unset: no micro-batching
+ENV_BATCH_SIZE = "EMBEDDING_BATCH_SIZE"
+
+DEFAULT_BATCH_SIZE = 32
+
+BATCH_SIZE = REGISTRY.histogram(
+    "normalizer_embedding_batch_texts",
+    "Texts per encoder call made by the micro-batching executor",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+# Collection metadata key written by the index builders.
+# Collections built before it existed were always sentence-transformers.
+METADATA_SPACE_KEY = "embedding_space"
+LEGACY_SPACE = DEFAULT_MODEL_NAME
+
+
+class EmbeddingBackend(ABC):
+    """Abstract interface for text embedding backends"""
+
+    name: str = "abstract"
+
+    @property
+    @abstractmethod
+    def space(self) -> str:
+        """Identifier of the embedding space (vectors are only comparable within one)"""
+        pass
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Encode a batch of texts into embedding vectors"""
+        pass
+
+    def __call__(self, texts: list[str]) -> list[list[float]]:
+        return self.embed(texts)
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """
+    Reference backend using sentence-transformers (PyTorch).
+    The model is loaded lazily on first use.
+    """
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, device: str = "cpu"):
+        self.model_name = model_name
+        self.device = device
+        self._model = None
+
+    @property
+    def space(self) -> str:
+        return self.model_name
+
+    def _load(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        model = self._load()
+        # Same settings as chromadb's SentenceTransformerEmbeddingFunction
+        return model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=False).tolist()
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """
+    CPU backend running an ONNX export of the sentence-transformers model.
+
+    Expects a local model directory containing:
+    - model.onnx (fp32) and/or model_quantized.onnx (int8)
+    - tokenizer.json (HuggingFace fast tokenizer)
+
+    Mean pooling over the attention mask reproduces sentence-transformers
+    output, so an index built with either backend can be queried by the other.
+    """
+
+    name = "onnx"
+
+    FP32_FILENAME = "model.onnx"
+    INT8_FILENAME = "model_quantized.onnx"
+
+    def __init__(
+        self,
+        model_dir: str,
+        model_name: str = DEFAULT_MODEL_NAME,
+        quantized: bool = False,
+        max_length: int = 128,
+        num_threads: Optional[int] = None,
+    ):
+        self.model_dir = model_dir
+        self.model_name = model_name
+        self.quantized = quantized
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self._session = None
+        self._tokenizer = None
+        self._input_names: set[str] = set()
+
+        model_file = self.INT8_FILENAME if quantized else self.FP32_FILENAME
+        self.model_path = os.path.join(model_dir, model_file)
+        self.tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+        for path in (self.model_path, self.tokenizer_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"ONNX embedding backend: missing {path}")
+
+    @property
+    def space(self) -> str:
+        return self.model_name
+
+    def _load(self):
+        if self._session is None:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.num_threads:
+                options.intra_op_num_threads = self.num_threads
+
+            tokenizer = Tokenizer.from_file(self.tokenizer_path)
+            tokenizer.enable_truncation(max_length=self.max_length)
+            tokenizer.enable_padding()
+
+            self._session = ort.InferenceSession(
+                self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            self._input_names = {i.name for i in self._session.get_inputs()}
+            self._tokenizer = tokenizer
+        return self._session, self._tokenizer
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        import numpy as np
+
+        if not texts:
+            return []
+
+        session, tokenizer = self._load()
+        encodings = tokenizer.encode_batch(list(texts))
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = session.run(None, feeds)[0]
+
+        # Mean pooling (sentence-transformers default for MiniLM)
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return (summed / counts).tolist()
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Deterministic fake backend for tests.
+
+    Hashes accent-folded words and character trigrams into a fixed-size,
+    L2-normalised vector. No model, no native dependencies, and identical
+    output across processes (does not rely on Python's salted hash()).
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = DEFAULT_DIMENSION):
+        self.dimension = dimension
+
+    @property
+    def space(self) -> str:
+        return f"hashing-{self.dimension}"
+
+    @staticmethod
+    def _features(text: str) -> list[str]:
+        folded = unicodedata.normalize("NFKD", text.lower())
+        folded = "".join(c for c in folded if not unicodedata.combining(c))
+        features = []
+        for word in re.findall(r"\w+%?", folded):
+            features.append(f"w:{word}")
+            padded = f"#{word}#"
+            features.extend(f"g:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def _embed_one(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimension
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimension
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0.0:
+            return vector
+        return [v / norm for v in vector]
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed_one(t) for t in texts]
+
+
+class MicroBatchingBackend(EmbeddingBackend):
+    """
+    Coalesces concurrent embed() calls into one call on a wrapped backend.
+
+    A single-sentence encoder call leaves most of the CPU's matrix
+    throughput unused. Callers hand their texts to a dedicated worker
+    thread and block on a future; the worker takes the first waiting
+    request, collects more for up to max_wait_ms (or until max_batch_size
+    texts), encodes them in one call and resolves every caller's future.
+    While the worker encodes, new requests queue up and form the next
+    batch, so under load batches fill without waiting.
+
+    The wrapped backend is only ever called from the worker thread.
+    """
+
+    name = "micro-batching"
+
+    def __init__(
+        self,
+        backend: EmbeddingBackend,
+        max_wait_ms: float = 2.0,
+        max_batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.backend = backend
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def space(self) -> str:
+        return self.backend.space
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork: a forked worker process starts its own
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None:
+                self._queue = queue.SimpleQueue()
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def close(self):
+        """Stop the worker thread after the requests already queued."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None and self._pid == os.getpid():
+                self._queue.put(None)
+                thread.join()
+
+    def _run(self):
+        requests = self._queue
+        while True:
+            first = requests.get()
+            if first is None:
+                return
+            batch, size, stop = [first], len(first[0]), False
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = requests.get(timeout=remaining) if remaining > 0 else requests.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._encode(batch)
+            if stop:
+                return
+
+    def _encode(self, batch: list[tuple[list[str], Future]]):
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        BATCH_SIZE.observe(len(texts))
+        try:
+            vectors = self.backend.embed(texts)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        offset = 0
+        for request_texts, future in batch:
+            future.set_result(vectors[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+
+# One instance per configuration, shared by all retrievers in the process
+_BACKEND_CACHE: dict[tuple, EmbeddingBackend] = {}
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_embedding_backend(name: Optional[str] = None, **kwargs) -> EmbeddingBackend:
+    """
+    Return the configured embedding backend (cached per configuration).
+
+    Args:
+        name: "sentence-transformers", "onnx" or "hashing".
+              Defaults to the EMBEDDING_BACKEND env var, then sentence-transformers.
+        **kwargs: Backend constructor overrides. When omitted, read from
+                  EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_DIR and EMBEDDING_ONNX_INT8.
+
+    With EMBEDDING_BATCH_WAIT_MS set, the backend is wrapped in a
+    MicroBatchingBackend (batches of up to EMBEDDING_BATCH_SIZE texts).
+
+    Returns:
+        EmbeddingBackend instance
+
+    Raises:
+        ValueError: If the backend name is unknown or required config is missing
+    """
+    name = (name or os.getenv(ENV_BACKEND) or DEFAULT_BACKEND).strip().lower()
+
+    if name in ("sentence-transformers", "sentence_transformers", "st"):
+        name = SentenceTransformerBackend.name
+        kwargs.setdefault("model_name", os.getenv(ENV_MODEL_NAME, DEFAULT_MODEL_NAME))
+        factory = SentenceTransformerBackend
+    elif name == OnnxEmbeddingBackend.name:
+        kwargs.setdefault("model_dir", os.getenv(ENV_ONNX_DIR))
+        kwargs.setdefault("model_name", os.getenv(ENV_MODEL_NAME, DEFAULT_MODEL_NAME))
+        kwargs.setdefault("quantized", _env_flag(ENV_ONNX_INT8))
+        if not kwargs["model_dir"]:
+            raise ValueError(f"ONNX embedding backend requires {ENV_ONNX_DIR} or model_dir")
+        factory = OnnxEmbeddingBackend
+    elif name == HashingEmbeddingBackend.name:
+        factory = HashingEmbeddingBackend
+    else:
+        raise ValueError(
+            f"Unknown embedding backend: {name}. "
+            f"Must be one of: sentence-transformers, onnx, hashing"
+        )
+
+    batch_wait_ms = os.getenv(ENV_BATCH_WAIT_MS)
+    batch_size = int(os.getenv(ENV_BATCH_SIZE, str(DEFAULT_BATCH_SIZE)))
+    key = (name, tuple(sorted(kwargs.items())), batch_wait_ms, batch_size)
+    if key not in _BACKEND_CACHE:
+        backend = factory(**kwargs)
+        if batch_wait_ms:
+            backend = MicroBatchingBackend(backend, float(batch_wait_ms), batch_size)
+        _BACKEND_CACHE[key] = backend
+    return _BACKEND_CACHE[key]
+
+
+def clear_backend_cache():
+    """Drop cached backend instances (useful for testing)."""
+    for backend in _BACKEND_CACHE.values():
+        if isinstance(backend, MicroBatchingBackend):
+            backend.close()
+    _BACKEND_CACHE.clear()
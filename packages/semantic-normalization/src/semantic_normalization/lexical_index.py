@@ -0,0 +1,224 @@
+"""
+Lexical index over the lexicon: accent-folded tokens, character n-grams, BM25.
+
+Short lexicon entries ("0%", "25%", "tout", "dodo") are poorly separated
+by sentence embeddings but trivial to match literally. The index scores
+every entry with BM25 over two kinds of features:
+- words of the accent-folded, lowercased phrase ("25%" stays one token)
+- character trigrams of each word (tolerates inflection and ASR spelling)
+
+It also reports exact hits: entries whose whole phrase occurs as
+consecutive tokens of the query. Exact hits are high-confidence when they
+agree (one value per dimension), explain most of the query's content
+words and no negation outside them changes their meaning ("n'a pas tout
+mangé" is not "tout"); see LexicalMatch.confident. HybridRAGRetriever
+(rag_interface.py) then answers from this index alone and skips the encoder.
+"""
+import json
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+# Words that carry no lexicon meaning (not counted against coverage)
+STOPWORDS = frozenset(
+    "a au aux ce cet cette de des du elle en est et il ils l la le les lui ma mais mes "
+    "mon on ou par pour qu que qui s sa se ses son sur ta te tes ton un une y".split()
+)
+# Outside an exact hit, these may invert it: the match is never confident
+NEGATIONS = frozenset("ne n pas jamais aucun aucune ni sans".split())
+GRAM_SIZE = 3
+
+
+def fold(text: str) -> str:
+    """Strip accents (keeps case)."""
+    decomposed = unicodedata.normalize("NFKD", text.replace("’", "'"))
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _words(text: str) -> list[str]:
+    """Accent-folded words, case kept; "25 %" and "25%" both give "25%"."""
+    return [re.sub(r"\s+", "", word) for word in re.findall(r"\d+\s*%|\w+", fold(text))]
+
+
+def tokenize(text: str) -> list[str]:
+    """Accent-folded, lowercased tokens."""
+    return [word.lower() for word in _words(text)]
+
+
+def _features(tokens: list[str]) -> list[str]:
+    features = []
+    for token in tokens:
+        features.append(f"w:{token}")
+        padded = f"#{token}#"
+        features.extend(f"g:{padded[i:i + GRAM_SIZE]}" for i in range(len(padded) - GRAM_SIZE + 1))
+    return features
+
+
+@dataclass
+class LexicalHit:
+    """A lexicon entry matched by a query."""
+    document: str
+    metadata: dict
+    score: float  # BM25 score
+    exact: bool = False  # Whole phrase found in the query
+
+
+@dataclass
+class LexicalMatch:
+    """Ranked hits for a query (exact hits first)."""
+    hits: list[LexicalHit] = field(default_factory=list)
+    confident: bool = False  # Exact hits alone are a reliable context
+    coverage: float = 0.0  # Share of the query's content words inside exact hits
+    negated: bool = False  # The query has a negation outside every exact hit
+
+
+class LexicalIndex:
+    """
+    Inverted index with BM25 scoring over lexicon entries.
+
+    Usage:
+        index = LexicalIndex.from_lexicon_file(LEXICON_PATH)
+        match = index.search("Gabriel a tout mangé", top_k=5)
+        match.confident, [hit.document for hit in match.hits]
+    """
+
+    def __init__(
+        self,
+        documents: list[str],
+        metadatas: list[dict],
+        k1: float = 1.2,
+        b: float = 0.75,
+        gram_weight: float = 0.5,
+        min_coverage: float = 0.75,
+        min_relative_score: float = 0.3,
+    ):
+        """
+        Args:
+            documents: Lexicon phrases
+            metadatas: Per phrase, at least "dimension" and "canonical_value"
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+            gram_weight: Weight of character n-gram features relative to words
+            min_coverage: Share of content words exact hits must explain to be confident
+            min_relative_score: Non-exact hits scoring below this share of the best
+                score are dropped (a shared trigram is not evidence)
+        """
+        self.documents = documents
+        self.metadatas = metadatas
+        self.k1 = k1
+        self.b = b
+        self.gram_weight = gram_weight
+        self.min_coverage = min_coverage
+        self.min_relative_score = min_relative_score
+
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._lengths: list[int] = []
+        self._phrases: dict[tuple[str, ...], list[int]] = defaultdict(list)
+        for entry, document in enumerate(documents):
+            tokens = tokenize(document)
+            features = Counter(_features(tokens))
+            for feature, count in features.items():
+                self._postings[feature].append((entry, count))
+            self._lengths.append(sum(features.values()))
+            if tokens:
+                self._phrases[tuple(tokens)].append(entry)
+        self._average_length = sum(self._lengths) / max(len(self._lengths), 1)
+        self._longest_phrase = max((len(p) for p in self._phrases), default=0)
+        count = len(documents)
+        self._idf = {
+            feature: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for feature, postings in self._postings.items()
+        }
+
+    @classmethod
+    def from_lexicon(cls, lexicon: dict, **kwargs) -> "LexicalIndex":
+        """Index a lexicon ({dimension: {canonical_value: [phrases]}})."""
+        documents, metadatas = [], []
+        for dimension, mapping in lexicon.items():
+            for canonical_value, phrases in mapping.items():
+                for phrase in phrases:
+                    documents.append(phrase)
+                    metadatas.append({"dimension": dimension, "canonical_value": canonical_value})
+        return cls(documents, metadatas, **kwargs)
+
+    @classmethod
+    def from_lexicon_file(cls, path: str, **kwargs) -> "LexicalIndex":
+        """Index the knowledge base's lexicon JSON file."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_lexicon(json.load(f), **kwargs)
+
+    def _scores(self, tokens: list[str]) -> dict[int, float]:
+        scores: dict[int, float] = defaultdict(float)
+        for feature in set(_features(tokens)):
+            postings = self._postings.get(feature)
+            if not postings:
+                continue
+            weight = self._idf[feature] * (self.gram_weight if feature.startswith("g:") else 1.0)
+            for entry, count in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[entry] / self._average_length)
+                scores[entry] += weight * count * (self.k1 + 1) / (count + norm)
+        return scores
+
+    def _exact_spans(self, tokens: list[str]) -> list[tuple[int, int, list[int]]]:
+        """Maximal (start, end, entries) phrase occurrences: spans inside a longer hit are dropped."""
+        spans = []
+        for start in range(len(tokens)):
+            for end in range(start + 1, min(start + self._longest_phrase, len(tokens)) + 1):
+                entries = self._phrases.get(tuple(tokens[start:end]))
+                if entries:
+                    spans.append((start, end, entries))
+        return [
+            (start, end, entries)
+            for start, end, entries in spans
+            if not any(s <= start and end <= e and (s, e) != (start, end) for s, e, _ in spans)
+        ]
+
+    def search(self, query: str, top_k: int = 5) -> LexicalMatch:
+        """
+        Rank lexicon entries for a query.
+
+        Returns:
+            Up to top_k hits (exact hits first, longest phrases first, then
+            by BM25 score; weak partial matches dropped) and whether the
+            exact hits are a confident answer
+        """
+        folded_words = _words(query)
+        tokens = [word.lower() for word in folded_words]
+        scores = self._scores(tokens)
+        spans = self._exact_spans(tokens)
+
+        exact: dict[int, int] = {}  # Entry -> matched length
+        covered: set[int] = set()
+        values: dict[str, set[str]] = defaultdict(set)
+        for start, end, entries in spans:
+            covered.update(range(start, end))
+            for entry in entries:
+                exact[entry] = max(exact.get(entry, 0), end - start)
+                values[self.metadatas[entry]["dimension"]].add(self.metadatas[entry]["canonical_value"])
+
+        # Content words: covered ones, plus lowercase non-stopwords (capitalized words are names)
+        content = [
+            i for i, word in enumerate(folded_words)
+            if i in covered or (tokens[i] not in STOPWORDS and not word[:1].isupper())
+        ]
+        coverage = len(covered) / len(content) if content else 0.0
+        consistent = all(len(dimension_values) == 1 for dimension_values in values.values())
+        negated = any(token in NEGATIONS and i not in covered for i, token in enumerate(tokens))
+
+        threshold = self.min_relative_score * max(scores.values(), default=0.0)
+        ranked = sorted(
+            (entry for entry in scores if entry in exact or scores[entry] >= threshold),
+            key=lambda entry: (-exact.get(entry, 0), -scores[entry], entry),
+        )
+        hits = [
+            LexicalHit(self.documents[entry], self.metadatas[entry], scores[entry], entry in exact)
+            for entry in ranked[:top_k]
+        ]
+        return LexicalMatch(
+            hits=hits,
+            confident=bool(exact) and consistent and not negated and coverage >= self.min_coverage,
+            coverage=coverage,
+            negated=negated,
+        )
@@ -0,0 +1,188 @@
+"""
+Non-blocking, structured, sampled logging.
+
+Mirrors mcp_intent_gateway.logging_config. Records are put on an
+in-memory queue by the calling thread (usually the event loop) and
+formatted and written to stderr by a QueueListener thread, so log calls
+use lazy %-style arguments. Records at WARNING and above are always
+kept; lower levels can be sampled per logger. Environment variables:
+
+- NORMALIZER_LOG_LEVEL: minimum level (default WARNING)
+- NORMALIZER_LOG_FORMAT: "text" (default) or "json" (one object per line)
+- NORMALIZER_LOG_SAMPLE: fraction of sub-WARNING records kept (default 1.0)
+- NORMALIZER_LOG_SAMPLE_RATES: per-logger fractions overriding the default,
+  e.g. "semantic_normalization.mcp_client=0.05,httpx=0"
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Any, Optional, Union
+
+ENV_LEVEL = "NORMALIZER_LOG_LEVEL"
+ENV_FORMAT = "NORMALIZER_LOG_FORMAT"
+ENV_SAMPLE = "NORMALIZER_LOG_SAMPLE"
+ENV_SAMPLE_RATES = "NORMALIZER_LOG_SAMPLE_RATES"
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; `extra` fields become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of sub-WARNING records, per logger.
+
+    The rate of the most specific configured logger name applies
+    ("a.b" covers "a.b.c"); other loggers use default_rate.
+    """
+
+    def __init__(self, default_rate: float = 1.0, rates: Optional[dict[str, float]] = None) -> None:
+        """
+        Initialize the filter.
+
+        Args:
+            default_rate: Fraction of sub-WARNING records kept (1.0 keeps all)
+            rates: Per-logger fractions overriding default_rate
+        """
+        super().__init__()
+        self.default_rate = default_rate
+        self.rates = dict(rates or {})
+        self._resolved: dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        """Sampling rate of a logger."""
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = self.default_rate
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The queue never leaves the process, so records need not be made
+    picklable. Filtering and sampling still see the lazy arguments; only
+    records that will be enqueued have their message interpolated here,
+    so the listener never reads arguments the caller may since have
+    mutated. Layout (timestamps, JSON, tracebacks) stays on the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    """Parse "logger=rate,logger=rate" into a mapping."""
+    rates = {}
+    for item in value.split(","):
+        name, sep, rate = item.strip().partition("=")
+        if sep:
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging(
+    level: Optional[Union[int, str]] = None,
+    json_format: Optional[bool] = None,
+    sample_rate: Optional[float] = None,
+    sample_rates: Optional[dict[str, float]] = None,
+    stream: Optional[IO[str]] = None,
+) -> QueueListener:
+    """
+    Route root logging through a queue to a background writer thread.
+
+    Arguments default to the NORMALIZER_LOG_* environment variables. Calling
+    it again replaces the previous configuration.
+
+    Args:
+        level: Minimum level
+        json_format: Emit JSON lines instead of text
+        sample_rate: Fraction of sub-WARNING records kept
+        sample_rates: Per-logger fractions overriding sample_rate
+        stream: Destination (default: stderr)
+
+    Returns:
+        The running QueueListener (stopped automatically at exit)
+    """
+    global _listener
+    if level is None:
+        level = os.getenv(ENV_LEVEL, "WARNING").upper()
+    if json_format is None:
+        json_format = os.getenv(ENV_FORMAT, "text").lower() == "json"
+    if sample_rate is None:
+        sample_rate = float(os.getenv(ENV_SAMPLE, "1.0"))
+    if sample_rates is None:
+        sample_rates = parse_sample_rates(os.getenv(ENV_SAMPLE_RATES, ""))
+
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler = DeferredQueueHandler(records)
+    handler.addFilter(SamplingFilter(sample_rate, sample_rates))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(records, output)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread (no-op if not running)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -1,89 +1,338 @@
 """
 MCP Client for Intent Gateway communication.
 """
+import asyncio
+import importlib
 import json
 import logging
 import os
-from typing import Any
-
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+import sys
+from contextlib import AsyncExitStack
+from typing import TYPE_CHECKING, Any, Optional
 
 from .tool_schema import fetch_tool_schema_from_gateway
 
+if TYPE_CHECKING:
+    from mcp import ClientSession
+
 logger = logging.getLogger(__name__)
 
+# Seconds allowed for a subprocess to shut down before its task is cancelled
+STOP_TIMEOUT = 5.0
+
+# Transports
+TRANSPORT_STDIO = "stdio"           # Gateway subprocess(es) over MCP stdio
+TRANSPORT_IN_PROCESS = "inprocess"  # Gateway tools called directly, same event loop
+TRANSPORT_HTTP = "http"             # Shared network gateway over streamable HTTP
+TRANSPORTS = (TRANSPORT_STDIO, TRANSPORT_IN_PROCESS, TRANSPORT_HTTP)
+
+DEFAULT_GATEWAY_URL = "http://127.0.0.1:3002/mcp"
+
+
+class GatewayToolError(ValueError):
+    """The gateway reported a tool error (unknown tool, invalid arguments, tool failure)."""
+
+
+class GatewayProcess:
+    """
+    One gateway subprocess and its MCP session.
+
+    The stdio transport and session are entered and exited by a dedicated
+    task (anyio requires both in the same task), so the process can be
+    restarted from any task, e.g. the pool's health checker.
+    """
+
+    def __init__(self, command: str, args: list[str], env: Optional[dict[str, str]] = None, index: int = 0):
+        self.command = command
+        self.args = args
+        self.env = env
+        self.index = index
+        self.session: "ClientSession | None" = None
+        self.in_flight = 0
+        self.restarts = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Spawn the subprocess and complete the MCP handshake."""
+        self._stop = asyncio.Event()
+        self._ready = asyncio.Event()
+        self._error = None
+        self._task = asyncio.create_task(self._run(), name=f"gateway-{self.index}")
+        await self._ready.wait()
+        if self._error is not None:
+            raise RuntimeError(f"Gateway process {self.index} failed to start: {self._error}")
+
+    async def _open_transport(self, stack: AsyncExitStack):
+        """Open the read/write streams for the MCP session."""
+        from mcp import StdioServerParameters
+        from mcp.client.stdio import stdio_client
+
+        params = StdioServerParameters(command=self.command, args=self.args, env=self.env)
+        return await stack.enter_async_context(stdio_client(params))
+
+    async def _run(self):
+        from mcp import ClientSession
+
+        try:
+            async with AsyncExitStack() as stack:
+                read, write = await self._open_transport(stack)
+                session = await stack.enter_async_context(ClientSession(read, write))
+                await session.initialize()
+                self.session = session
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self._error = e
+            logger.warning("Gateway process %s exited: %s", self.index, e)
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def stop(self):
+        """Close the session and terminate the subprocess."""
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def restart(self):
+        """Replace the subprocess with a fresh one."""
+        await self.stop()
+        self.restarts += 1
+        await self.start()
+
+    def mark_broken(self):
+        """Flag the transport as dead so no new calls are routed here."""
+        self.session = None
+
+    async def ping(self, timeout: float) -> bool:
+        """Round-trip an MCP ping."""
+        if not self.healthy:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+
+class GatewayHttpConnection(GatewayProcess):
+    """An MCP session with a network gateway (streamable HTTP) instead of a subprocess."""
+
+    def __init__(self, url: str, index: int = 0):
+        super().__init__(command="", args=[], index=index)
+        self.url = url
+
+    async def _open_transport(self, stack: AsyncExitStack):
+        from mcp.client.streamable_http import streamable_http_client
+
+        read, write, _ = await stack.enter_async_context(streamable_http_client(self.url))
+        return read, write
+
 
 class IntentGatewayClient:
     """
     MCP client for the Intent Gateway.
 
-    Manages connection to the MCP gateway subprocess and provides
-    methods for executing tool calls.
+    Manages a pool of gateway subprocesses (one by default) and provides
+    methods for executing tool calls. With pool_size > 1, calls are sent to
+    the least-busy process, a background task pings every process and
+    crashed processes are restarted transparently.
+
+    With transport="inprocess" the gateway module is imported and its tools
+    are awaited directly in the caller's event loop (co-located deployments).
+    Results and errors are the same as over stdio, without the JSON
+    serialization and MCP framing.
+
+    With transport="http" the pool holds sessions to a shared network
+    gateway (python -m mcp_intent_gateway.server --transport streamable-http)
+    instead of subprocesses.
 
     Usage:
         async with IntentGatewayClient() as client:
             result = await client.execute_tool_call("process_canonical_fact", {...})
+
+        async with IntentGatewayClient(pool_size=4) as client:
+            results = await asyncio.gather(*(client.execute_tool_call(...) for ...))
+
+        async with IntentGatewayClient(transport="inprocess") as client:
+            ...
+
+        async with IntentGatewayClient(transport="http", url="http://gateway:3002/mcp") as client:
+            ...
     """
 
-    def __init__(self, gateway_module: str = "mcp_intent_gateway.server"):
+    def __init__(
+        self,
+        gateway_module: str = "mcp_intent_gateway.server",
+        pool_size: int = 1,
+        health_check_interval: Optional[float] = 30.0,
+        python_executable: Optional[str] = None,
+        env: Optional[dict[str, str]] = None,
+        transport: str = TRANSPORT_STDIO,
+        url: Optional[str] = None,
+    ):
         """
         Initialize the MCP client.
 
         Args:
             gateway_module: Python module path for the gateway server
+            pool_size: Number of warm gateway subprocesses
+            health_check_interval: Seconds between health checks (None disables)
+            python_executable: Interpreter for the gateway (defaults to sys.executable)
+            env: Environment for the subprocesses (None uses the MCP SDK default)
+            transport: "stdio" (subprocess pool), "inprocess" (direct calls)
+                       or "http" (sessions to a network gateway)
+            url: Gateway endpoint for the http transport (defaults to GATEWAY_URL
+                 env var or http://127.0.0.1:3002/mcp)
         """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport: {transport}")
+        self.transport = transport
+        self.url = url or os.getenv("GATEWAY_URL", DEFAULT_GATEWAY_URL)
         self.gateway_module = gateway_module
-        self.session: ClientSession | None = None
-        self._stdio_context = None
-        self._read = None
-        self._write = None
-
-    async def __aenter__(self):
-        """Enter async context manager - start MCP subprocess."""
-        logger.info(f"Starting MCP gateway subprocess: {self.gateway_module}")
-
-        # Determine Python executable
-        # Use the virtual environment's Python if available
-        python_exe = os.path.join(os.getcwd(), ".venv", "Scripts", "python.exe")
-        if not os.path.exists(python_exe):
-            python_exe = "python"
-
-        # Create server parameters
-        server_params = StdioServerParameters(
-            command=python_exe,
+        self.pool_size = pool_size
+        self.health_check_interval = health_check_interval
+        self.python_executable = python_executable or sys.executable
+        self.env = env
+        self.processes: list[GatewayProcess] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self._restarting: dict[int, asyncio.Task] = {}
+        self._next = 0
+        self._gateway = None  # Imported gateway module (in-process transport)
+
+    def _create_process(self, index: int) -> GatewayProcess:
+        if self.transport == TRANSPORT_HTTP:
+            return GatewayHttpConnection(self.url, index=index)
+        return GatewayProcess(
+            command=self.python_executable,
             args=["-m", self.gateway_module],
-            env=None,
+            env=self.env,
+            index=index,
         )
 
-        # Start stdio client
-        self._stdio_context = stdio_client(server_params)
-        self._read, self._write = await self._stdio_context.__aenter__()
+    @property
+    def session(self) -> "ClientSession | None":
+        """A healthy MCP session from the pool, or None if not connected."""
+        for process in self.processes:
+            if process.healthy:
+                return process.session
+        return None
 
-        # Initialize session
-        self.session = ClientSession(self._read, self._write)
-        await self.session.__aenter__()
-
-        # Initialize the session
-        await self.session.initialize()
+    async def __aenter__(self):
+        """Enter async context manager - start MCP subprocesses."""
+        if self.transport == TRANSPORT_IN_PROCESS:
+            logger.info("Loading MCP gateway in-process: %s", self.gateway_module)
+            self._gateway = importlib.import_module(self.gateway_module)
+            return self
+
+        if self.transport == TRANSPORT_HTTP:
+            logger.info("Opening %d MCP gateway session(s): %s", self.pool_size, self.url)
+        else:
+            logger.info("Starting %d MCP gateway subprocess(es): %s", self.pool_size, self.gateway_module)
+
+        self.processes = [self._create_process(i) for i in range(self.pool_size)]
+        results = await asyncio.gather(*(p.start() for p in self.processes), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            await self._close_processes()
+            raise errors[0]
+
+        if self.health_check_interval:
+            self._health_task = asyncio.create_task(self._health_loop())
 
         logger.info("MCP gateway connected successfully")
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Exit async context manager - close MCP subprocess."""
+        """Exit async context manager - close MCP subprocesses."""
         logger.info("Closing MCP gateway connection")
 
-        if self.session:
-            await self.session.__aexit__(exc_type, exc_val, exc_tb)
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
 
-        if self._stdio_context:
-            await self._stdio_context.__aexit__(exc_type, exc_val, exc_tb)
+        await self._close_processes()
+        self._gateway = None
 
-        self.session = None
-        self._stdio_context = None
-        self._read = None
-        self._write = None
+    async def _close_processes(self):
+        for task in list(self._restarting.values()):
+            task.cancel()
+        await asyncio.gather(*self._restarting.values(), return_exceptions=True)
+        self._restarting.clear()
+        await asyncio.gather(*(p.stop() for p in self.processes), return_exceptions=True)
+        self.processes = []
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await self.check_health()
+
+    async def check_health(self, timeout: float = 5.0) -> list[bool]:
+        """
+        Ping every gateway process and restart the ones that do not answer.
+
+        Returns:
+            Health of each process before any restart
+        """
+        health = await asyncio.gather(*(p.ping(timeout) for p in self.processes))
+        for process, ok in zip(self.processes, health):
+            if not ok:
+                self._schedule_restart(process)
+        return list(health)
+
+    def _schedule_restart(self, process: GatewayProcess) -> asyncio.Task:
+        """Restart a process once, however many callers notice it is down."""
+        task = self._restarting.get(process.index)
+        if task is None:
+            logger.warning("Restarting gateway process %s", process.index)
+            task = asyncio.create_task(process.restart())
+            task.add_done_callback(lambda _: self._restarting.pop(process.index, None))
+            self._restarting[process.index] = task
+        return task
+
+    async def _acquire(self) -> GatewayProcess:
+        """Pick the healthy process with the fewest in-flight calls."""
+        if not self.processes:
+            raise RuntimeError("Client not connected. Use async with context manager.")
+
+        healthy = [p for p in self.processes if p.healthy]
+        if not healthy:
+            # Everything is down: wait for one restart instead of failing outright
+            restart = self._schedule_restart(self.processes[0])
+            await asyncio.gather(asyncio.shield(restart), return_exceptions=True)
+            healthy = [p for p in self.processes if p.healthy]
+            if not healthy:
+                raise RuntimeError("No healthy MCP gateway process available")
+
+        # Rotate the starting point so ties are spread round-robin
+        self._next = (self._next + 1) % len(healthy)
+        ordered = healthy[self._next:] + healthy[:self._next]
+        return min(ordered, key=lambda p: p.in_flight)
+
+    async def list_tools(self):
+        """List the gateway's MCP tools."""
+        if self._gateway is not None:
+            from mcp.types import ListToolsResult
+            return ListToolsResult(tools=await self._gateway.list_tools_in_process())
+
+        process = await self._acquire()
+        return await process.session.list_tools()
 
     async def get_tool_schema(self) -> list[dict]:
         """
@@ -92,34 +341,58 @@ class IntentGatewayClient:
         Returns:
             List of OpenAI-formatted tool schemas
         """
-        if not self.session:
+        if not self.session and self._gateway is None:
             raise RuntimeError("Client not connected. Use async with context manager.")
 
-        return await fetch_tool_schema_from_gateway(self.session)
+        return await fetch_tool_schema_from_gateway(self)
 
-    async def execute_tool_call(self, tool_name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+    async def execute_tool_call(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        meta: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
         """
         Execute a tool call against the MCP gateway.
 
         Args:
             tool_name: Name of the tool to call (e.g., "process_canonical_fact")
             arguments: Tool arguments as a dictionary
+            meta: MCP request metadata (e.g., {"traceparent": ...} for tracing)
 
         Returns:
             Tool result as a dictionary
 
         Raises:
             RuntimeError: If client not connected
+            GatewayToolError: If the gateway reports a tool error
             Exception: If tool call fails
         """
-        if not self.session:
-            raise RuntimeError("Client not connected. Use async with context manager.")
-
-        logger.info(f"Executing tool call: {tool_name} with args: {arguments}")
+        if self._gateway is not None:
+            return await self._execute_in_process(tool_name, arguments, meta)
+
+        import anyio
+
+        for attempt in range(len(self.processes) or 1):
+            process = await self._acquire()
+            logger.debug("Executing tool call on gateway %s: %s with args: %s", process.index, tool_name, arguments)
+
+            process.in_flight += 1
+            try:
+                result = await process.session.call_tool(tool_name, arguments=arguments, meta=meta)
+                break
+            except (anyio.ClosedResourceError, anyio.BrokenResourceError) as e:
+                # The subprocess died: the request never reached it, so it is
+                # safe to replace the process and retry on another one
+                logger.warning("Gateway process %s is down (%s), retrying", process.index, type(e).__name__)
+                process.mark_broken()
+                self._schedule_restart(process)
+                if attempt == len(self.processes) - 1:
+                    raise
+            finally:
+                process.in_flight -= 1
 
         try:
-            result = await self.session.call_tool(tool_name, arguments=arguments)
-
             # MCP returns a CallToolResult with content list
             # Each content item is a TextContent or ImageContent
             # For our case, we expect TextContent with JSON
@@ -128,13 +401,34 @@ class IntentGatewayClient:
 
             # Extract the text content
             content = result.content[0]
+            if result.isError:
+                raise GatewayToolError(getattr(content, "text", "Tool call failed"))
             if hasattr(content, 'text'):
                 response_data = json.loads(content.text)
-                logger.info(f"Tool call successful: {response_data.get('message', 'No message')}")
+                logger.info("Tool call successful: %s", response_data.get("message", "No message"))
                 return response_data
             else:
                 raise ValueError(f"Unexpected content type: {type(content)}")
 
         except Exception as e:
-            logger.error(f"Tool call failed: {e}", exc_info=True)
+            logger.exception("Tool call failed: %s", e)
             raise
+
+    async def _execute_in_process(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        meta: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """Await the gateway tool directly (transport="inprocess")."""
+        from mcp.server.fastmcp.exceptions import ToolError
+
+        logger.debug("Executing in-process tool call: %s with args: %s", tool_name, arguments)
+        try:
+            response_data = await self._gateway.call_tool_in_process(tool_name, arguments, meta=meta)
+        except ToolError as e:
+            logger.error("Tool call failed: %s", e)
+            raise GatewayToolError(str(e)) from e
+
+        logger.info("Tool call successful: %s", response_data.get("message", "No message"))
+        return response_data
@@ -0,0 +1,306 @@
+"""
+In-process metrics: counters and fixed-bucket histograms.
+
+Mirrors mcp_intent_gateway.metrics (the packages are installed
+independently). Observing a value is a bisect and a few increments, so
+the normalizer times every stage of every utterance. The registry
+renders the Prometheus text exposition format and a JSON snapshot.
+"""
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+# Seconds: 0.5 ms .. 30 s
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _json_bound(value: float | None) -> float | str | None:
+    return "+Inf" if value is not None and math.isinf(value) else value
+
+
+class _CounterChild:
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, bucket_count in zip((*self.bounds, math.inf), self.counts, strict=True):
+            seen += bucket_count
+            if seen >= target:
+                return bound
+        return math.inf
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        """Sample lines in the Prometheus text format."""
+        raise NotImplementedError
+
+    def snapshot(self) -> dict[str, Any]:
+        """Values by comma-joined label values."""
+        raise NotImplementedError
+
+    def _child(self, values: tuple[str, ...]) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally labelled."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def labels(self, *values: str) -> _CounterChild:
+        """Counter for one combination of label values."""
+        child: _CounterChild = self._child(values)
+        return child
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in sorted(self._children.items())
+        ]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {",".join(values): child.value for values, child in sorted(self._children.items())}
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram, optionally labelled."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def labels(self, *values: str) -> _HistogramChild:
+        """Histogram for one combination of label values."""
+        child: _HistogramChild = self._child(values)
+        return child
+
+    def observe(self, value: float) -> None:
+        """Observe a value on the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def render(self) -> list[str]:
+        lines = []
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), child.counts, strict=True):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                labels = _format_labels(self.labelnames, values, le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            ",".join(values): {
+                "count": child.count,
+                "sum": child.sum,
+                **{
+                    name: _json_bound(child.quantile(q))
+                    for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+                },
+            }
+            for values, child in sorted(self._children.items())
+        }
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one request into a histogram labelled by stage.
+
+    Usage:
+        timer = StageTimer(STAGE_SECONDS)
+        timer.start("validation")
+        ...
+        timer.start("mapping")  # Ends "validation"
+        ...
+        timer.stop()
+        timer.timings  # {"validation": 0.0001, "mapping": 0.0002}
+    """
+
+    def __init__(self, histogram: Histogram) -> None:
+        self.histogram = histogram
+        self.timings: dict[str, float] = {}
+        self._stage: str | None = None
+        self._started = 0.0
+
+    def start(self, stage: str) -> None:
+        """End the current stage, if any, and start timing the next one."""
+        self.stop()
+        self._stage = stage
+        self._started = time.perf_counter()
+
+    def stop(self) -> None:
+        """End the current stage (no-op if none is running)."""
+        if self._stage is None:
+            return
+        elapsed = time.perf_counter() - self._started
+        self.histogram.labels(self._stage).observe(elapsed)
+        self.timings[self._stage] = self.timings.get(self._stage, 0.0) + elapsed
+        self._stage = None
+
+
+class MetricsRegistry:
+    """Named counters and histograms with Prometheus text export."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.setdefault(metric.name, metric)
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} already registered differently")
+        return existing
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """Get or create a counter."""
+        counter: Counter = self._register(Counter(name, documentation, labelnames))
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        histogram: Histogram = self._register(Histogram(name, documentation, labelnames, buckets))
+        return histogram
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines: list[str] = []
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """All metrics as JSON-compatible values (histograms with bucket quantiles)."""
+        return {
+            metric.name: metric.snapshot()
+            for metric in sorted(self._metrics.values(), key=lambda m: m.name)
+        }
+
+    def clear(self) -> None:
+        """Drop all recorded values (metrics stay registered)."""
+        for metric in self._metrics.values():
+            metric._children.clear()
+
+
+REGISTRY = MetricsRegistry()
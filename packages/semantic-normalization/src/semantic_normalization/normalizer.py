@@ -1,20 +1,60 @@
 """
 Semantic normalizer using OpenAI function calling with MCP tools.
 """
+import asyncio
 import json
 import logging
+import time
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-from openai import OpenAI
-
-from .mcp_client import IntentGatewayClient
+from .cassette import Cassette
+from .metrics import REGISTRY, StageTimer
 from .prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
-from .rag_interface import RAGRetriever, VectorRAGRetriever, CompatibilityRAGRetriever
-from .tool_schema import get_fallback_schema
+from .rag_interface import RAGRetriever, CompatibilityRAGRetriever, create_lexical_retriever
+from .tool_schema import flatten_fact_arguments, get_fallback_schema
+from .tracing import TRACEPARENT, Span, start_span
+from .validation import ToolCallValidator
+from .warmup import DEFAULT_WARM_UP_QUERIES, WarmUp
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from .mcp_client import IntentGatewayClient
 
 logger = logging.getLogger(__name__)
 
+# Gateway load shedding (OVERLOADED results): retries and maximum wait per retry
+OVERLOAD_RETRIES = 2
+MAX_OVERLOAD_DELAY = 2.0
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "normalizer_stage_seconds",
+    "Time spent in each stage of normalize_and_dispatch",
+    ("stage",),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "normalizer_llm_tokens_total",
+    "LLM tokens used, by kind (prompt, completion, cached)",
+    ("kind",),
+)
+
+
+def token_usage(response: Any) -> dict[str, int]:
+    """Prompt, completion and cached prompt tokens reported by a chat completion."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    counts = {
+        "prompt": getattr(usage, "prompt_tokens", None),
+        "completion": getattr(usage, "completion_tokens", None),
+        "cached": getattr(details, "cached_tokens", None),
+    }
+    return {kind: count for kind, count in counts.items() if isinstance(count, int)}
+
+
+def render_prometheus() -> str:
+    """Normalizer metrics in the Prometheus text exposition format."""
+    return REGISTRY.render_prometheus()
+
 
 @dataclass
 class ToolCallResult:
@@ -24,6 +64,7 @@ class ToolCallResult:
     gateway_response: dict[str, Any] | None = None
     success: bool = False
     error: str | None = None
+    repairs: list[str] = field(default_factory=list)  # Local fixes applied before dispatch
 
 
 @dataclass
@@ -33,6 +74,33 @@ class NormalizationResult:
     rag_context: str
     tool_calls: list[ToolCallResult] = field(default_factory=list)
     all_succeeded: bool = False
+    timings: dict[str, float] = field(default_factory=dict)  # Seconds per stage
+    usage: dict[str, int] = field(default_factory=dict)  # LLM tokens by kind
+    trace_id: Optional[str] = None  # Links the gateway and backend spans of this utterance
+
+    def to_dict(self, include_context: bool = True) -> dict[str, Any]:
+        """JSON-serializable form (timings in milliseconds)."""
+        output = {"input": self.input_text}
+        if include_context:
+            output["rag_context"] = self.rag_context
+        output.update({
+            "tool_calls": [
+                {
+                    "tool_name": tc.tool_name,
+                    "arguments": tc.arguments,
+                    "success": tc.success,
+                    "gateway_response": tc.gateway_response,
+                    "error": tc.error,
+                    "repairs": tc.repairs,
+                }
+                for tc in self.tool_calls
+            ],
+            "all_succeeded": self.all_succeeded,
+            "timings_ms": {stage: round(seconds * 1000, 2) for stage, seconds in self.timings.items()},
+            "usage": self.usage,
+            "trace_id": self.trace_id,
+        })
+        return output
 
 
 class SemanticNormalizer:
@@ -53,24 +121,78 @@ class SemanticNormalizer:
         rag_retriever: Optional[RAGRetriever] = None,
         compatibility_rag_retriever: Optional[RAGRetriever] = None,  # NEW
         tool_schema: Optional[list[dict]] = None,  # From gateway or fallback
+        warm_up: bool = False,
+        cassette: Optional[Cassette] = None,
     ):
         """
         Initialize the semantic normalizer.
 
+        Construction is cheap: the OpenAI client is created on first use and
+        the RAG retrievers open their vector store on first query. With
+        warm_up=True those costs are paid on a background thread instead,
+        and requests arriving before it finishes wait for it (see ready()).
+
         Args:
             api_key: OpenAI API key (if None, uses OPENAI_API_KEY env var)
             model: OpenAI model to use
             temperature: Temperature for generation (0 = deterministic)
-            rag_retriever: RAG retriever instance (defaults to VectorRAGRetriever)
+            rag_retriever: RAG retriever instance (defaults to create_lexical_retriever())
             compatibility_rag_retriever: Compatibility RAG retriever (defaults to CompatibilityRAGRetriever)
             tool_schema: OpenAI tool schema (defaults to fallback schema)
+            warm_up: Start background warm-up at construction
+            cassette: Record or replay LLM completions (defaults to the
+                      NORMALIZER_CASSETTE configuration, see cassette.py)
         """
-        self.client = OpenAI(api_key=api_key)
+        self._api_key = api_key
+        self._client: Optional["OpenAI"] = None
         self.model = model
         self.temperature = temperature
-        self.rag_retriever = rag_retriever or VectorRAGRetriever()
+        self.rag_retriever = rag_retriever or create_lexical_retriever()
         self.compatibility_rag_retriever = compatibility_rag_retriever or CompatibilityRAGRetriever()  # NEW
         self.tool_schema = tool_schema or get_fallback_schema()
+        self.validator = ToolCallValidator()  # Gateway's dimension table (shared copy)
+        self.cassette = cassette if cassette is not None else Cassette.from_env()
+
+        self._warm_up = WarmUp(
+            [
+                ("embedding_model", self._warm_up_embedding_model),
+                ("lexical_rag", lambda: self.rag_retriever.warm_up(DEFAULT_WARM_UP_QUERIES)),
+                ("compatibility_rag", lambda: self.compatibility_rag_retriever.warm_up(
+                    ["MEAL_MAIN_CONSUMPTION SLEEP_STATE"]
+                )),
+                ("openai_connection", self._warm_up_openai),
+            ],
+            name="normalizer-warm-up",
+        )
+        if warm_up:
+            self._warm_up.start()
+
+    async def ready(self, timeout: Optional[float] = None) -> bool:
+        """Await background warm-up (returns immediately if it was not started)."""
+        return await self._warm_up.ready(timeout)
+
+    def warm_up_report(self) -> dict:
+        """Warm-up state and per-step timings."""
+        return self._warm_up.report()
+
+    def _warm_up_embedding_model(self):
+        backend = getattr(self.rag_retriever, "embedding_backend", None)
+        if backend is not None:
+            backend.embed(["warm-up"])
+
+    def _warm_up_openai(self):
+        if self.cassette is not None and self.cassette.replay_only:
+            return  # Replayed completions need no connection
+        # Any cheap authenticated request opens the TLS connection kept in the pool
+        self.client.with_options(max_retries=0, timeout=10.0).models.retrieve(self.model)
+
+    @property
+    def client(self) -> "OpenAI":
+        """OpenAI client, created (and openai imported) on first access."""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self._api_key)
+        return self._client
 
     def _extract_dimension_hints(self, lexical_context: str) -> list[str]:
         """
@@ -89,23 +211,32 @@ class SemanticNormalizer:
         # Deduplicate and filter known dimensions
         return list(set(dimensions))
 
-    def _build_messages(self, input_text: str) -> tuple[list[dict], str]:
+    def _build_messages(
+        self,
+        input_text: str,
+        timer: Optional[StageTimer] = None,
+    ) -> tuple[list[dict], str]:
         """
         Build messages with DUAL RAG context (lexical + compatibility).
 
         Args:
             input_text: Raw text to classify
+            timer: Records the lexical_rag, compatibility_rag and prompt_build stages
 
         Returns:
             Tuple of (messages, combined_context_for_debugging)
         """
+        timer = timer or StageTimer(STAGE_SECONDS)
+
         # 1. Get lexical context (existing)
+        timer.start("lexical_rag")
         lexical_context = self.rag_retriever.retrieve_context(input_text)
 
         # 2. Extract dimension hints from lexical context
         detected_dimensions = self._extract_dimension_hints(lexical_context)
 
         # 3. Get compatibility context
+        timer.start("compatibility_rag")
         compatibility_context = ""
         if detected_dimensions:
             # Query with space-separated dimensions
@@ -116,6 +247,7 @@ class SemanticNormalizer:
             )
 
         # 4. Build combined context
+        timer.start("prompt_build")
         combined_context = lexical_context
         if compatibility_context:
             combined_context += f"\n\n{compatibility_context}"
@@ -131,49 +263,92 @@ class SemanticNormalizer:
             {"role": "user", "content": user_content}
         ]
 
+        timer.stop()
         return messages, combined_context
 
-    def normalize(self, input_text: str) -> tuple[list[dict], str]:
+    def normalize(
+        self,
+        input_text: str,
+        timer: Optional[StageTimer] = None,
+        usage: Optional[dict[str, int]] = None,
+    ) -> tuple[list[dict], str]:
         """
         Normalize text and return tool calls (not executed).
 
         Args:
             input_text: Raw text utterance
+            timer: Records the RAG, prompt_build and llm stage timings
+            usage: Filled with the LLM token usage (prompt, completion, cached)
 
         Returns:
             Tuple of (tool_calls, rag_context)
         """
-        messages, rag_context = self._build_messages(input_text)
+        self._warm_up.wait()
+        timer = timer or StageTimer(STAGE_SECONDS)
+        messages, rag_context = self._build_messages(input_text, timer)
 
         # Call OpenAI with function calling
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            tools=self.tool_schema,
-            tool_choice="auto",  # Let LLM decide
-            temperature=self.temperature,
-        )
+        timer.start("llm")
+        request = {
+            "model": self.model,
+            "messages": messages,
+            "tools": self.tool_schema,
+            "tool_choice": "auto",  # Let LLM decide
+            "temperature": self.temperature,
+        }
+        if self.cassette is None:
+            response = self.client.chat.completions.create(**request)
+        else:
+            response = self.cassette.complete(request, lambda: self.client.chat.completions.create(**request))
+        timer.stop()
+
+        for kind, count in token_usage(response).items():
+            LLM_TOKENS.labels(kind).inc(count)
+            if usage is not None:
+                usage[kind] = count
 
         message = response.choices[0].message
 
         if not message.tool_calls:
-            logger.warning(f"No tool calls for input: {input_text}")
+            logger.warning("No tool calls for input: %s", input_text)
             return [], rag_context
 
-        # Extract tool calls
+        # Extract tool calls (strict-schema facts are flattened for the gateway)
         tool_calls = []
         for tc in message.tool_calls:
             tool_calls.append({
                 "name": tc.function.name,
-                "arguments": json.loads(tc.function.arguments)
+                "arguments": flatten_fact_arguments(json.loads(tc.function.arguments))
             })
 
         return tool_calls, rag_context
 
+    async def _dispatch(
+        self,
+        mcp_client: "IntentGatewayClient",
+        tool_name: str,
+        arguments: dict[str, Any],
+        meta: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """
+        Execute a tool call, retrying when the gateway sheds it (OVERLOADED).
+
+        Retrying is safe: the gateway deduplicates facts by idempotency key.
+        """
+        for attempt in range(OVERLOAD_RETRIES + 1):
+            response = await mcp_client.execute_tool_call(tool_name, arguments, meta=meta)
+            codes = [e.get("code") for e in response.get("errors") or []]
+            if "OVERLOADED" not in codes or attempt == OVERLOAD_RETRIES:
+                return response
+            delay = min(response.get("retry_after_seconds") or 0.5, MAX_OVERLOAD_DELAY)
+            logger.info("Gateway overloaded, retrying %s in %.2fs", tool_name, delay)
+            await asyncio.sleep(delay)
+        return response
+
     async def normalize_and_dispatch(
         self,
         input_text: str,
-        mcp_client: IntentGatewayClient
+        mcp_client: "IntentGatewayClient"
     ) -> NormalizationResult:
         """
         Normalize text and dispatch tool calls to MCP gateway.
@@ -185,17 +360,46 @@ class SemanticNormalizer:
             mcp_client: Connected MCP client instance
 
         Returns:
-            NormalizationResult with tool call results
+            NormalizationResult with tool call results, per-stage timings,
+            LLM token usage and the trace id
         """
-        tool_calls, rag_context = self.normalize(input_text)
+        with start_span("normalize_and_dispatch", input_text=input_text) as trace:
+            result = await self._normalize_and_dispatch(input_text, mcp_client, trace)
+            trace.attributes["stages_ms"] = {
+                stage: round(seconds * 1000, 3) for stage, seconds in result.timings.items()
+            }
+            trace.attributes["usage"] = result.usage
+            if not result.all_succeeded:
+                trace.status = "error"
+        return result
+
+    async def _normalize_and_dispatch(
+        self,
+        input_text: str,
+        mcp_client: "IntentGatewayClient",
+        trace: Span,
+    ) -> NormalizationResult:
+        started = time.perf_counter()
+        timer = StageTimer(STAGE_SECONDS)
+        timer.start("warm_up_wait")
+        await self.ready()
+        timer.stop()
+        usage: dict[str, int] = {}
+        # RAG and the LLM call block: run them off the event loop so that
+        # concurrent utterances (and gateway I/O) overlap
+        tool_calls, rag_context = await asyncio.to_thread(self.normalize, input_text, timer, usage)
 
         result = NormalizationResult(
             input_text=input_text,
             rag_context=rag_context,
+            timings=timer.timings,
+            usage=usage,
+            trace_id=trace.trace_id,
         )
 
         if not tool_calls:
             result.all_succeeded = True  # No calls = vacuously true
+            self._record_total(result, started)
             return result
 
         # Execute each tool call against MCP gateway
@@ -205,19 +409,45 @@ class SemanticNormalizer:
                 arguments=tc["arguments"]
             )
 
-            try:
-                gateway_response = await mcp_client.execute_tool_call(
-                    tc["name"],
-                    tc["arguments"]
-                )
-                tc_result.gateway_response = gateway_response
-                tc_result.success = gateway_response.get("success", False)
-            except Exception as e:
-                tc_result.error = str(e)
-                tc_result.success = False
-                logger.error(f"Tool call execution failed: {e}", exc_info=True)
+            if tc["name"] == "process_canonical_fact":
+                repair = self.validator.repair(tc["arguments"])
+                tc_result.arguments = repair.arguments
+                tc_result.repairs = repair.repairs
+                if not repair.valid:
+                    tc_result.error = f"Dropped before dispatch: {repair.reason}"
+                    logger.warning("%s (input: %s)", tc_result.error, input_text)
+                    result.tool_calls.append(tc_result)
+                    continue
+                if repair.repairs:
+                    logger.info("Repaired tool call: %s", repair.repairs)
+
+            timer.start("dispatch")
+            with start_span("tool_call", trace, tool_name=tc_result.tool_name) as call_span:
+                try:
+                    gateway_response = await self._dispatch(
+                        mcp_client,
+                        tc_result.tool_name,
+                        tc_result.arguments,
+                        meta={TRACEPARENT: call_span.traceparent},
+                    )
+                    tc_result.gateway_response = gateway_response
+                    tc_result.success = gateway_response.get("success", False)
+                except Exception as e:
+                    tc_result.error = str(e)
+                    tc_result.success = False
+                    logger.exception("Tool call execution failed: %s", e)
+                if not tc_result.success:
+                    call_span.status = "error"
+            timer.stop()
 
             result.tool_calls.append(tc_result)
 
         result.all_succeeded = all(tc.success for tc in result.tool_calls)
+        self._record_total(result, started)
         return result
+
+    @staticmethod
+    def _record_total(result: NormalizationResult, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels("total").observe(elapsed)
+        result.timings["total"] = elapsed
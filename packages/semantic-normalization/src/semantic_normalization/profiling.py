@@ -0,0 +1,112 @@
+"""
+CPU profiling for CLI runs (python -m semantic_normalization.cli --profile).
+
+profile_run() wraps a block with cProfile and a stack sampler and writes:
+- <prefix>.pstats: cProfile dump (python -m pstats, snakeviz, flameprof)
+- <prefix>.cpu.folded: sampled stacks in the collapsed format
+  ("frame;frame;frame count" per line) for flamegraph.pl, speedscope
+  or inferno
+
+Nothing is started unless profiling is requested. cProfile slows Python
+code down, so timings measured while profiling are inflated; compare
+runs profiled the same way. For a running gateway, use its
+start_profiling / stop_profiling tools instead (mcp_intent_gateway.profiling).
+"""
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+DEFAULT_INTERVAL = 0.005  # Seconds between stack samples
+DEFAULT_PREFIX = "normalizer-profile"
+
+
+def _folded_stack(frame) -> list[str]:
+    """Frame labels from the outermost frame to the innermost."""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class StackSampler:
+    """Samples the stacks of all other threads at a fixed interval."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="normalizer-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    stack = [names.get(ident, f"thread-{ident}"), *_folded_stack(frame)]
+                    self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed-stack format."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+@contextmanager
+def profile_run(prefix: str = DEFAULT_PREFIX, interval: float = DEFAULT_INTERVAL) -> Iterator[dict[str, str]]:
+    """
+    Profile the enclosed block.
+
+    Args:
+        prefix: Output path prefix (".pstats" and ".cpu.folded" are appended)
+        interval: Seconds between stack samples
+
+    Yields:
+        Mapping of profile kind to file path, filled when the block exits
+    """
+    files: dict[str, str] = {}
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    sampler = StackSampler(interval)
+    profile = cProfile.Profile()
+    sampler.start()
+    profile.enable()
+    try:
+        yield files
+    finally:
+        profile.disable()
+        sampler.stop()
+        files["pstats"] = f"{prefix}.pstats"
+        files["cpu"] = f"{prefix}.cpu.folded"
+        profile.dump_stats(files["pstats"])
+        with open(files["cpu"], "w", encoding="utf-8") as f:
+            f.write(sampler.collapsed())
+
+
+def format_stage_table(timings: dict[str, float]) -> str:
+    """Per-stage timings (seconds) as a text table, in execution order, with share of total."""
+    total = timings.get("total") or sum(timings.values()) or 1.0
+    lines = [f"{'stage':<20} {'ms':>10} {'share':>7}"]
+    for stage, seconds in timings.items():
+        lines.append(f"{stage:<20} {seconds * 1000:>10.2f} {seconds / total:>7.1%}")
+    return "\n".join(lines)
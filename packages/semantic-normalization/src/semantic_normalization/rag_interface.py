@@ -4,9 +4,17 @@ Uses ChromaDB for semantic similarity search
 """
 
 import os
-import chromadb
-from chromadb.utils import embedding_functions
+import threading
 from abc import ABC, abstractmethod
+from typing import Optional
+
+from .embeddings import (
+    EmbeddingBackend,
+    get_embedding_backend,
+    METADATA_SPACE_KEY,
+    LEGACY_SPACE,
+)
+from .metrics import REGISTRY
 
 # Robust path resolution
 # We want to find packages/rag-knowledge-base/dist/vector_store relative to this file
@@ -20,6 +28,93 @@ VECTOR_DB_PATH = os.path.abspath(os.path.join(
     "../../../rag-knowledge-base/dist/vector_store"
 ))
 COLLECTION_NAME = "lexicon_embeddings"
+COMPATIBILITY_COLLECTION_NAME = "compatibility_rules"
+LEXICON_PATH = os.path.abspath(os.path.join(CURRENT_DIR, "../../../rag-knowledge-base/data/initial_lexicon.json"))
+
+# Lexical retriever used by default: "vector" (embeddings only) or "hybrid" (see HybridRAGRetriever)
+ENV_LEXICAL_RAG_MODE = "LEXICAL_RAG_MODE"
+RRF_K = 60  # Reciprocal-rank fusion constant (higher flattens rank differences)
+
+HYBRID_RETRIEVALS = REGISTRY.counter(
+    "normalizer_hybrid_retrieval_total",
+    "Hybrid lexical retrievals, by path (exact: lexical index only, fused: with vector hits)",
+    ("path",),
+)
+
+
+class KnowledgeBaseUnavailable(RuntimeError):
+    """Neither a shared index nor the vector store could be opened."""
+
+
+def open_collection(db_path: str, name: str, embedding_backend: EmbeddingBackend):
+    """
+    Open a persisted collection for querying with the given embedding backend.
+
+    Queries are embedded by the backend and passed to Chroma as vectors, so the
+    collection's stored embedding function is never instantiated.
+
+    Raises:
+        ValueError: If the collection was built in a different embedding space
+    """
+    import chromadb  # Deferred: heavy import, only needed once a store is opened
+
+    client = chromadb.PersistentClient(path=db_path)
+    collection = client.get_collection(name=name)
+    built_space = (collection.metadata or {}).get(METADATA_SPACE_KEY, LEGACY_SPACE)
+    if built_space != embedding_backend.space:
+        raise ValueError(
+            f"Collection '{name}' was built with embedding space '{built_space}' "
+            f"but the configured backend uses '{embedding_backend.space}'"
+        )
+    return collection
+
+
+def open_shared_index(name: str, embedding_backend: EmbeddingBackend):
+    """
+    The index published for a collection by a parent process (see shared_index.py).
+
+    Returns None when no shared index is configured or it cannot be used,
+    in which case the caller opens the vector store itself.
+    """
+    from .shared_index import load_shared_index  # Deferred: numpy, only needed once a store is opened
+
+    try:
+        return load_shared_index(name, embedding_backend)
+    except Exception as e:
+        print(f"WARNING: Shared index for '{name}' unavailable, opening the vector store: {e}")
+        return None
+
+
+def format_lexical_context(metadatas: list[dict], documents: list[str], distances: list[float]) -> str:
+    """Format lexical matches for prompt injection."""
+    context_lines = ["RELEVANT KNOWLEDGE (Semantic Match):"]
+    for meta, doc, dist in zip(metadatas, documents, distances):
+        # distance is typically L2 or cosine distance. Lower is better for L2.
+        # Just formatting for context injection
+        context_lines.append(
+            f"- '{doc}' → {meta['dimension']}: {meta['canonical_value']} (dist: {dist:.2f})"
+        )
+    return "\n".join(context_lines)
+
+
+def format_hybrid_context(entries: list[tuple[dict, str, str]], exact: bool) -> str:
+    """Format (metadata, document, match description) entries from HybridRAGRetriever."""
+    context_lines = [f"RELEVANT KNOWLEDGE ({'Exact' if exact else 'Hybrid'} Match):"]
+    for meta, doc, match in entries:
+        context_lines.append(f"- '{doc}' → {meta['dimension']}: {meta['canonical_value']} ({match})")
+    return "\n".join(context_lines)
+
+
+def format_compatibility_context(metadatas: list[dict], documents: list[str]) -> str:
+    """Format compatibility rules for prompt injection ("" if there are none)."""
+    if not documents:
+        return ""
+    context_lines = ["SEMANTIC COMPATIBILITY RULES (AUTHORITATIVE):"]
+    for meta, doc in zip(metadatas, documents):
+        rule_type = meta.get('rule_type', 'unknown')
+        context_lines.append(f"- [{rule_type.upper()}] {doc}")
+    return "\n".join(context_lines)
+
 
 class RAGRetriever(ABC):
     """Abstract interface for RAG retrieval"""
@@ -29,57 +124,81 @@ class RAGRetriever(ABC):
         """Retrieve relevant context for a query"""
         pass
 
+    def warm_up(self, queries: list[str]) -> None:
+        """Pay one-off costs (store open, model load, first search) ahead of traffic"""
+        for query in queries:
+            self.retrieve_context(query)
+
 
 class VectorRAGRetriever(RAGRetriever):
     """
     RAG implementation using persistent ChromaDB vector store
     """
 
-    def __init__(self, db_path: str = VECTOR_DB_PATH):
+    def __init__(
+        self,
+        db_path: str = VECTOR_DB_PATH,
+        embedding_backend: Optional[EmbeddingBackend] = None,
+    ):
         self.db_path = db_path
+        # Multilingual model by default for French support (see embeddings.py)
+        self.embedding_backend = embedding_backend or get_embedding_backend()
         self._collection = None
-        self._init_client()
+        self._index = None  # Shared index published by a parent process, if any
+        self._initialized = False  # Store is opened on first query
+        self._init_lock = threading.Lock()
 
     def _init_client(self):
-        """Initialize ChromaDB client gracefully"""
-        if not os.path.exists(self.db_path):
-            print(f"WARNING: Vector DB not found at {self.db_path}. RAG will be empty.")
-            return
-
+        """Initialize the shared index or ChromaDB client gracefully"""
         try:
-            client = chromadb.PersistentClient(path=self.db_path)
-            # Use multilingual model for French support
-            ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name="paraphrase-multilingual-MiniLM-L12-v2")
-            self._collection = client.get_collection(name=COLLECTION_NAME, embedding_function=ef)
-        except Exception as e:
-            print(f"ERROR initializing ChromaDB: {e}")
+            self._index = open_shared_index(COLLECTION_NAME, self.embedding_backend)
+            if self._index is not None:
+                return
+            if not os.path.exists(self.db_path):
+                print(f"WARNING: Vector DB not found at {self.db_path}. RAG will be empty.")
+                return
 
-    def retrieve_context(self, query: str, top_k: int = 5) -> str:
-        """Retrieve most similar context from vector store"""
+            try:
+                self._collection = open_collection(self.db_path, COLLECTION_NAME, self.embedding_backend)
+            except Exception as e:
+                print(f"ERROR initializing ChromaDB: {e}")
+        finally:
+            # Set last: queries that skip the lock must see the opened index or store
+            self._initialized = True
+
+    def search(self, query: str, top_k: int = 5) -> tuple[list[dict], list[str], list[float]]:
+        """
+        Nearest lexicon entries to a query.
+
+        Returns:
+            (metadatas, documents, distances), nearest first
+
+        Raises:
+            KnowledgeBaseUnavailable: If neither a shared index nor the store could be opened
+        """
+        if not self._initialized:
+            # Concurrent first queries wait for a single initialization
+            with self._init_lock:
+                if not self._initialized:
+                    self._init_client()
+        if self._index is not None:
+            return self._index.query(self.embedding_backend.embed([query])[0], top_k)
         if not self._collection:
-            return "WARNING: Knowledge base not initialized."
+            raise KnowledgeBaseUnavailable("Knowledge base not initialized.")
 
-        try:
-            results = self._collection.query(
-                query_texts=[query],
-                n_results=top_k
-            )
-            
-            # ChromaDB returns list of lists (one for each query)
-            metadatas = results['metadatas'][0]
-            documents = results['documents'][0]
-            distances = results['distances'][0]
-
-            context_lines = ["RELEVANT KNOWLEDGE (Semantic Match):"]
-            for meta, doc, dist in zip(metadatas, documents, distances):
-                # distance is typically L2 or cosine distance. Lower is better for L2.
-                # Just formatting for context injection
-                context_lines.append(
-                    f"- '{doc}' → {meta['dimension']}: {meta['canonical_value']} (dist: {dist:.2f})"
-                )
-            
-            return "\n".join(context_lines)
+        results = self._collection.query(
+            query_embeddings=self.embedding_backend.embed([query]),
+            n_results=top_k
+        )
+        # ChromaDB returns list of lists (one for each query)
+        return results['metadatas'][0], results['documents'][0], results['distances'][0]
 
+    def retrieve_context(self, query: str, top_k: int = 5) -> str:
+        """Retrieve most similar context from vector store"""
+        try:
+            return format_lexical_context(*self.search(query, top_k))
+        except KnowledgeBaseUnavailable as e:
+            return f"WARNING: {e}"
         except Exception as e:
             return f"Error gathering context: {e}"
 
@@ -89,29 +208,37 @@ class CompatibilityRAGRetriever(RAGRetriever):
     Retrieves semantic compatibility rules for dimension combinations.
     """
 
-    def __init__(self, db_path: str = VECTOR_DB_PATH):
+    def __init__(
+        self,
+        db_path: str = VECTOR_DB_PATH,
+        embedding_backend: Optional[EmbeddingBackend] = None,
+    ):
         self.db_path = db_path
+        # CRITICAL: Same embedding backend as lexical RAG (shared, cached instance)
+        self.embedding_backend = embedding_backend or get_embedding_backend()
         self._collection = None
-        self._init_client()
+        self._index = None  # Shared index published by a parent process, if any
+        self._initialized = False  # Store is opened on first query
+        self._init_lock = threading.Lock()
 
     def _init_client(self):
-        """Initialize ChromaDB client for compatibility rules"""
-        if not os.path.exists(self.db_path):
-            print(f"WARNING: Compatibility DB not found at {self.db_path}.")
-            return
-
+        """Initialize the shared index or ChromaDB client for compatibility rules"""
         try:
-            client = chromadb.PersistentClient(path=self.db_path)
-            # CRITICAL: Same embedding function as lexical RAG
-            ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name="paraphrase-multilingual-MiniLM-L12-v2"
-            )
-            self._collection = client.get_collection(
-                name="compatibility_rules",
-                embedding_function=ef
-            )
-        except Exception as e:
-            print(f"ERROR initializing Compatibility ChromaDB: {e}")
+            self._index = open_shared_index(COMPATIBILITY_COLLECTION_NAME, self.embedding_backend)
+            if self._index is not None:
+                return
+            if not os.path.exists(self.db_path):
+                print(f"WARNING: Compatibility DB not found at {self.db_path}.")
+                return
+
+            try:
+                self._collection = open_collection(
+                    self.db_path, COMPATIBILITY_COLLECTION_NAME, self.embedding_backend
+                )
+            except Exception as e:
+                print(f"ERROR initializing Compatibility ChromaDB: {e}")
+        finally:
+            self._initialized = True  # Set last (see VectorRAGRetriever._init_client)
 
     def retrieve_context(self, query: str, top_k: int = 3) -> str:
         """
@@ -124,27 +251,124 @@ class CompatibilityRAGRetriever(RAGRetriever):
         Returns:
             Formatted compatibility rules context
         """
-        if not self._collection:
+        if not self._initialized:
+            # Concurrent first queries wait for a single initialization
+            with self._init_lock:
+                if not self._initialized:
+                    self._init_client()
+        if self._index is None and not self._collection:
             return ""
 
         try:
+            if self._index is not None:
+                metadatas, documents, _ = self._index.query(self.embedding_backend.embed([query])[0], top_k)
+                return format_compatibility_context(metadatas, documents)
+
             results = self._collection.query(
-                query_texts=[query],
+                query_embeddings=self.embedding_backend.embed([query]),
                 n_results=top_k
             )
 
-            metadatas = results['metadatas'][0]
-            documents = results['documents'][0]
+            return format_compatibility_context(results['metadatas'][0], results['documents'][0])
+
+        except Exception as e:
+            return f"Error gathering compatibility rules: {e}"
+
+
+class HybridRAGRetriever(RAGRetriever):
+    """
+    Lexical (BM25 over folded tokens and character n-grams) plus vector retrieval.
+
+    When the query contains lexicon phrases verbatim and they agree (see
+    lexical_index.py), the context lists those exact hits only and the
+    encoder is not called. Otherwise the lexical and vector rankings are
+    merged by reciprocal-rank fusion: entries ranked well by either
+    retriever come first, without calibrating BM25 scores against
+    distances.
+    """
+
+    def __init__(
+        self,
+        vector_retriever: Optional[VectorRAGRetriever] = None,
+        lexicon_path: str = LEXICON_PATH,
+        lexical_index=None,
+        rrf_k: int = RRF_K,
+    ):
+        """
+        Args:
+            vector_retriever: Embedding retriever (defaults to VectorRAGRetriever)
+            lexicon_path: Lexicon JSON indexed on first query
+            lexical_index: Prebuilt LexicalIndex (overrides lexicon_path)
+            rrf_k: Reciprocal-rank fusion constant
+        """
+        self.vector_retriever = vector_retriever or VectorRAGRetriever()
+        self.embedding_backend = self.vector_retriever.embedding_backend  # Warmed by the normalizer
+        self.lexicon_path = lexicon_path
+        self.rrf_k = rrf_k
+        self._lexical_index = lexical_index
+        self._init_lock = threading.Lock()
+
+    @property
+    def lexical_index(self):
+        """The lexical index, built on first use (None if the lexicon is missing)."""
+        if self._lexical_index is None:
+            with self._init_lock:
+                if self._lexical_index is None:
+                    from .lexical_index import LexicalIndex
 
-            if not documents:
-                return ""
+                    try:
+                        self._lexical_index = LexicalIndex.from_lexicon_file(self.lexicon_path)
+                    except OSError as e:
+                        print(f"WARNING: Lexicon not found ({e}). Hybrid RAG uses vectors only.")
+                        self._lexical_index = LexicalIndex([], [])
+        return self._lexical_index
 
-            context_lines = ["SEMANTIC COMPATIBILITY RULES (AUTHORITATIVE):"]
-            for meta, doc in zip(metadatas, documents):
-                rule_type = meta.get('rule_type', 'unknown')
-                context_lines.append(f"- [{rule_type.upper()}] {doc}")
+    def warm_up(self, queries: list[str]) -> None:
+        # Exact hits skip the encoder: warm the vector path explicitly
+        self.lexical_index
+        self.vector_retriever.warm_up(queries)
 
-            return "\n".join(context_lines)
+    def retrieve_context(self, query: str, top_k: int = 5) -> str:
+        """Exact lexicon hits when confident, else lexical and vector hits fused by rank"""
+        candidates = max(top_k, 10)
+        match = self.lexical_index.search(query, candidates)
+        if match.confident:
+            HYBRID_RETRIEVALS.labels("exact").inc()
+            exact = [(hit.metadata, hit.document, "exact match") for hit in match.hits if hit.exact]
+            return format_hybrid_context(exact[:top_k], exact=True)
 
+        HYBRID_RETRIEVALS.labels("fused").inc()
+        try:
+            vector = list(zip(*self.vector_retriever.search(query, candidates)))
         except Exception as e:
-            return f"Error gathering compatibility rules: {e}"
+            vector = []
+            if not match.hits:
+                return f"Error gathering context: {e}"
+
+        def key(meta: dict, doc: str) -> tuple:
+            return doc, meta["dimension"], meta["canonical_value"]
+
+        fused: dict[tuple, float] = {}
+        entries: dict[tuple, tuple[dict, str, str]] = {}
+        for rank, hit in enumerate(match.hits, 1):
+            k = key(hit.metadata, hit.document)
+            fused[k] = fused.get(k, 0.0) + 1 / (self.rrf_k + rank)
+            entries[k] = (hit.metadata, hit.document, "exact match" if hit.exact else "lexical match")
+        for rank, (meta, doc, dist) in enumerate(vector, 1):
+            k = key(meta, doc)
+            fused[k] = fused.get(k, 0.0) + 1 / (self.rrf_k + rank)
+            if k not in entries or entries[k][2] == "lexical match":
+                entries[k] = (meta, doc, f"dist: {dist:.2f}")
+
+        ranked = sorted(fused, key=lambda k: -fused[k])[:top_k]
+        return format_hybrid_context([entries[k] for k in ranked], exact=False)
+
+
+def create_lexical_retriever() -> RAGRetriever:
+    """Lexical retriever selected by LEXICAL_RAG_MODE ("vector", the default, or "hybrid")."""
+    mode = (os.getenv(ENV_LEXICAL_RAG_MODE) or "vector").strip().lower()
+    if mode == "hybrid":
+        return HybridRAGRetriever()
+    if mode != "vector":
+        raise ValueError(f"Unknown {ENV_LEXICAL_RAG_MODE}: {mode}. Must be one of: vector, hybrid")
+    return VectorRAGRetriever()
@@ -0,0 +1,386 @@
+"""
+Long-running normalization service over HTTP.
+
+The CLI pays for the embedding model, the vector stores, the OpenAI
+connection and a gateway subprocess on every invocation. The service pays
+for them once at startup and then serves utterances concurrently from the
+same warm normalizer and gateway session pool.
+
+Endpoints:
+    POST /api/normalize  {"text": "...", "dispatch": true, "include_context": false}
+                         -> NormalizationResult.to_dict() (dispatch) or the
+                            tool calls without executing them (dispatch=false)
+    GET  /health         warm-up report and gateway session health
+                         (503 until warm-up finishes or if the gateway is down)
+    GET  /metrics        Prometheus text (normalizer and service metrics)
+
+Up to --concurrency utterances run at once (RAG and LLM calls on worker
+threads, gateway calls on the event loop). Requests beyond that wait; once
+--max-pending requests are waiting or running, new ones are refused with
+503 and Retry-After, as the gateway does when it sheds load.
+
+Usage:
+    python -m semantic_normalization.service --port 3004 --gateway-pool 2
+    curl -s localhost:3004/api/normalize -d '{"text": "Gabriel a tout mangé"}'
+
+Configuration defaults come from the NORMALIZER_* variables below
+(gateway transport: stdio, inprocess or http; see mcp_client.py).
+
+Each worker process holds its own models. With --workers N the parent
+reads the vector store once and publishes the embedding indexes to shared
+memory (see shared_index.py); the workers memory-map them, so an extra
+worker adds no index memory.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncContextManager, Callable, Optional
+
+from .batch import normalize_only
+from .metrics import REGISTRY
+from .shared_index import ENV_INDEX_DIR
+
+if TYPE_CHECKING:
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+ENV_HOST = "NORMALIZER_HOST"
+ENV_PORT = "NORMALIZER_PORT"
+ENV_CONCURRENCY = "NORMALIZER_CONCURRENCY"
+ENV_WORKERS = "NORMALIZER_WORKERS"
+ENV_MAX_PENDING = "NORMALIZER_MAX_PENDING"
+ENV_GATEWAY_POOL = "NORMALIZER_GATEWAY_POOL"
+ENV_GATEWAY_TRANSPORT = "NORMALIZER_GATEWAY_TRANSPORT"
+ENV_DISPATCH = "NORMALIZER_DISPATCH"  # "0": normalize-only service
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 3004  # Next to the orchestrator (3003) and gateway (3002)
+DEFAULT_CONCURRENCY = 8
+RETRY_AFTER_SECONDS = 1
+HEALTH_TIMEOUT = 2.0
+
+REQUESTS = REGISTRY.counter(
+    "normalizer_service_requests_total",
+    "Utterance requests, by outcome (ok, failed, rejected, overloaded, error)",
+    ("outcome",),
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "normalizer_service_request_seconds",
+    "Utterance request latency, including the wait for a free slot",
+)
+QUEUE_SECONDS = REGISTRY.histogram(
+    "normalizer_service_queue_seconds",
+    "Time utterance requests waited for a free slot",
+)
+
+
+class ServiceOverloaded(Exception):
+    """Too many requests waiting or running."""
+
+
+class NormalizationService:
+    """
+    Serves utterances from one warm normalizer and gateway client.
+
+    Usage:
+        service = NormalizationService(normalizer, gateway_client, concurrency=8)
+        result = await service.process("Gabriel a tout mangé")
+    """
+
+    def __init__(
+        self,
+        normalizer,
+        gateway=None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_pending: Optional[int] = None,
+    ):
+        """
+        Args:
+            normalizer: Warm (or warming) SemanticNormalizer
+            gateway: Connected gateway client (None: normalize-only service)
+            concurrency: Utterances processed at once
+            max_pending: Requests waiting or running before new ones are
+                refused (defaults to 4 x concurrency)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.normalizer = normalizer
+        self.gateway = gateway
+        self.concurrency = concurrency
+        self.max_pending = max_pending or 4 * concurrency
+        self.pending = 0
+        self.started_at = time.time()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._normalize = normalize_only(normalizer)
+
+    async def process(self, text: str, dispatch: bool = True, include_context: bool = False) -> dict[str, Any]:
+        """
+        Normalize one utterance and, with dispatch, send its tool calls to the gateway.
+
+        Raises:
+            ServiceOverloaded: If max_pending requests are already waiting or running
+            ValueError: If dispatch is requested from a service without gateway
+        """
+        if dispatch and self.gateway is None:
+            raise ValueError("This service has no gateway: use dispatch=false")
+        if self.pending >= self.max_pending:
+            raise ServiceOverloaded(f"{self.pending} requests pending")
+
+        self.pending += 1
+        try:
+            queued = time.perf_counter()
+            async with self._slots:
+                QUEUE_SECONDS.observe(time.perf_counter() - queued)
+                if not dispatch:
+                    return await self._normalize(text)
+                result = await self.normalizer.normalize_and_dispatch(text, self.gateway)
+                return result.to_dict(include_context=include_context)
+        finally:
+            self.pending -= 1
+
+    async def health(self) -> tuple[bool, dict[str, Any]]:
+        """Whether the service can serve requests, with details."""
+        warm_up = self.normalizer.warm_up_report()
+        healthy = warm_up["state"] in ("ready", "degraded")
+        report: dict[str, Any] = {
+            "warm_up": warm_up,
+            "in_flight": min(self.pending, self.concurrency),
+            "waiting": max(0, self.pending - self.concurrency),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+        }
+        check_health = getattr(self.gateway, "check_health", None)
+        if check_health is not None:
+            try:
+                sessions = await asyncio.wait_for(check_health(), HEALTH_TIMEOUT)
+            except Exception as e:
+                sessions, report["gateway_error"] = [], str(e)
+            report["gateway_sessions"] = sessions
+            # In-process gateways have no sessions to check
+            healthy = healthy and "gateway_error" not in report and (not sessions or any(sessions))
+        report["status"] = "ok" if healthy else "unavailable"
+        return healthy, report
+
+
+@asynccontextmanager
+async def open_service(
+    concurrency: int = DEFAULT_CONCURRENCY,
+    gateway_pool: int = 1,
+    gateway_transport: Optional[str] = None,
+    dispatch: bool = True,
+    max_pending: Optional[int] = None,
+):
+    """
+    Warm a normalizer, connect the gateway pool and yield the service.
+
+    Args:
+        concurrency: Utterances processed at once
+        gateway_pool: Gateway sessions (subprocesses for stdio)
+        gateway_transport: IntentGatewayClient transport (default: NORMALIZER_GATEWAY_TRANSPORT or stdio)
+        dispatch: Connect a gateway (False: normalize-only service)
+        max_pending: Requests waiting or running before new ones are refused
+    """
+    from .cassette import CassetteGatewayClient
+    from .mcp_client import IntentGatewayClient
+    from .normalizer import SemanticNormalizer
+    from .tool_schema import fetch_tool_schema_from_gateway
+
+    # Blocking RAG and LLM calls run on the loop's executor: size it to the slots
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(concurrency + 1))
+
+    normalizer = SemanticNormalizer(warm_up=True)
+    async with AsyncExitStack() as stack:
+        gateway = None
+        if dispatch:
+            transport = gateway_transport or os.getenv(ENV_GATEWAY_TRANSPORT, "stdio")
+            gateway = IntentGatewayClient(pool_size=gateway_pool, transport=transport)
+            if normalizer.cassette is not None:
+                gateway = CassetteGatewayClient(normalizer.cassette, gateway)
+            gateway = await stack.enter_async_context(gateway)
+            normalizer.tool_schema = await fetch_tool_schema_from_gateway(gateway)
+        yield NormalizationService(normalizer, gateway, concurrency, max_pending)
+
+
+def parse_request(body: Any, has_gateway: bool) -> tuple[str, bool, bool]:
+    """
+    (text, dispatch, include_context) of a /api/normalize request body.
+
+    Raises:
+        ValueError: If the body is not a valid request for this service
+    """
+    text = body.get("text") if isinstance(body, dict) else None
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError('Expected a JSON object with a non-empty "text" field')
+    dispatch = body.get("dispatch", True)
+    include_context = body.get("include_context", False)
+    for name, value in (("dispatch", dispatch), ("include_context", include_context)):
+        if not isinstance(value, bool):
+            raise ValueError(f'"{name}" must be true or false')
+    if dispatch and not has_gateway:
+        raise ValueError("This service has no gateway: use dispatch=false")
+    return text, dispatch, include_context
+
+
+def _error(status: int, message: str, headers: Optional[dict[str, str]] = None) -> "Response":
+    from starlette.responses import JSONResponse
+
+    return JSONResponse({"error": message}, status_code=status, headers=headers)
+
+
+def create_app(open_service_fn: Callable[[], AsyncContextManager[NormalizationService]]) -> "Starlette":
+    """
+    ASGI app serving the service opened by open_service_fn for its lifetime.
+
+    Args:
+        open_service_fn: Returns an async context manager yielding the service
+    """
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, PlainTextResponse
+    from starlette.routing import Route
+
+    async def normalize(request: "Request") -> "Response":
+        service: NormalizationService = request.app.state.service
+        started = time.perf_counter()
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        # Only the request itself is answered with 400: LLM and gateway errors are 500s
+        try:
+            text, dispatch, include_context = parse_request(body, service.gateway is not None)
+        except ValueError as e:
+            REQUESTS.labels("rejected").inc()
+            return _error(400, str(e))
+
+        try:
+            result = await service.process(text, dispatch=dispatch, include_context=include_context)
+        except ServiceOverloaded as e:
+            REQUESTS.labels("overloaded").inc()
+            return _error(503, f"Overloaded: {e}", {"Retry-After": str(RETRY_AFTER_SECONDS)})
+        except Exception as e:
+            REQUESTS.labels("error").inc()
+            logger.exception("Normalization failed: %s", e)
+            return _error(500, f"{type(e).__name__}: {e}")
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - started)
+
+        REQUESTS.labels("ok" if result.get("all_succeeded", True) else "failed").inc()
+        return JSONResponse(result)
+
+    async def health(request: "Request") -> "Response":
+        healthy, report = await request.app.state.service.health()
+        return JSONResponse(report, status_code=200 if healthy else 503)
+
+    async def metrics(request: "Request") -> "Response":
+        return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    @asynccontextmanager
+    async def lifespan(app: "Starlette"):
+        async with open_service_fn() as service:
+            app.state.service = service
+            logger.info("Normalization service ready to accept requests (warm-up continues in background)")
+            yield
+
+    return Starlette(
+        routes=[
+            Route("/api/normalize", normalize, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def create_app_from_env() -> "Starlette":
+    """ASGI app configured from the NORMALIZER_* variables (uvicorn factory, one per worker)."""
+    from .logging_config import configure_logging
+
+    configure_logging()
+    max_pending = os.getenv(ENV_MAX_PENDING)
+    return create_app(lambda: open_service(
+        concurrency=int(os.getenv(ENV_CONCURRENCY, str(DEFAULT_CONCURRENCY))),
+        gateway_pool=int(os.getenv(ENV_GATEWAY_POOL, "1")),
+        gateway_transport=os.getenv(ENV_GATEWAY_TRANSPORT),
+        dispatch=os.getenv(ENV_DISPATCH, "1") != "0",
+        max_pending=int(max_pending) if max_pending else None,
+    ))
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse command line options, defaulting to the NORMALIZER_* environment variables."""
+    parser = argparse.ArgumentParser(description="Semantic normalization HTTP service")
+    parser.add_argument("--host", default=os.getenv(ENV_HOST, DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=int(os.getenv(ENV_PORT, str(DEFAULT_PORT))))
+    parser.add_argument("--workers", type=int, default=int(os.getenv(ENV_WORKERS, "1")),
+                        help="Worker processes sharing the listening socket and the embedding index")
+    parser.add_argument("--concurrency", type=int,
+                        default=int(os.getenv(ENV_CONCURRENCY, str(DEFAULT_CONCURRENCY))),
+                        help="Utterances processed at once (per worker)")
+    parser.add_argument("--max-pending", type=int, default=os.getenv(ENV_MAX_PENDING),
+                        help="Requests waiting or running before 503 (default: 4 x concurrency)")
+    parser.add_argument("--gateway-pool", type=int, default=int(os.getenv(ENV_GATEWAY_POOL, "1")),
+                        help="Gateway sessions (per worker)")
+    parser.add_argument("--gateway-transport", choices=("stdio", "inprocess", "http"),
+                        default=os.getenv(ENV_GATEWAY_TRANSPORT, "stdio"))
+    parser.add_argument("--no-dispatch", action="store_true", default=os.getenv(ENV_DISPATCH) == "0",
+                        help="Serve normalization only, without a gateway")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv: Optional[list[str]] = None):
+    """Run the service."""
+    import uvicorn
+    from dotenv import load_dotenv
+    from .logging_config import configure_logging
+
+    load_dotenv()
+    args = parse_args(argv)
+    configure_logging()
+
+    # Workers re-import this module, so hand them the configuration via env
+    os.environ.update({
+        ENV_CONCURRENCY: str(args.concurrency),
+        ENV_GATEWAY_POOL: str(args.gateway_pool),
+        ENV_GATEWAY_TRANSPORT: args.gateway_transport,
+        ENV_DISPATCH: "0" if args.no_dispatch else "1",
+    })
+    if args.max_pending:
+        os.environ[ENV_MAX_PENDING] = str(args.max_pending)
+
+    published = None
+    if args.workers > 1 and not os.getenv(ENV_INDEX_DIR):
+        # Read the vector store once here; workers memory-map the result
+        from .shared_index import publish_shared_indexes
+        try:
+            published = publish_shared_indexes()
+        except Exception as e:
+            logger.warning("Could not publish shared indexes, each worker opens the vector store: %s", e)
+
+    logger.info("Starting normalization service on %s:%s with %d worker(s)", args.host, args.port, args.workers)
+    try:
+        uvicorn.run(
+            "semantic_normalization.service:create_app_from_env",
+            factory=True,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level="warning",
+        )
+    finally:
+        if published:
+            shutil.rmtree(published, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Embedding indexes shared read-only across worker processes.
+
+Each normalizer process normally opens the Chroma store and holds its own
+copy of every collection's embeddings. With several workers per host, a
+parent process can instead read each collection once and publish it to a
+directory (on tmpfs, /dev/shm, when available):
+
+- <collection>.npy: float32 embedding matrix (rows L2-normalized for
+  cosine collections)
+- <collection>.json: embedding space, distance metric, documents and
+  metadatas (written last: its presence marks a complete index)
+
+Workers find the directory through SHARED_INDEX_DIR, which forked and
+spawned children inherit, and memory-map the matrices read-only
+(np.load(mmap_mode="r")). The pages live once in the page cache whatever
+the number of workers, and a worker starts without opening the vector
+store. Labels are small and are decoded per worker.
+
+Queries are exact (one matrix-vector product) and use the collection's
+distance metric, so results match Chroma's for these lexicon sizes.
+
+Usage:
+    python -m semantic_normalization.shared_index [--output DIR]
+    export SHARED_INDEX_DIR=DIR  # Then start the workers
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from .embeddings import EmbeddingBackend, get_embedding_backend, LEGACY_SPACE, METADATA_SPACE_KEY
+
+logger = logging.getLogger(__name__)
+
+ENV_INDEX_DIR = "SHARED_INDEX_DIR"
+METRICS = ("cosine", "l2", "ip")
+DEFAULT_METRIC = "l2"  # Chroma's default (squared L2)
+
+
+def default_index_root() -> str:
+    """tmpfs when available, so published matrices never touch disk."""
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class SharedEmbeddingIndex:
+    """Exact nearest-neighbour search over an (optionally memory-mapped) embedding matrix."""
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        documents: list[str],
+        metadatas: list[dict],
+        space: str,
+        metric: str = DEFAULT_METRIC,
+    ):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown distance metric: {metric}. Must be one of: {', '.join(METRICS)}")
+        if len(matrix) != len(documents) or len(documents) != len(metadatas):
+            raise ValueError("Matrix rows, documents and metadatas must have the same length")
+        self.matrix = matrix
+        self.documents = documents
+        self.metadatas = metadatas
+        self.space = space
+        self.metric = metric
+        # Squared row norms for L2 (one float per row, per process)
+        self._squared_norms = np.einsum("ij,ij->i", matrix, matrix) if metric == "l2" else None
+
+    @classmethod
+    def from_collection(cls, collection) -> "SharedEmbeddingIndex":
+        """Copy a Chroma collection's embeddings, documents and metadatas."""
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        metadata = collection.metadata or {}
+        metric = metadata.get("hnsw:space", DEFAULT_METRIC)
+        matrix = np.asarray(data["embeddings"], dtype=np.float32).reshape(len(data["documents"]), -1)
+        if metric == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.clip(norms, 1e-12, None)
+        return cls(
+            matrix,
+            list(data["documents"]),
+            list(data["metadatas"]),
+            metadata.get(METADATA_SPACE_KEY, LEGACY_SPACE),
+            metric,
+        )
+
+    def save(self, directory: str, name: str):
+        """Write the index as <name>.npy and <name>.json (atomically, JSON last)."""
+        os.makedirs(directory, exist_ok=True)
+        matrix_path = os.path.join(directory, f"{name}.npy")
+        labels_path = os.path.join(directory, f"{name}.json")
+        with open(matrix_path + ".tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(self.matrix, dtype=np.float32))
+        os.replace(matrix_path + ".tmp", matrix_path)
+        with open(labels_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "space": self.space,
+                "metric": self.metric,
+                "documents": self.documents,
+                "metadatas": self.metadatas,
+            }, f, ensure_ascii=False)
+        os.replace(labels_path + ".tmp", labels_path)
+
+    @classmethod
+    def load(cls, directory: str, name: str) -> "SharedEmbeddingIndex":
+        """
+        Attach to a published index (matrix memory-mapped read-only).
+
+        Raises:
+            FileNotFoundError: If the index was not (completely) published
+        """
+        with open(os.path.join(directory, f"{name}.json"), encoding="utf-8") as f:
+            labels = json.load(f)
+        matrix = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        return cls(matrix, labels["documents"], labels["metadatas"], labels["space"], labels["metric"])
+
+    def query(self, embedding: list[float], top_k: int = 5) -> tuple[list[dict], list[str], list[float]]:
+        """
+        Nearest entries to an embedding.
+
+        Returns:
+            (metadatas, documents, distances), nearest first, with Chroma's distance for the metric
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        scores = self.matrix @ vector
+        if self.metric == "cosine":
+            distances = 1.0 - scores / max(float(np.linalg.norm(vector)), 1e-12)
+        elif self.metric == "ip":
+            distances = 1.0 - scores
+        else:
+            distances = self._squared_norms - 2.0 * scores + float(vector @ vector)
+
+        top_k = min(top_k, len(distances))
+        if top_k <= 0:
+            return [], [], []
+        nearest = np.argpartition(distances, top_k - 1)[:top_k]
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        return (
+            [self.metadatas[i] for i in nearest],
+            [self.documents[i] for i in nearest],
+            [float(distances[i]) for i in nearest],
+        )
+
+
+def load_shared_index(
+    name: str,
+    embedding_backend: EmbeddingBackend,
+    directory: Optional[str] = None,
+) -> Optional[SharedEmbeddingIndex]:
+    """
+    The published index for a collection, if SHARED_INDEX_DIR (or directory) is set.
+
+    Raises:
+        FileNotFoundError: If the directory is set but the index is missing
+        ValueError: If the index was built in a different embedding space
+    """
+    directory = directory or os.getenv(ENV_INDEX_DIR)
+    if not directory:
+        return None
+    index = SharedEmbeddingIndex.load(directory, name)
+    if index.space != embedding_backend.space:
+        raise ValueError(
+            f"Shared index '{name}' was built with embedding space '{index.space}' "
+            f"but the configured backend uses '{embedding_backend.space}'"
+        )
+    return index
+
+
+def publish_shared_indexes(
+    db_path: Optional[str] = None,
+    directory: Optional[str] = None,
+    embedding_backend: Optional[EmbeddingBackend] = None,
+) -> str:
+    """
+    Read the lexicon and compatibility collections once and publish them for workers.
+
+    Sets SHARED_INDEX_DIR so that worker processes started afterwards use the index.
+
+    Args:
+        db_path: Chroma store (defaults to the knowledge base's vector store)
+        directory: Output directory (defaults to a new directory under /dev/shm)
+        embedding_backend: Backend whose space the collections must match
+
+    Returns:
+        The directory holding the published indexes
+    """
+    from .rag_interface import COLLECTION_NAME, COMPATIBILITY_COLLECTION_NAME, VECTOR_DB_PATH, open_collection
+
+    backend = embedding_backend or get_embedding_backend()
+    directory = directory or tempfile.mkdtemp(prefix="normalizer-index-", dir=default_index_root())
+    for name in (COLLECTION_NAME, COMPATIBILITY_COLLECTION_NAME):
+        collection = open_collection(db_path or VECTOR_DB_PATH, name, backend)
+        index = SharedEmbeddingIndex.from_collection(collection)
+        index.save(directory, name)
+        logger.info("Published %s: %d x %d to %s", name, *index.matrix.shape, directory)
+    os.environ[ENV_INDEX_DIR] = directory
+    return directory
+
+
+def main(argv: Optional[list[str]] = None):
+    """Publish the shared indexes and print the variable workers need."""
+    parser = argparse.ArgumentParser(description="Publish embedding indexes for normalizer workers")
+    parser.add_argument("--db", help="Chroma vector store (default: rag-knowledge-base/dist/vector_store)")
+    parser.add_argument("--output", "-o", help="Output directory (default: a new directory under /dev/shm)")
+    args = parser.parse_args(argv)
+
+    directory = publish_shared_indexes(args.db, args.output)
+    print(f"export {ENV_INDEX_DIR}={directory}")
+
+
+if __name__ == "__main__":
+    main()
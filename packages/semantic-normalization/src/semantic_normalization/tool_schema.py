@@ -1,11 +1,32 @@
 """
 Fetches and converts MCP tool schema for OpenAI function calling.
+
+The converted schema is persisted to disk keyed by the gateway's schema
+hash (get_schema_hash tool). A new process uses the disk copy immediately
+and revalidates it against the gateway in the background; list_tools is
+only called again when the hash changes.
 """
-from typing import Any
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from .dimensions import DIMENSION_VALUES
 
+logger = logging.getLogger(__name__)
+
+# Bump when mcp_to_openai_tool output changes: older cache files are ignored
+SCHEMA_CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "semantic-normalization"
+CACHE_FILE_NAME = f"tool_schema.v{SCHEMA_CACHE_VERSION}.json"
 
 # Cached schema for the session
 _CACHED_SCHEMA: list[dict[str, Any]] | None = None
+_CACHED_HASH: Optional[str] = None
+_REVALIDATION: Optional[asyncio.Task] = None
 
 
 def mcp_to_openai_tool(mcp_tool: dict) -> dict:
@@ -39,20 +60,83 @@ def mcp_to_openai_tool(mcp_tool: dict) -> dict:
     }
 
 
-async def fetch_tool_schema_from_gateway(mcp_client) -> list[dict]:
+def get_cache_path() -> Path:
+    """Schema cache file (TOOL_SCHEMA_CACHE_DIR env var, default ~/.cache/semantic-normalization)."""
+    cache_dir = os.getenv("TOOL_SCHEMA_CACHE_DIR")
+    return (Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR) / CACHE_FILE_NAME
+
+
+def load_cached_schema(path: Optional[Path] = None) -> Optional[tuple[str, list[dict]]]:
     """
-    Fetch tool schemas from MCP gateway and convert to OpenAI format.
+    Read the persisted schema.
+
+    Returns:
+        (schema_hash, openai_tools), or None if missing, unreadable or from
+        another cache version
+    """
+    path = path or get_cache_path()
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != SCHEMA_CACHE_VERSION or not data.get("schema_hash"):
+        return None
+    return data["schema_hash"], data["tools"]
+
+
+def save_cached_schema(schema_hash: str, tools: list[dict], path: Optional[Path] = None):
+    """Persist the schema atomically (concurrent processes never see a partial file)."""
+    path = path or get_cache_path()
+    payload = {"version": SCHEMA_CACHE_VERSION, "schema_hash": schema_hash, "tools": tools}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not write tool schema cache %s: %s", path, e)
+
+
+async def fetch_schema_hash(mcp_client) -> Optional[str]:
+    """Ask the gateway for its schema hash (None if the gateway predates get_schema_hash)."""
+    try:
+        result = await mcp_client.execute_tool_call("get_schema_hash", {})
+    except ValueError as e:  # GatewayToolError: unknown tool
+        logger.info("Gateway has no schema hash: %s", e)
+        return None
+    return result.get("schema_hash")
+
+
+def flatten_fact_arguments(arguments: dict) -> dict:
+    """
+    Convert strict-schema tool arguments to the process_canonical_fact signature.
+
+    The gateway's generated schema nests the dimension/value pair under
+    `fact` (one anyOf variant per dimension); the MCP tool takes them flat.
 
     Args:
-        mcp_client: MCP client session (StdioServerParameters context)
+        arguments: Tool call arguments from the LLM
 
     Returns:
-        List of OpenAI tool schemas
+        Arguments with dimension and value at the top level (flat arguments
+        are returned unchanged)
     """
-    global _CACHED_SCHEMA
+    fact = arguments.get("fact")
+    if not isinstance(fact, dict):
+        return arguments
+    flat = {key: item for key, item in arguments.items() if key != "fact"}
+    flat.update(fact)
+    return flat
 
-    if _CACHED_SCHEMA is not None:
-        return _CACHED_SCHEMA
+
+async def _list_openai_tools(mcp_client) -> list[dict]:
+    # Prefer the enum-constrained schema generated by the gateway
+    try:
+        result = await mcp_client.execute_tool_call("get_openai_tool_schema", {})
+        return result["tools"]
+    except ValueError as e:  # GatewayToolError: older gateway
+        logger.info("Gateway has no generated tool schema, converting list_tools: %s", e)
 
     tools_result = await mcp_client.list_tools()
 
@@ -64,21 +148,113 @@ async def fetch_tool_schema_from_gateway(mcp_client) -> list[dict]:
                 "description": tool.description,
                 "inputSchema": tool.inputSchema
             }))
-
-    _CACHED_SCHEMA = openai_tools
     return openai_tools
 
 
+def _set_schema(schema_hash: Optional[str], tools: list[dict]) -> list[dict]:
+    global _CACHED_SCHEMA, _CACHED_HASH
+    if _CACHED_SCHEMA is None:
+        _CACHED_SCHEMA = tools
+    else:
+        _CACHED_SCHEMA[:] = tools  # Update holders of the returned list in place
+    _CACHED_HASH = schema_hash
+    return _CACHED_SCHEMA
+
+
+async def revalidate_tool_schema(mcp_client, cache_path: Optional[Path] = None) -> list[dict]:
+    """
+    Compare the cached schema hash with the gateway's and refresh on change.
+
+    The session schema list is updated in place, so a normalizer holding it
+    picks up the new schema on its next request.
+
+    Returns:
+        The current OpenAI tool schemas
+    """
+    schema_hash = await fetch_schema_hash(mcp_client)
+    if schema_hash is not None and schema_hash == _CACHED_HASH and _CACHED_SCHEMA is not None:
+        return _CACHED_SCHEMA
+
+    tools = await _list_openai_tools(mcp_client)
+    if schema_hash is not None:
+        save_cached_schema(schema_hash, tools, cache_path)
+        if _CACHED_HASH is not None:
+            logger.info("Tool schema changed: %s -> %s", _CACHED_HASH[:12], schema_hash[:12])
+    return _set_schema(schema_hash, tools)
+
+
+async def _revalidate_in_background(mcp_client, cache_path: Optional[Path]):
+    try:
+        await revalidate_tool_schema(mcp_client, cache_path)
+    except Exception as e:
+        logger.warning("Tool schema revalidation failed, keeping cached schema: %s", e)
+
+
+async def fetch_tool_schema_from_gateway(
+    mcp_client,
+    use_disk_cache: bool = True,
+    cache_path: Optional[Path] = None,
+) -> list[dict]:
+    """
+    Fetch tool schemas from MCP gateway and convert to OpenAI format.
+
+    With a disk cache hit the cached schema is returned without a gateway
+    round trip, and revalidated in a background task.
+
+    Args:
+        mcp_client: Connected IntentGatewayClient
+        use_disk_cache: Read/write the on-disk schema cache
+        cache_path: Cache file (defaults to get_cache_path())
+
+    Returns:
+        List of OpenAI tool schemas
+    """
+    global _REVALIDATION
+
+    if _CACHED_SCHEMA is not None:
+        return _CACHED_SCHEMA
+
+    if use_disk_cache:
+        cached = load_cached_schema(cache_path)
+        if cached is not None:
+            schema = _set_schema(*cached)
+            _REVALIDATION = asyncio.create_task(_revalidate_in_background(mcp_client, cache_path))
+            return schema
+        return await revalidate_tool_schema(mcp_client, cache_path)
+
+    return _set_schema(None, await _list_openai_tools(mcp_client))
+
+
 def get_fallback_schema() -> list[dict]:
     """
-    Fallback schema for testing without gateway.
-    This should match the gateway's process_canonical_fact exactly.
+    Fallback schema for use without a gateway (tests, the CLI's main()).
+
+    Same strict shape as the gateway's generated schema
+    (get_openai_tool_schema): `fact` is an anyOf with one variant per
+    dimension, built from the shared DIMENSION_VALUES table, so the LLM
+    can only emit pairs the gateway accepts.
     """
+    variants = [
+        {
+            "type": "object",
+            "properties": {
+                "dimension": {"type": "string", "enum": [dimension]},
+                "value": {"type": "string", "enum": list(values)},
+            },
+            "required": ["dimension", "value"],
+            "additionalProperties": False,
+        }
+        for dimension, values in DIMENSION_VALUES.items()
+    ]
     return [{
         "type": "function",
         "function": {
             "name": "process_canonical_fact",
-            "description": "Process a canonical fact extracted from natural language.",
+            "description": (
+                "Record a canonical fact extracted from natural language. "
+                "Emit one call per fact; pick the dimension variant that matches the utterance."
+            ),
+            "strict": True,
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -87,27 +263,25 @@ def get_fallback_schema() -> list[dict]:
                         "items": {"type": "string"},
                         "description": "List of child names (e.g., ['Gabriel'])"
                     },
-                    "dimension": {
-                        "type": "string",
-                        "description": "The dimension type (e.g., 'MEAL_MAIN_CONSUMPTION')"
-                    },
-                    "value": {
-                        "type": "string",
-                        "description": "The value for the dimension (e.g., 'ALL')"
+                    "fact": {
+                        "anyOf": variants,
+                        "description": "The dimension and its value"
                     },
                     "confidence": {
                         "type": "number",
-                        "description": "Confidence score 0-1",
-                        "default": 1.0
+                        "description": "Confidence score 0-1 (use 1.0 when certain)"
                     }
                 },
-                "required": ["subjects", "dimension", "value"]
+                "required": ["subjects", "fact", "confidence"],
+                "additionalProperties": False
             }
         }
     }]
 
 
 def clear_cache():
-    """Clear the cached schema (useful for testing)."""
-    global _CACHED_SCHEMA
+    """Clear the in-memory cached schema (useful for testing). The disk cache is kept."""
+    global _CACHED_SCHEMA, _CACHED_HASH, _REVALIDATION
     _CACHED_SCHEMA = None
+    _CACHED_HASH = None
+    _REVALIDATION = None
@@ -0,0 +1,194 @@
+"""
+Trace context for utterances (W3C Trace Context ids).
+
+normalize_and_dispatch starts one trace per utterance and a child span
+per tool call, whose `traceparent` is sent in the MCP request metadata.
+The gateway continues the trace down to the backend write (see
+mcp_intent_gateway.tracing), so one trace id links every process.
+
+Finished spans go to a pluggable SpanExporter. Set NORMALIZER_TRACE_FILE
+to append them to a JSON-lines file, written by a background thread so
+the event loop never waits on disk (it may be the gateway's
+GATEWAY_TRACE_FILE: each span is written and flushed as a single line).
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+TRACEPARENT = "traceparent"  # MCP _meta key
+ENV_TRACE_FILE = "NORMALIZER_TRACE_FILE"
+SERVICE_NAME = "semantic-normalization"
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+def format_traceparent(trace_id: str, span_id: str) -> str:
+    """W3C traceparent value (version 00, sampled)."""
+    return f"00-{trace_id}-{span_id}-01"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple[str, str]]:
+    """(trace_id, span_id) from a traceparent value, or None if absent or malformed."""
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    return (match.group(1), match.group(2)) if match else None
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+    trace_id: str
+    span_id: str
+    name: str
+    parent_span_id: Optional[str] = None
+    service: str = SERVICE_NAME
+    start_time: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    duration_ms: Optional[float] = None
+    status: str = "ok"
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def traceparent(self) -> str:
+        """traceparent value that makes this span the parent of the callee."""
+        return format_traceparent(self.trace_id, self.span_id)
+
+
+class SpanExporter:
+    """Receives finished spans. Subclass and pass to set_span_exporter()."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Block until every exported span is recorded."""
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    Appends one JSON object per span to a file.
+
+    export() only queues the span; a writer thread serializes and appends
+    queued spans (same design as the gateway's exporter).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue()  # None stops the writer
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._write_loop, name="span-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(span)
+
+    def _write_loop(self):
+        file: Optional[IO[str]] = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            file = self.path.open("a", encoding="utf-8")
+        except OSError as e:
+            logger.warning("Cannot open trace file %s, spans are dropped: %s", self.path, e)
+        while True:
+            span = self._queue.get()
+            try:
+                if span is None:
+                    break
+                if file is not None:
+                    # One write per line: the file may be shared with the gateway
+                    file.write(json.dumps(asdict(span), ensure_ascii=False, default=str) + "\n")
+                    file.flush()
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning("Cannot write span to %s: %s", self.path, e)
+            finally:
+                self._queue.task_done()
+        if file is not None:
+            file.close()
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+_exporter: Optional[SpanExporter] = None
+_exporter_configured = False
+
+
+def get_span_exporter() -> Optional[SpanExporter]:
+    """The active exporter (from NORMALIZER_TRACE_FILE unless set explicitly)."""
+    global _exporter, _exporter_configured
+    if not _exporter_configured:
+        path = os.getenv(ENV_TRACE_FILE)
+        _exporter = JsonLinesSpanExporter(path) if path else None
+        if _exporter is not None:
+            atexit.register(_exporter.shutdown)  # Write queued spans before the process exits
+        _exporter_configured = True
+    return _exporter
+
+
+def set_span_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Replace the active exporter (None disables export)."""
+    global _exporter, _exporter_configured
+    previous = _exporter
+    _exporter, _exporter_configured = exporter, True
+    if previous is not None and previous is not exporter:
+        previous.shutdown()
+
+
+@contextmanager
+def start_span(name: str, parent: Optional[Span] = None, **attributes) -> Iterator[Span]:
+    """
+    Time a block as a span and export it when the block ends.
+
+    Args:
+        name: Operation name
+        parent: Parent span (None starts a new trace)
+        **attributes: Initial span attributes
+
+    Yields:
+        The span; status becomes "error" if the block raises
+    """
+    span = Span(
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        name=name,
+        parent_span_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException:
+        span.status = "error"
+        raise
+    finally:
+        span.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        exporter = get_span_exporter()
+        if exporter is not None:
+            exporter.export(span)
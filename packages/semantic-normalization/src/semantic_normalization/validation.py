@@ -0,0 +1,241 @@
+"""
+Local validation and deterministic repair of LLM tool calls.
+
+Tool calls are checked against the gateway's dimension table before
+dispatch, so obviously invalid pairs never cost a gateway round trip.
+The table is the shared copy in dimensions.py, so validation applies
+whichever tool schema the LLM was given (strict, fallback or cached).
+
+Repair steps, in order, for the dimension and then the value:
+1. Normalize case, whitespace and separators ("meal main-consumption")
+2. Apply the synonym map ("HALF_EATEN" -> "HALF")
+3. Pick the nearest valid value by edit distance, if unambiguous
+
+Synonyms are true equivalents only: a repair must never add information
+the caregiver did not give (e.g. "SICK" is not "FEVER"). Synonyms and
+edit-distance matches lower the call's confidence. Calls that are still
+invalid after repair are dropped.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .dimensions import DIMENSION_VALUES
+
+# Frequent LLM near-misses, by dimension (values) and globally (dimensions)
+DIMENSION_SYNONYMS: dict[str, str] = {
+    "MEAL": "MEAL_MAIN_CONSUMPTION",
+    "MEAL_CONSUMPTION": "MEAL_MAIN_CONSUMPTION",
+    "MAIN_CONSUMPTION": "MEAL_MAIN_CONSUMPTION",
+    "DESSERT": "MEAL_DESSERT_CONSUMPTION",
+    "DESSERT_CONSUMPTION": "MEAL_DESSERT_CONSUMPTION",
+    "VEGETABLES": "MEAL_VEGETABLE_CONSUMPTION",
+    "VEGETABLE_CONSUMPTION": "MEAL_VEGETABLE_CONSUMPTION",
+    "SLEEP": "SLEEP_STATE",
+    "NAP": "SLEEP_STATE",
+    "DIAPER": "DIAPER_CHANGE_TYPE",
+    "DIAPER_CHANGE": "DIAPER_CHANGE_TYPE",
+    "ACTIVITY": "ACTIVITY_TYPE",
+    "MOOD": "CHILD_MOOD",
+    "BEHAVIOR": "CHILD_MOOD",
+    "HEALTH": "HEALTH_STATUS",
+    "SYMPTOM": "HEALTH_STATUS",
+    "MEDICATION": "MEDICATION_TYPE",
+    "MEDICINE": "MEDICATION_TYPE",
+}
+
+_CONSUMPTION_SYNONYMS = {
+    "NONE": "NOTHING",
+    "NOT_EATEN": "NOTHING",
+    "ZERO": "NOTHING",
+    "A_QUARTER": "QUARTER",
+    "HALF_EATEN": "HALF",
+    "HALF_PORTION": "HALF",
+    "EVERYTHING": "ALL",
+    "FULL": "ALL",
+    "FINISHED": "ALL",
+    "ALL_EATEN": "ALL",
+}
+
+VALUE_SYNONYMS: dict[str, dict[str, str]] = {
+    "MEAL_MAIN_CONSUMPTION": _CONSUMPTION_SYNONYMS,
+    "MEAL_DESSERT_CONSUMPTION": _CONSUMPTION_SYNONYMS,
+    "MEAL_VEGETABLE_CONSUMPTION": _CONSUMPTION_SYNONYMS,
+    "MEAL_TYPE": {"AFTERNOON_SNACK": "SNACK", "GOUTER": "SNACK", "SUPPER": "DINNER"},
+    "SLEEP_STATE": {
+        "SLEEPING": "ASLEEP",
+        "NAPPING": "ASLEEP",
+        "FELL_ASLEEP": "ASLEEP",
+        "AWAKE": "WOKE_UP",
+        "WOKE": "WOKE_UP",
+        "WAKING_UP": "WOKE_UP",
+        "REFUSED": "REFUSED_SLEEP",
+        "NO_NAP": "REFUSED_SLEEP",
+    },
+    "DIAPER_CHANGE_TYPE": {
+        "PEE": "WET",
+        "URINE": "WET",
+        "POOP": "DIRTY",
+        "SOILED": "DIRTY",
+        "STOOL": "DIRTY",
+        "WET_AND_DIRTY": "BOTH",
+        "CLEAN": "DRY",
+    },
+    "CHILD_MOOD": {"SAD": "UPSET", "CRYING": "UPSET", "ANGRY": "CRANKY", "GRUMPY": "CRANKY"},
+    "HEALTH_STATUS": {"FINE": "HEALTHY", "RUNNY": "RUNNY_NOSE"},
+    "MEDICATION_TYPE": {"PARACETAMOL": "PAIN_RELIEVER", "IBUPROFEN": "PAIN_RELIEVER", "DOLIPRANE": "PAIN_RELIEVER"},
+}
+
+SYNONYM_PENALTY = 0.05       # Confidence lost per synonym substitution
+EDIT_PENALTY = 0.1           # Confidence lost per edit (insert/delete/substitute)
+MAX_EDIT_RATIO = 0.34        # Max edits as a fraction of the candidate's length
+
+_SEPARATORS = re.compile(r"[\s\-./]+")
+
+
+@dataclass
+class RepairResult:
+    """Outcome of validating (and possibly repairing) one tool call."""
+    arguments: dict[str, Any]
+    valid: bool
+    repairs: list[str] = field(default_factory=list)
+    reason: Optional[str] = None
+
+
+def canonicalize(token: str) -> str:
+    """Upper-case, trim and join words with underscores ("half eaten" -> "HALF_EATEN")."""
+    return _SEPARATORS.sub("_", token.strip()).strip("_").upper()
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,                      # Deletion
+                current[j - 1] + 1,                   # Insertion
+                previous[j - 1] + (char_a != char_b)  # Substitution
+            ))
+        previous = current
+    return previous[-1]
+
+
+def nearest(token: str, candidates: list[str]) -> Optional[tuple[str, int]]:
+    """
+    Closest candidate by edit distance, within MAX_EDIT_RATIO of its length.
+
+    Returns:
+        (candidate, distance), or None if nothing is close enough or two
+        candidates are equally close
+    """
+    scored = sorted((edit_distance(token, c), c) for c in candidates)
+    if not scored:
+        return None
+    distance, best = scored[0]
+    if distance > max(1, int(len(best) * MAX_EDIT_RATIO)):
+        return None
+    if len(scored) > 1 and scored[1][0] == distance:
+        return None  # Ambiguous
+    return best, distance
+
+
+class ToolCallValidator:
+    """
+    Validates process_canonical_fact arguments against a dimension table
+    and repairs near-misses deterministically.
+
+    Usage:
+        validator = ToolCallValidator()  # Built once, reused for every call
+        result = validator.repair(arguments)
+        if result.valid:
+            dispatch(result.arguments)
+    """
+
+    def __init__(self, dimension_table: Optional[dict[str, list[str]]] = None):
+        """
+        Args:
+            dimension_table: Valid values by dimension (defaults to the gateway's, see dimensions.py)
+        """
+        self.dimension_table = DIMENSION_VALUES if dimension_table is None else dimension_table
+
+    @property
+    def enabled(self) -> bool:
+        """False when there is no table to validate against."""
+        return bool(self.dimension_table)
+
+    def _resolve(
+        self,
+        field_name: str,
+        raw: Any,
+        candidates: list[str],
+        synonyms: dict[str, str],
+        repairs: list[str],
+    ) -> tuple[Optional[str], float]:
+        """Resolve one field; returns (valid token or None, confidence penalty)."""
+        if not isinstance(raw, str):
+            return None, 0.0
+        token = canonicalize(raw)
+        if token in candidates:
+            if token != raw:
+                repairs.append(f"{field_name}: '{raw}' -> '{token}' (normalized)")
+            return token, 0.0
+
+        synonym = synonyms.get(token)
+        if synonym in candidates:
+            repairs.append(f"{field_name}: '{raw}' -> '{synonym}' (synonym)")
+            return synonym, SYNONYM_PENALTY
+
+        match = nearest(token, candidates)
+        if match is not None:
+            value, distance = match
+            repairs.append(f"{field_name}: '{raw}' -> '{value}' (edit distance {distance})")
+            return value, EDIT_PENALTY * distance
+
+        return None, 0.0
+
+    def repair(self, arguments: dict[str, Any]) -> RepairResult:
+        """
+        Validate tool call arguments, repairing dimension and value if needed.
+
+        Args:
+            arguments: process_canonical_fact arguments (flat)
+
+        Returns:
+            RepairResult with repaired arguments, or valid=False and a reason
+        """
+        if not self.enabled:
+            return RepairResult(arguments=arguments, valid=True)
+
+        repairs: list[str] = []
+        raw_dimension = arguments.get("dimension")
+        dimension, dimension_penalty = self._resolve(
+            "dimension", raw_dimension, list(self.dimension_table), DIMENSION_SYNONYMS, repairs
+        )
+        if dimension is None:
+            return RepairResult(
+                arguments=arguments, valid=False, repairs=repairs,
+                reason=f"Unknown dimension: {raw_dimension!r}",
+            )
+
+        raw_value = arguments.get("value")
+        value, value_penalty = self._resolve(
+            "value", raw_value, self.dimension_table[dimension],
+            VALUE_SYNONYMS.get(dimension, {}), repairs,
+        )
+        if value is None:
+            return RepairResult(
+                arguments=arguments, valid=False, repairs=repairs,
+                reason=f"Invalid value {raw_value!r} for dimension {dimension}",
+            )
+
+        repaired = {**arguments, "dimension": dimension, "value": value}
+        penalty = dimension_penalty + value_penalty
+        if penalty:
+            confidence = arguments.get("confidence", 1.0)
+            if isinstance(confidence, (int, float)):
+                repaired["confidence"] = round(max(0.0, confidence - penalty), 4)
+        return RepairResult(arguments=repaired, valid=True, repairs=repairs)
@@ -0,0 +1,147 @@
+"""
+Background warm-up with readiness signalling.
+
+Runs one-off initialization steps (model load, vector store open, first
+queries, HTTP connection setup) on a background thread so the first real
+request does not pay for them. Callers that arrive early wait on readiness
+instead of triggering their own initialization.
+"""
+import asyncio
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Representative lexicon queries: exercise tokenizer, encoder and index paths
+DEFAULT_WARM_UP_QUERIES = [
+    "Gabriel a tout mangé",
+    "Léa fait dodo",
+    "couche sale",
+    "il a de la fièvre",
+]
+
+
+class WarmUpState(str, Enum):
+    """Lifecycle of a warm-up run."""
+
+    PENDING = "pending"    # Not started
+    WARMING = "warming"    # Steps running in the background
+    READY = "ready"        # All steps succeeded
+    DEGRADED = "degraded"  # Finished, but at least one step failed
+
+
+class WarmUp:
+    """
+    Runs named warm-up steps once, in order, on a daemon thread.
+
+    Usage:
+        warm_up = WarmUp([("model", load_model), ("index", open_index)])
+        warm_up.start()
+        ...
+        await warm_up.ready()     # async callers
+        warm_up.wait()            # sync callers
+        warm_up.report()          # per-step timings and errors
+    """
+
+    def __init__(self, steps: list[tuple[str, Callable[[], object]]], name: str = "warm-up"):
+        self.name = name
+        self._steps = steps
+        self._state = WarmUpState.PENDING
+        self._timings: dict[str, float] = {}
+        self._errors: dict[str, str] = {}
+        self._total_seconds: Optional[float] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def state(self) -> WarmUpState:
+        return self._state
+
+    @property
+    def is_ready(self) -> bool:
+        """True once warm-up has finished (even if some steps failed)."""
+        return self._done.is_set()
+
+    def start(self) -> "WarmUp":
+        """Start warm-up on a background thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._state = WarmUpState.WARMING
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        started = time.perf_counter()
+        for step_name, step in self._steps:
+            t = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self._errors[step_name] = str(e)
+                logger.warning("%s: step '%s' failed: %s", self.name, step_name, e)
+            self._timings[step_name] = time.perf_counter() - t
+        self._total_seconds = time.perf_counter() - started
+
+        with self._lock:
+            self._state = WarmUpState.DEGRADED if self._errors else WarmUpState.READY
+            self._done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+        logger.info("%s: %s in %.2fs %s", self.name, self._state.value, self._total_seconds, self._timings)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until warm-up has finished.
+
+        Returns immediately if warm-up was never started.
+
+        Returns:
+            True if warm-up is finished (or not started), False on timeout
+        """
+        if self._thread is None:
+            return True
+        return self._done.wait(timeout)
+
+    async def ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Await warm-up completion without blocking the event loop.
+
+        Returns:
+            True if warm-up is finished (or not started), False on timeout
+        """
+        with self._lock:
+            if self._thread is None or self._done.is_set():
+                return True
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def report(self) -> dict:
+        """Warm-up state with per-step durations (seconds) and errors."""
+        return {
+            "state": self._state.value,
+            "total_seconds": self._total_seconds,
+            "steps": {
+                name: {"seconds": self._timings.get(name), "error": self._errors.get(name)}
+                for name, _ in self._steps
+            },
+        }
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(True)
@@ -0,0 +1,20 @@
+"""Shared pytest configuration for semantic-normalization tests."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def hashing_embedding_backend(monkeypatch):
+    """Use the deterministic hashing backend so tests never load the real model."""
+    monkeypatch.setenv("EMBEDDING_BACKEND", "hashing")
+
+
+@pytest.fixture(autouse=True)
+def tool_schema_cache(monkeypatch, tmp_path):
+    """Keep the tool schema cache (and gateway spool) per test and out of the user's home directory."""
+    from semantic_normalization import tool_schema
+
+    monkeypatch.setenv("TOOL_SCHEMA_CACHE_DIR", str(tmp_path / "schema-cache"))
+    monkeypatch.setenv("GATEWAY_SPOOL_PATH", str(tmp_path / "spool.sqlite3"))  # Gateways started by tests
+    tool_schema.clear_cache()
+    yield
+    tool_schema.clear_cache()
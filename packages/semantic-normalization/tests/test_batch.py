@@ -0,0 +1,127 @@
+"""Tests for streaming batch normalization."""
+import asyncio
+import io
+import json
+
+import pytest
+
+from semantic_normalization.batch import normalize_and_dispatch, resume_point, run_batch
+
+
+def jsonl(*items):
+    return io.StringIO("".join(json.dumps(item) + "\n" for item in items))
+
+
+def results(sink):
+    return [json.loads(line) for line in sink.getvalue().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_results_are_written_in_input_order_with_bounded_concurrency():
+    """Later lines may finish first; output order and the window still hold."""
+    in_flight, peak = 0, 0
+
+    async def process(text):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02 if text.endswith("0") else 0.001)
+        in_flight -= 1
+        return {"input": text}
+
+    source = jsonl(*(f"utterance {i}" for i in range(20)))
+    sink = io.StringIO()
+
+    stats = await run_batch(source, sink, process, concurrency=3)
+
+    assert [r["line"] for r in results(sink)] == list(range(20))
+    assert [r["input"] for r in results(sink)] == [f"utterance {i}" for i in range(20)]
+    assert peak == 3
+    assert stats.succeeded == 20 and stats.failed == 0
+
+
+@pytest.mark.asyncio
+async def test_bad_lines_are_reported_without_stopping_the_batch():
+    """Invalid JSON and failed utterances get an error record; blank lines are skipped."""
+
+    async def process(text):
+        if text == "boom":
+            raise RuntimeError("LLM unavailable")
+        return {"input": text}
+
+    source = io.StringIO('{"id": "a", "text": "ok"}\n\nnot json\n"boom"\n{"txt": "x"}\n')
+    sink = io.StringIO()
+
+    stats = await run_batch(source, sink, process, concurrency=2)
+
+    lines = results(sink)
+    assert lines[0] == {"line": 0, "id": "a", "input": "ok"}
+    assert [r["line"] for r in lines] == [0, 2, 3, 4]
+    assert lines[1]["error"].startswith("JSONDecodeError")
+    assert lines[2]["error"] == "RuntimeError: LLM unavailable"
+    assert "text" in lines[3]["error"]
+    assert stats.succeeded == 1 and stats.failed == 3
+
+
+@pytest.mark.asyncio
+async def test_resume_continues_after_last_complete_result(tmp_path):
+    """A torn final write is dropped and its line is processed again."""
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"line": 0, "input": "a"}\n{"line": 1, "input": "b"}\n{"line": 2, "inp')
+
+    start = resume_point(str(output))
+
+    assert start == 2
+    assert output.read_text().endswith('"b"}\n')
+
+    async def process(text):
+        return {"input": text}
+
+    with open(output, "a", encoding="utf-8") as sink:
+        stats = await run_batch(jsonl("a", "b", "c", "d"), sink, process, start_line=start)
+
+    assert [r["input"] for r in map(json.loads, output.read_text().splitlines())] == ["a", "b", "c", "d"]
+    assert stats.skipped == 2 and stats.succeeded == 2
+    assert resume_point(str(tmp_path / "missing.jsonl")) == 0
+
+
+def test_resume_drops_unreadable_final_results(tmp_path):
+    """Complete but non-JSON (or line-less) final results are treated like a torn write."""
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"line": 0, "input": "a"}\n{"line": 1, "inp\n\x00\x00\n')
+
+    assert resume_point(str(output)) == 1
+    assert output.read_text() == '{"line": 0, "input": "a"}\n'
+
+    output.write_text('garbage\n')
+    assert resume_point(str(output)) == 0
+    assert output.read_text() == ""
+
+
+@pytest.mark.asyncio
+async def test_dispatch_processor_uses_shared_client():
+    """Every line is dispatched through the same warm gateway client."""
+    clients = []
+
+    class FakeResult:
+        def __init__(self, text):
+            self.text = text
+
+        def to_dict(self, include_context=True):
+            return {"input": self.text, "all_succeeded": True, "context": include_context}
+
+    class FakeNormalizer:
+        async def normalize_and_dispatch(self, text, mcp_client):
+            clients.append(mcp_client)
+            return FakeResult(text)
+
+    client = object()
+    sink = io.StringIO()
+
+    await run_batch(jsonl("x", "y"), sink, normalize_and_dispatch(FakeNormalizer(), client))
+
+    assert results(sink) == [
+        {"line": 0, "input": "x", "all_succeeded": True, "context": False},
+        {"line": 1, "input": "y", "all_succeeded": True, "context": False},
+    ]
+    assert clients == [client, client]
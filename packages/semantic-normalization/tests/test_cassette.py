@@ -0,0 +1,167 @@
+"""Tests for record/replay cassettes."""
+import asyncio
+import gzip
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from semantic_normalization.cassette import (
+    Cassette,
+    CassetteGatewayClient,
+    CassetteMiss,
+    request_key,
+)
+from semantic_normalization.mcp_client import GatewayToolError
+from semantic_normalization.normalizer import SemanticNormalizer
+from semantic_normalization.rag_interface import RAGRetriever
+
+FACT = {"subjects": ["Gabriel"], "dimension": "MEAL_MAIN_CONSUMPTION", "value": "ALL"}
+
+
+class FixedRetriever(RAGRetriever):
+    def retrieve_context(self, query: str, top_k: int = 5) -> str:
+        return "RELEVANT KNOWLEDGE (Semantic Match):\n- 'tout mangé' → MEAL_MAIN_CONSUMPTION: ALL (dist: 0.10)"
+
+
+def completion():
+    from openai.types.chat import ChatCompletion
+
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "tool_calls",
+            "message": {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": "call_1",
+                    "type": "function",
+                    "function": {"name": "process_canonical_fact", "arguments": json.dumps(FACT)},
+                }],
+            },
+        }],
+        "usage": {"prompt_tokens": 900, "completion_tokens": 30, "total_tokens": 930},
+    })
+
+
+def make_normalizer(cassette, api_key=None):
+    return SemanticNormalizer(
+        api_key=api_key,
+        rag_retriever=FixedRetriever(),
+        compatibility_rag_retriever=FixedRetriever(),
+        cassette=cassette,
+    )
+
+
+class FakeGateway:
+    """Counts calls; takes 50 ms per fact; fails tools named 'broken'."""
+
+    def __init__(self):
+        self.calls = []
+        self.entered = False
+
+    async def __aenter__(self):
+        self.entered = True
+        return self
+
+    async def __aexit__(self, *exc):
+        self.entered = False
+
+    async def execute_tool_call(self, tool_name, arguments, meta=None):
+        self.calls.append((tool_name, arguments, meta))
+        if tool_name == "process_canonical_fact":
+            await asyncio.sleep(0.05)
+        if tool_name == "broken":
+            raise GatewayToolError("Unknown tool: broken")
+        return {"success": True, "message": "Event recorded"}
+
+
+def test_llm_completion_is_replayed_without_openai(tmp_path):
+    """A recorded completion is served back with no client and the same tool calls."""
+    path = tmp_path / "run.jsonl.gz"
+    recorder = make_normalizer(Cassette(path, mode="record"), api_key="sk-test")
+    with patch.object(recorder.client.chat.completions, "create", return_value=completion()) as create:
+        recorded, _ = recorder.normalize("Gabriel a tout mangé")
+        recorder.normalize("Gabriel a tout mangé")  # Same request: stored once
+    recorder.cassette.close()
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        (line,) = f.read().splitlines()
+    assert create.call_count == 2
+    assert json.loads(line)["label"] == 'Input: "Gabriel a tout mangé"'
+
+    player = make_normalizer(Cassette(path))
+    usage = {}
+    replayed, _ = player.normalize("Gabriel a tout mangé", usage=usage)
+
+    assert replayed == recorded
+    assert usage["prompt"] == 900
+    assert player._client is None  # OpenAI was never instantiated
+
+    with pytest.raises(CassetteMiss):
+        player.normalize("Léa fait dodo")
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_keyed_by_name_and_arguments(tmp_path):
+    """Metadata is not part of the key; gateway errors are replayed as errors."""
+    path = tmp_path / "run.jsonl"
+    gateway = FakeGateway()
+    async with CassetteGatewayClient(Cassette(path, mode="record"), gateway) as client:
+        assert gateway.entered
+        first = await client.execute_tool_call("process_canonical_fact", FACT, meta={"traceparent": "a"})
+        with pytest.raises(GatewayToolError):
+            await client.execute_tool_call("broken", {})
+
+    replay = Cassette(path, latency="original")
+    offline = FakeGateway()
+    async with CassetteGatewayClient(replay, offline) as client:
+        started = time.perf_counter()
+        again = await client.execute_tool_call(
+            "process_canonical_fact", dict(reversed(list(FACT.items()))), meta={"traceparent": "b"}
+        )
+        elapsed = time.perf_counter() - started
+        with pytest.raises(GatewayToolError, match="Unknown tool"):
+            await client.execute_tool_call("broken", {})
+
+    assert again == first
+    assert elapsed >= 0.05  # Original latency is reproduced
+    assert len(gateway.calls) == 2
+    assert not offline.calls and not offline.entered  # Replay never touches the gateway
+    assert replay.hits == 2
+
+    fast = CassetteGatewayClient(Cassette(path, latency="zero"))
+    started = time.perf_counter()
+    assert await fast.execute_tool_call("process_canonical_fact", FACT) == first
+    assert time.perf_counter() - started < 0.05
+
+
+def test_auto_mode_records_only_misses(tmp_path):
+    """Auto mode appends new interactions to an existing cassette."""
+    path = tmp_path / "run.jsonl"
+    path.write_text(json.dumps({
+        "key": request_key("tool", {"name": "get_metrics", "arguments": {}}),
+        "kind": "tool", "label": "get_metrics", "latency": 0.01, "response": {"metrics": {}},
+    }) + "\n")
+
+    cassette = Cassette(path, mode="auto")
+    gateway = FakeGateway()
+    client = CassetteGatewayClient(cassette, gateway)
+
+    async def run():
+        async with client:
+            await client.execute_tool_call("get_metrics", {})
+            await client.execute_tool_call("process_canonical_fact", FACT)
+
+    asyncio.run(run())
+    cassette.close()
+
+    assert [name for name, _, _ in gateway.calls] == ["process_canonical_fact"]
+    assert len(path.read_text().splitlines()) == 2
+    assert len(Cassette(path)) == 2
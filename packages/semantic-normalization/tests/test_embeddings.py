@@ -0,0 +1,191 @@
+"""Tests for embedding backends."""
+import math
+import threading
+import time
+
+import pytest
+
+from semantic_normalization.embeddings import (
+    EmbeddingBackend,
+    HashingEmbeddingBackend,
+    MicroBatchingBackend,
+    OnnxEmbeddingBackend,
+    SentenceTransformerBackend,
+    clear_backend_cache,
+    get_embedding_backend,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_backend_cache():
+    clear_backend_cache()
+    yield
+    clear_backend_cache()
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_hashing_backend_is_deterministic_and_normalized():
+    backend = HashingEmbeddingBackend()
+    first = backend.embed(["Gabriel a tout mangé"])[0]
+    second = HashingEmbeddingBackend().embed(["Gabriel a tout mangé"])[0]
+
+    assert first == second
+    assert len(first) == 384
+    assert math.isclose(math.sqrt(sum(v * v for v in first)), 1.0, rel_tol=1e-9)
+
+
+def test_hashing_backend_folds_accents_and_ranks_overlap_higher():
+    backend = HashingEmbeddingBackend()
+    query, close, far = backend.embed(["a tout mangé", "tout mange", "fait dodo"])
+
+    assert _cosine(query, close) > _cosine(query, far)
+    assert backend.embed(["mangé"]) == backend.embed(["MANGE"])
+
+
+def test_hashing_backend_empty_text():
+    assert HashingEmbeddingBackend(dimension=8).embed([""]) == [[0.0] * 8]
+
+
+def test_get_embedding_backend_from_env(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_BACKEND", "hashing")
+    backend = get_embedding_backend()
+
+    assert isinstance(backend, HashingEmbeddingBackend)
+    assert get_embedding_backend() is backend  # cached per configuration
+    assert backend.space == "hashing-384"
+
+
+def test_get_embedding_backend_sentence_transformers_is_lazy():
+    backend = get_embedding_backend("sentence-transformers")
+
+    assert isinstance(backend, SentenceTransformerBackend)
+    assert backend._model is None
+    assert backend.space == "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+def test_get_embedding_backend_unknown():
+    with pytest.raises(ValueError, match="Unknown embedding backend"):
+        get_embedding_backend("word2vec")
+
+
+class RecordingBackend(EmbeddingBackend):
+    """Slow encoder recording the size of each call."""
+
+    name = "recording"
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+        self.inner = HashingEmbeddingBackend(dimension=16)
+
+    @property
+    def space(self):
+        return self.inner.space
+
+    def embed(self, texts):
+        self.calls.append(len(texts))
+        time.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("encoder crashed")
+        return self.inner.embed(texts)
+
+
+def _embed_concurrently(backend, queries):
+    results, errors = {}, {}
+
+    def call(query):
+        try:
+            results[query] = backend.embed([query])
+        except Exception as e:
+            errors[query] = e
+
+    threads = [threading.Thread(target=call, args=(q,)) for q in queries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_micro_batching_coalesces_concurrent_calls():
+    """Concurrent single-query calls share encoder calls; each caller gets its own vectors."""
+    inner = RecordingBackend()
+    backend = MicroBatchingBackend(inner, max_wait_ms=20, max_batch_size=4)
+    queries = [f"enfant {i} a tout mangé" for i in range(8)]
+
+    results, errors = _embed_concurrently(backend, queries)
+    backend.close()
+
+    assert not errors
+    assert all(results[q] == inner.inner.embed([q]) for q in queries)
+    assert sum(inner.calls) == 8
+    assert len(inner.calls) < 8
+    assert max(inner.calls) <= 4
+    assert backend.space == inner.space
+    assert backend.embed([]) == []
+
+
+def test_micro_batching_propagates_encoder_errors():
+    backend = MicroBatchingBackend(RecordingBackend(fail=True), max_wait_ms=5)
+
+    results, errors = _embed_concurrently(backend, ["dodo", "couche"])
+    backend.close()
+
+    assert not results
+    assert [str(e) for e in errors.values()] == ["encoder crashed", "encoder crashed"]
+
+
+def test_get_embedding_backend_wraps_for_micro_batching(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_BATCH_WAIT_MS", "3")
+    monkeypatch.setenv("EMBEDDING_BATCH_SIZE", "16")
+    backend = get_embedding_backend("hashing")
+
+    assert isinstance(backend, MicroBatchingBackend)
+    assert isinstance(backend.backend, HashingEmbeddingBackend)
+    assert (backend.max_wait, backend.max_batch_size) == (0.003, 16)
+    assert backend.embed(["dodo"]) == HashingEmbeddingBackend().embed(["dodo"])
+
+
+def test_onnx_backend_requires_model_dir(monkeypatch, tmp_path):
+    monkeypatch.delenv("EMBEDDING_ONNX_DIR", raising=False)
+    with pytest.raises(ValueError):
+        get_embedding_backend("onnx")
+
+    with pytest.raises(FileNotFoundError):
+        OnnxEmbeddingBackend(str(tmp_path), quantized=True)
+
+
+def test_retriever_refuses_index_from_another_space(tmp_path):
+    chromadb = pytest.importorskip("chromadb")
+    from semantic_normalization.rag_interface import COLLECTION_NAME, VectorRAGRetriever
+
+    backend = HashingEmbeddingBackend()
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    collection = client.create_collection(
+        name=COLLECTION_NAME,
+        embedding_function=None,
+        metadata={"hnsw:space": "cosine", "embedding_space": backend.space},
+    )
+    documents = ["tout", "la moitié", "dodo"]
+    collection.add(
+        ids=["1", "2", "3"],
+        documents=documents,
+        embeddings=backend.embed(documents),
+        metadatas=[
+            {"dimension": "MEAL_MAIN_CONSUMPTION", "canonical_value": "ALL"},
+            {"dimension": "MEAL_MAIN_CONSUMPTION", "canonical_value": "HALF"},
+            {"dimension": "SLEEP_STATE", "canonical_value": "ASLEEP"},
+        ],
+    )
+
+    retriever = VectorRAGRetriever(db_path=str(tmp_path), embedding_backend=backend)
+    context = retriever.retrieve_context("Léa fait dodo", top_k=1)
+    assert "SLEEP_STATE: ASLEEP" in context
+
+    mismatched = VectorRAGRetriever(
+        db_path=str(tmp_path), embedding_backend=HashingEmbeddingBackend(dimension=64)
+    )
+    assert mismatched.retrieve_context("dodo") == "WARNING: Knowledge base not initialized."
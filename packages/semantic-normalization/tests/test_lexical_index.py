@@ -0,0 +1,130 @@
+"""Tests for the lexical index and hybrid retrieval."""
+import pytest
+
+from semantic_normalization.lexical_index import LexicalIndex, tokenize
+from semantic_normalization.rag_interface import (
+    LEXICON_PATH,
+    HybridRAGRetriever,
+    VectorRAGRetriever,
+    create_lexical_retriever,
+)
+
+LEXICON = {
+    "MEAL_MAIN_CONSUMPTION": {
+        "NOTHING": ["rien mangé", "0%"],
+        "QUARTER": ["un quart", "25%"],
+        "HALF": ["la moitié", "50%"],
+        "THREE_QUARTERS": ["trois quarts", "75%"],
+        "ALL": ["tout", "100%", "tout fini"],
+    },
+    "SLEEP_STATE": {"ASLEEP": ["dodo", "sieste"], "WOKE_UP": ["fin de sieste", "réveillé"]},
+    "DIAPER_CHANGE_TYPE": {"WET": ["mouillé"], "DIRTY": ["sale"], "BOTH": ["mouillé et sale"]},
+}
+
+
+class FakeVectorRetriever(VectorRAGRetriever):
+    """Fixed vector ranking; records the queries it encodes."""
+
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+        self.embedding_backend = None
+
+    def search(self, query, top_k=5):
+        self.queries.append(query)
+        metadatas = [{"dimension": d, "canonical_value": v} for _, d, v, _ in self.results]
+        return metadatas, [doc for doc, *_ in self.results], [dist for *_, dist in self.results]
+
+
+@pytest.fixture
+def index():
+    return LexicalIndex.from_lexicon(LEXICON)
+
+
+def test_tokens_are_folded_and_keep_percentages():
+    assert tokenize("Léa n’a RIEN mangé, 25 % du plat") == ["lea", "n", "a", "rien", "mange", "25%", "du", "plat"]
+
+
+def test_short_numeric_phrases_match_exactly(index):
+    """"25%" is found literally; nearby percentages are not confused with it."""
+    match = index.search("Gabriel a mangé 25 %", top_k=3)
+
+    assert not match.confident  # "mangé" is not explained by the hit
+    assert index.search("25 % pour Gabriel").confident
+    assert match.hits[0].document == "25%"
+    assert match.hits[0].metadata["canonical_value"] == "QUARTER"
+    assert all(hit.document not in ("50%", "75%") for hit in match.hits if hit.exact)
+
+
+def test_longest_exact_phrase_wins_and_ngrams_tolerate_misspellings(index):
+    finished = index.search("il a tout fini")
+    misspelled = index.search("trois quart de son assiette")
+
+    assert [hit.document for hit in finished.hits if hit.exact] == ["tout fini"]
+    assert not misspelled.confident
+    assert misspelled.hits[0].document == "trois quarts"
+
+
+def test_conflicting_exact_hits_are_not_confident(index):
+    """Two values for one dimension (or too little of the query explained) need the vectors."""
+    assert not index.search("il a mangé la moitié mais pas tout").confident
+    assert not index.search("mouillé puis sale").confident
+    assert not index.search("il a fait dodo dans la voiture avec sa maman").confident
+    assert not index.search("Gabriel a tout mangé").confident
+    assert index.search("Dodo pour Léa").confident
+
+
+def test_negated_exact_hits_are_not_confident(index):
+    """A negation outside the hit may invert it; inside a lexicon phrase it is part of the meaning."""
+    for query in ("Gabriel n'a pas tout fini", "Léa n'a pas fait la sieste", "jamais de sieste"):
+        match = index.search(query)
+        assert match.negated and not match.confident, query
+
+    negative_phrase = LexicalIndex.from_lexicon({"MEAL_MAIN_CONSUMPTION": {"NOTHING": ["pas touché"]}})
+    match = negative_phrase.search("pas touché")
+    assert match.confident and not match.negated
+
+
+def test_hybrid_answers_exact_hits_without_the_encoder(index):
+    vector = FakeVectorRetriever([])
+    retriever = HybridRAGRetriever(vector, lexical_index=index)
+
+    context = retriever.retrieve_context("Gabriel a tout fini")
+
+    assert context == "RELEVANT KNOWLEDGE (Exact Match):\n- 'tout fini' → MEAL_MAIN_CONSUMPTION: ALL (exact match)"
+    assert vector.queries == []
+
+
+def test_hybrid_fuses_lexical_and_vector_rankings(index):
+    """Entries ranked by both retrievers come first; vector distances are kept.
+
+    "mouillée" is not the phrase "mouillé": only n-grams and vectors find it.
+    """
+    vector = FakeVectorRetriever([
+        ("mouillé et sale", "DIAPER_CHANGE_TYPE", "BOTH", 0.12),
+        ("réveillé", "SLEEP_STATE", "WOKE_UP", 0.40),
+        ("mouillé", "DIAPER_CHANGE_TYPE", "WET", 0.45),
+    ])
+    retriever = HybridRAGRetriever(vector, lexical_index=index)
+
+    lines = retriever.retrieve_context("couche mouillée puis sale", top_k=3).splitlines()
+
+    assert lines[0] == "RELEVANT KNOWLEDGE (Hybrid Match):"
+    assert lines[1:] == [
+        "- 'mouillé et sale' → DIAPER_CHANGE_TYPE: BOTH (dist: 0.12)",
+        "- 'mouillé' → DIAPER_CHANGE_TYPE: WET (dist: 0.45)",
+        "- 'sale' → DIAPER_CHANGE_TYPE: DIRTY (exact match)",
+    ]
+    assert vector.queries == ["couche mouillée puis sale"]
+
+
+def test_lexical_retriever_selected_by_environment(monkeypatch):
+    monkeypatch.setenv("LEXICAL_RAG_MODE", "hybrid")
+    retriever = create_lexical_retriever()
+    assert isinstance(retriever, HybridRAGRetriever)
+    assert retriever.lexical_index.search("sieste terminée").hits[0].document == "sieste terminée"
+    assert retriever.lexicon_path == LEXICON_PATH
+
+    monkeypatch.setenv("LEXICAL_RAG_MODE", "bm25")
+    with pytest.raises(ValueError, match="LEXICAL_RAG_MODE"):
+        create_lexical_retriever()
@@ -0,0 +1,48 @@
+"""Tests for queue-based, sampled logging."""
+import io
+import logging
+
+import pytest
+
+from semantic_normalization.logging_config import configure_logging, stop_logging
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_per_logger_sampling_keeps_warnings(restore_root_logger):
+    """Sampled-out loggers still emit warnings; other loggers are untouched."""
+    stream = io.StringIO()
+    configure_logging(
+        level="INFO",
+        sample_rates={"semantic_normalization.mcp_client": 0.0},
+        stream=stream,
+    )
+    logging.getLogger("semantic_normalization.mcp_client").info("Tool call successful: %s", "ok")
+    logging.getLogger("semantic_normalization.mcp_client").warning("Gateway process %s is down", 1)
+    logging.getLogger("semantic_normalization.normalizer").info("Repaired tool call: %s", ["x"])
+    stop_logging()
+
+    output = stream.getvalue()
+    assert "Tool call successful" not in output
+    assert "Gateway process 1 is down" in output
+    assert "Repaired tool call: ['x']" in output
+
+
+def test_arguments_are_frozen_when_enqueued(restore_root_logger):
+    """A kept record shows its arguments as they were at the call."""
+    stream = io.StringIO()
+    configure_logging(level="INFO", stream=stream)
+    calls = ["process_canonical_fact"]
+    logging.getLogger("semantic_normalization.normalizer").info("Dispatching %s", calls)
+    calls.append("later")
+    stop_logging()
+
+    assert "Dispatching ['process_canonical_fact']" in stream.getvalue()
@@ -0,0 +1,225 @@
+"""Tests for the pooled MCP gateway client."""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import anyio
+import pytest
+
+from semantic_normalization.mcp_client import GatewayProcess, IntentGatewayClient
+
+
+class FakeSession:
+    """Stands in for an MCP ClientSession."""
+
+    def __init__(self, process):
+        self.process = process
+        self.calls = 0
+
+    async def call_tool(self, name, arguments, meta=None):
+        if self.process.crashed:
+            raise anyio.ClosedResourceError()
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        payload = {"success": True, "message": f"gateway {self.process.index}"}
+        return SimpleNamespace(isError=False, content=[SimpleNamespace(text=json.dumps(payload))])
+
+    async def send_ping(self):
+        if self.process.crashed:
+            raise anyio.ClosedResourceError()
+
+
+class FakeProcess(GatewayProcess):
+    """Gateway process without a subprocess."""
+
+    def __init__(self, index):
+        super().__init__(command="python", args=[], index=index)
+        self.crashed = False
+
+    @property
+    def healthy(self):
+        return self.session is not None
+
+    async def start(self):
+        self.crashed = False
+        self.session = FakeSession(self)
+
+    async def stop(self):
+        self.session = None
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    monkeypatch.setattr(IntentGatewayClient, "_create_process", lambda self, index: FakeProcess(index))
+    return IntentGatewayClient(pool_size=3, health_check_interval=None)
+
+
+def test_pool_size_must_be_positive():
+    with pytest.raises(ValueError):
+        IntentGatewayClient(pool_size=0)
+
+
+def test_defaults_to_current_interpreter():
+    assert IntentGatewayClient().python_executable == sys.executable
+
+
+@pytest.mark.asyncio
+async def test_calls_are_balanced_across_processes(fake_client):
+    async with fake_client as client:
+        results = await asyncio.gather(
+            *(client.execute_tool_call("process_canonical_fact", {}) for _ in range(9))
+        )
+
+        assert all(r["success"] for r in results)
+        assert [p.session.calls for p in client.processes] == [3, 3, 3]
+
+
+@pytest.mark.asyncio
+async def test_crashed_process_is_retried_and_restarted(fake_client):
+    async with fake_client as client:
+        crashed = client.processes[0]
+        crashed.crashed = True
+        client._next = len(client.processes) - 1  # Next pick starts at the crashed process
+
+        result = await client.execute_tool_call("process_canonical_fact", {})
+        assert result["success"] is True
+        assert result["message"] != "gateway 0"
+
+        await asyncio.sleep(0)  # Let the scheduled restart run
+        assert crashed.restarts == 1
+        assert crashed.healthy
+
+
+@pytest.mark.asyncio
+async def test_health_check_restarts_unresponsive_process(fake_client):
+    async with fake_client as client:
+        client.processes[2].crashed = True
+
+        assert await client.check_health() == [True, True, False]
+        await asyncio.sleep(0)
+        assert await client.check_health() == [True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_execute_requires_connection():
+    with pytest.raises(RuntimeError, match="not connected"):
+        await IntentGatewayClient().execute_tool_call("health_check", {})
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    importlib.util.find_spec("mcp_intent_gateway") is None,
+    reason="mcp_intent_gateway not installed",
+)
+async def test_real_gateway_pool():
+    async with IntentGatewayClient(pool_size=2, env=dict(os.environ)) as client:
+        results = await asyncio.gather(
+            *(client.execute_tool_call("health_check", {}) for _ in range(4))
+        )
+        tools = await client.list_tools()
+
+    assert all(r["status"] == "ok" for r in results)
+    assert "process_canonical_fact" in [t.name for t in tools.tools]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    importlib.util.find_spec("mcp_intent_gateway") is None,
+    reason="mcp_intent_gateway not installed",
+)
+async def test_in_process_transport_matches_gateway_contract():
+    from semantic_normalization.mcp_client import GatewayToolError
+
+    async with IntentGatewayClient(transport="inprocess") as client:
+        result = await client.execute_tool_call(
+            "process_canonical_fact",
+            {"subjects": ["Gabriel"], "dimension": "MEAL_MAIN_CONSUMPTION", "value": "HALF_EATEN"},
+        )
+        schema = await client.get_tool_schema()
+
+        with pytest.raises(GatewayToolError, match="Unknown tool"):
+            await client.execute_tool_call("nope", {})
+        with pytest.raises(GatewayToolError, match="Error executing tool"):
+            await client.execute_tool_call("process_canonical_fact", {"value": "ALL"})
+
+    assert result["success"] is False
+    assert result["errors"][0]["code"] == "INVALID_VALUE"
+    assert json.loads(json.dumps(result)) == result
+    assert schema[0]["function"]["name"] == "process_canonical_fact"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    importlib.util.find_spec("mcp_intent_gateway") is None,
+    reason="mcp_intent_gateway not installed",
+)
+async def test_trace_context_reaches_gateway(tmp_path):
+    """The traceparent sent in MCP request metadata parents the gateway span."""
+    trace_file = tmp_path / "spans.jsonl"
+    env = {**os.environ, "GATEWAY_TRACE_FILE": str(trace_file)}
+    traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+    async with IntentGatewayClient(env=env, health_check_interval=None) as client:
+        result = await client.execute_tool_call(
+            "process_canonical_fact",
+            {"subjects": ["Gabriel"], "dimension": "SLEEP_STATE", "value": "ASLEEP"},
+            meta={"traceparent": traceparent},
+        )
+
+    spans = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    gateway_span = next(s for s in spans if s["name"] == "process_canonical_fact")
+    assert gateway_span["trace_id"] == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert gateway_span["parent_span_id"] == "00f067aa0ba902b7"
+    assert result["intent_contract"]["metadata"]["trace_id"] == gateway_span["trace_id"]
+
+
+def test_unknown_transport():
+    with pytest.raises(ValueError, match="Unknown transport"):
+        IntentGatewayClient(transport="carrier-pigeon")
+
+
+def _free_port():
+    import socket
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    importlib.util.find_spec("mcp_intent_gateway") is None,
+    reason="mcp_intent_gateway not installed",
+)
+async def test_http_transport_against_network_gateway():
+    import subprocess
+
+    import httpx
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "mcp_intent_gateway.server", "--transport", "streamable-http", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):  # Wait for the listener
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/mcp", timeout=0.2)
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+
+        client = IntentGatewayClient(transport="http", url=f"http://127.0.0.1:{port}/mcp", pool_size=2)
+        async with client:
+            results = await asyncio.gather(
+                *(client.execute_tool_call("health_check", {}) for _ in range(4))
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    assert all(r["status"] == "ok" for r in results)
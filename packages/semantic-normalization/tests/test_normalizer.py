@@ -58,6 +58,23 @@ def test_normalize_meal_consumption(normalizer):
         assert isinstance(rag_context, str)
 
 
+def test_normalize_flattens_strict_schema_facts(normalizer):
+    """Facts nested under `fact` (gateway strict schema) reach the gateway flat."""
+    with patch.object(normalizer.client.chat.completions, 'create') as mock_create:
+        mock_create.return_value = MockResponse([
+            MockToolCall(
+                name="process_canonical_fact",
+                arguments='{"subjects": ["Gabriel"], "fact": {"dimension": "SLEEP_STATE", "value": "ASLEEP"}, "confidence": 1.0}'
+            )
+        ])
+
+        tool_calls, _ = normalizer.normalize("Gabriel dort")
+
+        assert tool_calls[0]["arguments"] == {
+            "subjects": ["Gabriel"], "dimension": "SLEEP_STATE", "value": "ASLEEP", "confidence": 1.0
+        }
+
+
 def test_normalize_no_tool_calls(normalizer):
     """Test handling of response with no tool calls."""
     with patch.object(normalizer.client.chat.completions, 'create') as mock_create:
@@ -104,3 +121,131 @@ async def test_normalize_and_dispatch_success(normalizer):
         assert len(result.tool_calls) == 1
         assert result.tool_calls[0].success is True
         assert result.all_succeeded is True
+
+
+def test_package_import_is_lazy():
+    """Importing the package or CLI must not pull in openai, chromadb or mcp."""
+    import os
+    import subprocess
+    import sys
+
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    code = (
+        "import sys, semantic_normalization.cli, semantic_normalization as sn; "
+        "sn.SemanticNormalizer; "
+        "print(sorted(m for m in ('openai', 'chromadb', 'mcp') if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": src},
+        capture_output=True, text=True, check=True,
+    )
+    assert proc.stdout.strip() == "[]"
+
+
+@pytest.mark.asyncio
+async def test_dispatch_retries_when_gateway_sheds_load(normalizer):
+    """OVERLOADED results are retried after the gateway's retry hint."""
+    from unittest.mock import AsyncMock
+
+    overloaded = {
+        "success": False,
+        "errors": [{"field": "gateway", "code": "OVERLOADED", "message": "busy"}],
+        "retry_after_seconds": 0.0,
+    }
+    mock_client = MagicMock()
+    mock_client.execute_tool_call = AsyncMock(side_effect=[overloaded, {"success": True}])
+    calls = [{"name": "process_canonical_fact", "arguments": {"subjects": ["Gabriel"], "dimension": "SLEEP_STATE", "value": "ASLEEP"}}]
+
+    with patch.object(normalizer, "normalize", return_value=(calls, "")):
+        result = await normalizer.normalize_and_dispatch("Gabriel dort", mock_client)
+
+    assert mock_client.execute_tool_call.await_count == 2
+    assert result.all_succeeded
+
+
+@pytest.mark.asyncio
+async def test_normalize_and_dispatch_reports_timings_and_usage(normalizer):
+    """Per-stage timings and LLM token usage are attached and exported."""
+    from types import SimpleNamespace
+    from unittest.mock import AsyncMock
+    from semantic_normalization.normalizer import render_prometheus
+
+    response = MockResponse([
+        MockToolCall(
+            name="process_canonical_fact",
+            arguments='{"subjects": ["Gabriel"], "dimension": "SLEEP_STATE", "value": "ASLEEP", "confidence": 1.0}'
+        )
+    ])
+    response.usage = SimpleNamespace(
+        prompt_tokens=1200,
+        completion_tokens=40,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=1024),
+    )
+    mock_client = MagicMock()
+    mock_client.execute_tool_call = AsyncMock(return_value={"success": True})
+
+    with patch.object(normalizer.client.chat.completions, "create", return_value=response):
+        result = await normalizer.normalize_and_dispatch("Gabriel dort", mock_client)
+
+    assert result.usage == {"prompt": 1200, "completion": 40, "cached": 1024}
+    assert set(result.timings) == {
+        "warm_up_wait", "lexical_rag", "compatibility_rag", "prompt_build", "llm", "dispatch", "total"
+    }
+    assert result.timings["total"] >= result.timings["llm"]
+    text = render_prometheus()
+    assert 'normalizer_stage_seconds_count{stage="llm"}' in text
+    assert 'normalizer_llm_tokens_total{kind="cached"}' in text
+
+
+@pytest.mark.asyncio
+async def test_normalize_and_dispatch_propagates_trace_context(normalizer, tmp_path):
+    """Each tool call is a child span whose traceparent is sent in the MCP metadata."""
+    import json
+    from unittest.mock import AsyncMock
+    from semantic_normalization.tracing import JsonLinesSpanExporter, set_span_exporter
+
+    trace_file = tmp_path / "spans.jsonl"
+    set_span_exporter(JsonLinesSpanExporter(trace_file))
+    mock_client = MagicMock()
+    mock_client.execute_tool_call = AsyncMock(return_value={"success": True})
+    calls = [{"name": "process_canonical_fact", "arguments": {"subjects": ["Gabriel"], "dimension": "SLEEP_STATE", "value": "ASLEEP"}}]
+
+    try:
+        with patch.object(normalizer, "normalize", return_value=(calls, "")):
+            result = await normalizer.normalize_and_dispatch("Gabriel dort", mock_client)
+    finally:
+        set_span_exporter(None)
+
+    tool_span, root_span = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    meta = mock_client.execute_tool_call.await_args.kwargs["meta"]
+    assert result.trace_id == root_span["trace_id"] == tool_span["trace_id"]
+    assert root_span["name"] == "normalize_and_dispatch"
+    assert tool_span["parent_span_id"] == root_span["span_id"]
+    assert meta == {"traceparent": f"00-{result.trace_id}-{tool_span['span_id']}-01"}
+    assert "dispatch" in root_span["attributes"]["stages_ms"]
+
+
+def test_spans_are_written_off_the_calling_thread(monkeypatch, tmp_path):
+    """export() only queues; the writer thread appends every span before shutdown returns."""
+    import json
+    import threading
+    from semantic_normalization import tracing
+
+    exporter = tracing.JsonLinesSpanExporter(tmp_path / "spans.jsonl")
+    writers = set()
+    original = tracing.json.dumps
+
+    def recording(*args, **kwargs):
+        writers.add(threading.current_thread().name)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(tracing.json, "dumps", recording)
+    for i in range(100):
+        exporter.export(tracing.Span(trace_id="0" * 31 + "1", span_id=f"{i:016x}", name="span"))
+    exporter.shutdown()
+    monkeypatch.undo()
+
+    spans = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert [span["span_id"] for span in spans] == [f"{i:016x}" for i in range(100)]
+    assert writers == {"span-exporter"}
@@ -0,0 +1,59 @@
+"""Tests for CLI profiling."""
+import pstats
+import sys
+import time
+
+from semantic_normalization import cli
+from semantic_normalization.profiling import format_stage_table, profile_run
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_profile_run_writes_pstats_and_folded_stacks(tmp_path):
+    """Both dumps are written; folded stacks end with a sample count."""
+    with profile_run(str(tmp_path / "run")) as files:
+        busy_work(0.1)
+
+    stats = pstats.Stats(files["pstats"])
+    assert any(func[2] == "busy_work" for func in stats.stats)
+    folded = open(files["cpu"], encoding="utf-8").read().splitlines()
+    assert any("busy_work (test_profiling.py:" in line for line in folded)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+
+
+def test_stage_table_lists_stages_in_order():
+    table = format_stage_table({"lexical_rag": 0.02, "llm": 0.06, "total": 0.08}).splitlines()
+
+    assert [line.split()[0] for line in table] == ["stage", "lexical_rag", "llm", "total"]
+    assert table[2].split()[1:] == ["60.00", "75.0%"]
+
+
+def test_cli_profile_option(tmp_path, monkeypatch, capsys):
+    """--profile=PREFIX writes the dumps and prints the per-stage table."""
+
+    class FakeNormalizer:
+        def normalize(self, input_text, timer=None, usage=None):
+            timer.start("lexical_rag")
+            busy_work(0.01)
+            timer.start("llm")
+            busy_work(0.02)
+            timer.stop()
+            return [], "context"
+
+    prefix = tmp_path / "profiles" / "cli"
+    monkeypatch.setattr(sys, "argv", ["cli", f"--profile={prefix}", "Gabriel", "a", "tout", "mangé"])
+    monkeypatch.setattr(cli, "SemanticNormalizer", FakeNormalizer)
+    monkeypatch.setattr(cli, "load_dotenv", lambda: None)
+    monkeypatch.setattr(cli, "configure_logging", lambda: None)
+
+    cli.main()
+
+    out, err = capsys.readouterr()
+    assert "Input: Gabriel a tout mangé" in out
+    assert [line.split()[0] for line in err.splitlines()[1:5]] == ["stage", "lexical_rag", "llm", "total"]
+    assert f"Profile (pstats): {prefix}.pstats" in err
+    assert (tmp_path / "profiles" / "cli.cpu.folded").exists()
@@ -0,0 +1,159 @@
+"""Tests for the HTTP normalization service."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from starlette.testclient import TestClient
+
+from semantic_normalization.service import (
+    NormalizationService,
+    ServiceOverloaded,
+    create_app,
+)
+
+
+class FakeResult:
+    def __init__(self, text):
+        self.text = text
+
+    def to_dict(self, include_context=True):
+        output = {"input": self.text, "tool_calls": [], "all_succeeded": self.text != "refused"}
+        if include_context:
+            output["rag_context"] = "context"
+        return output
+
+
+class FakeNormalizer:
+    def __init__(self, state="ready"):
+        self.state = state
+        self.clients = []
+
+    def warm_up_report(self):
+        return {"state": self.state, "total_seconds": None, "steps": {}}
+
+    def normalize(self, input_text, timer=None, usage=None):
+        return [{"name": "process_canonical_fact", "arguments": {"value": "ALL"}}], "context"
+
+    async def normalize_and_dispatch(self, text, mcp_client):
+        self.clients.append(mcp_client)
+        await asyncio.sleep(0)
+        return FakeResult(text)
+
+
+class FakeGateway:
+    def __init__(self, sessions=(True,)):
+        self.sessions = list(sessions)
+
+    async def check_health(self):
+        return self.sessions
+
+
+def make_client(normalizer, gateway):
+    @asynccontextmanager
+    async def open_service():
+        yield NormalizationService(normalizer, gateway, concurrency=2)
+
+    return TestClient(create_app(open_service))
+
+
+def test_normalize_dispatches_through_the_shared_gateway():
+    """Every request reuses the service's normalizer and gateway client."""
+    normalizer, gateway = FakeNormalizer(), FakeGateway()
+
+    with make_client(normalizer, gateway) as client:
+        first = client.post("/api/normalize", json={"text": "Gabriel a tout mangé"})
+        second = client.post("/api/normalize", json={"text": "Léa dort", "include_context": True})
+        only = client.post("/api/normalize", json={"text": "il a mangé", "dispatch": False})
+        metrics = client.get("/metrics").text
+
+    assert first.status_code == 200
+    assert first.json() == {"input": "Gabriel a tout mangé", "tool_calls": [], "all_succeeded": True}
+    assert second.json()["rag_context"] == "context"
+    assert only.json()["tool_calls"] == [{"name": "process_canonical_fact", "arguments": {"value": "ALL"}}]
+    assert normalizer.clients == [gateway, gateway]
+    assert 'normalizer_service_requests_total{outcome="ok"}' in metrics
+    assert "normalizer_service_request_seconds_count" in metrics
+
+
+def test_invalid_requests_are_rejected():
+    with make_client(FakeNormalizer(), None) as client:
+        assert client.post("/api/normalize", content=b"not json").status_code == 400
+        assert client.post("/api/normalize", json={"text": " "}).status_code == 400
+        response = client.post("/api/normalize", json={"text": "Léa dort"})
+
+    assert response.status_code == 400
+    assert "no gateway" in response.json()["error"]
+
+
+def test_flags_must_be_booleans():
+    """"false" is not false: a string flag must never trigger backend writes."""
+    normalizer = FakeNormalizer()
+
+    with make_client(normalizer, FakeGateway()) as client:
+        as_string = client.post("/api/normalize", json={"text": "Léa dort", "dispatch": "false"})
+        as_object = client.post("/api/normalize", json={"text": "Léa dort", "include_context": {}})
+
+    assert as_string.status_code == as_object.status_code == 400
+    assert '"dispatch"' in as_string.json()["error"]
+    assert normalizer.clients == []
+
+
+def test_upstream_value_errors_are_server_errors():
+    """Malformed LLM arguments or gateway tool errors are not the caller's fault."""
+    import json
+
+    class BrokenNormalizer(FakeNormalizer):
+        async def normalize_and_dispatch(self, text, mcp_client):
+            return json.loads("{not json")
+
+    with make_client(BrokenNormalizer(), FakeGateway()) as client:
+        response = client.post("/api/normalize", json={"text": "Léa dort"})
+        metrics = client.get("/metrics").text
+
+    assert response.status_code == 500
+    assert "JSONDecodeError" in response.json()["error"]
+    assert 'normalizer_service_requests_total{outcome="error"}' in metrics
+
+
+def test_health_reflects_warm_up_and_gateway_sessions():
+    """503 while warming up or when no gateway session answers."""
+    with make_client(FakeNormalizer(state="warming"), FakeGateway()) as client:
+        warming = client.get("/health")
+    with make_client(FakeNormalizer(), FakeGateway(sessions=[False, False])) as client:
+        gateway_down = client.get("/health")
+    with make_client(FakeNormalizer(), FakeGateway(sessions=[False, True])) as client:
+        ok = client.get("/health")
+
+    assert warming.status_code == 503
+    assert warming.json()["warm_up"]["state"] == "warming"
+    assert gateway_down.status_code == 503
+    assert ok.status_code == 200
+    assert ok.json()["status"] == "ok"
+    assert ok.json()["gateway_sessions"] == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_requests_beyond_max_pending_are_refused():
+    """At most `concurrency` run at once; past max_pending, requests are shed."""
+    release = asyncio.Event()
+    running = 0
+
+    class SlowNormalizer(FakeNormalizer):
+        async def normalize_and_dispatch(self, text, mcp_client):
+            nonlocal running
+            running += 1
+            await release.wait()
+            return FakeResult(text)
+
+    service = NormalizationService(SlowNormalizer(), FakeGateway(), concurrency=2, max_pending=3)
+    tasks = [asyncio.create_task(service.process(f"utterance {i}")) for i in range(3)]
+    await asyncio.sleep(0.01)
+
+    assert running == 2
+    with pytest.raises(ServiceOverloaded):
+        await service.process("one too many")
+
+    release.set()
+    results = await asyncio.gather(*tasks)
+    assert [r["input"] for r in results] == ["utterance 0", "utterance 1", "utterance 2"]
+    assert service.pending == 0
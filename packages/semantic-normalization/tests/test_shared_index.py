@@ -0,0 +1,133 @@
+"""Tests for embedding indexes shared across worker processes."""
+import multiprocessing
+
+import pytest
+
+from semantic_normalization.embeddings import HashingEmbeddingBackend
+from semantic_normalization.rag_interface import (
+    COLLECTION_NAME,
+    COMPATIBILITY_COLLECTION_NAME,
+    CompatibilityRAGRetriever,
+    VectorRAGRetriever,
+)
+
+chromadb = pytest.importorskip("chromadb")
+
+from semantic_normalization.shared_index import (  # noqa: E402 (needs numpy, shipped with chromadb)
+    ENV_INDEX_DIR,
+    SharedEmbeddingIndex,
+    publish_shared_indexes,
+)
+
+LEXICON = [
+    ("tout", "MEAL_MAIN_CONSUMPTION", "ALL"),
+    ("la moitié", "MEAL_MAIN_CONSUMPTION", "HALF"),
+    ("rien mangé", "MEAL_MAIN_CONSUMPTION", "NONE"),
+    ("fait dodo", "SLEEP_STATE", "ASLEEP"),
+    ("couche sale", "DIAPER_STATE", "SOILED"),
+]
+
+
+@pytest.fixture
+def vector_store(tmp_path, monkeypatch):
+    """A small store built with the hashing backend, in the layout of the knowledge base."""
+    # Set then delete so monkeypatch restores the original state after publish_shared_indexes sets it
+    monkeypatch.setenv(ENV_INDEX_DIR, "")
+    monkeypatch.delenv(ENV_INDEX_DIR)
+    backend = HashingEmbeddingBackend()
+    client = chromadb.PersistentClient(path=str(tmp_path / "store"))
+    metadata = {"hnsw:space": "cosine", "embedding_space": backend.space}
+    lexicon = client.create_collection(name=COLLECTION_NAME, embedding_function=None, metadata=metadata)
+    documents = [doc for doc, _, _ in LEXICON]
+    lexicon.add(
+        ids=[str(i) for i in range(len(LEXICON))],
+        documents=documents,
+        embeddings=backend.embed(documents),
+        metadatas=[{"dimension": d, "canonical_value": v} for _, d, v in LEXICON],
+    )
+    rules = client.create_collection(
+        name=COMPATIBILITY_COLLECTION_NAME, embedding_function=None, metadata=metadata
+    )
+    rules.add(
+        ids=["r1"],
+        documents=["MEAL_MAIN_CONSUMPTION and SLEEP_STATE are independent"],
+        embeddings=backend.embed(["MEAL_MAIN_CONSUMPTION SLEEP_STATE"]),
+        metadatas=[{"rule_type": "independent"}],
+    )
+    return str(tmp_path / "store"), backend
+
+
+def query_in_worker(directory, queue):
+    """Runs in a spawned process: attach to the index and query it."""
+    index = SharedEmbeddingIndex.load(directory, COLLECTION_NAME)
+    embedding = HashingEmbeddingBackend().embed(["Léa fait dodo"])[0]
+    queue.put((type(index.matrix).__name__, index.matrix.flags.writeable, index.query(embedding, top_k=2)))
+
+
+def test_published_index_matches_the_vector_store(vector_store, tmp_path, monkeypatch):
+    """Same neighbours and distances as Chroma (no ties in the top 2), without opening the store."""
+    db_path, backend = vector_store
+    from_store = VectorRAGRetriever(db_path=db_path, embedding_backend=backend)
+    expected = [from_store.retrieve_context(q, top_k=2) for q in ("il a tout mangé", "couche sale")]
+
+    directory = publish_shared_indexes(db_path, str(tmp_path / "shared"), backend)
+    assert directory == str(tmp_path / "shared")
+    monkeypatch.setenv(ENV_INDEX_DIR, directory)
+
+    from semantic_normalization import rag_interface
+
+    def no_store(*args, **kwargs):
+        raise AssertionError("the vector store must not be opened")
+
+    monkeypatch.setattr(rag_interface, "open_collection", no_store)
+    shared = VectorRAGRetriever(db_path=db_path, embedding_backend=backend)
+    assert [shared.retrieve_context(q, top_k=2) for q in ("il a tout mangé", "couche sale")] == expected
+
+    rules = CompatibilityRAGRetriever(db_path=db_path, embedding_backend=backend)
+    assert rules.retrieve_context("MEAL_MAIN_CONSUMPTION SLEEP_STATE", top_k=1) == (
+        "SEMANTIC COMPATIBILITY RULES (AUTHORITATIVE):\n"
+        "- [INDEPENDENT] MEAL_MAIN_CONSUMPTION and SLEEP_STATE are independent"
+    )
+
+
+def test_spawned_worker_attaches_read_only(vector_store, tmp_path):
+    db_path, backend = vector_store
+    directory = publish_shared_indexes(db_path, str(tmp_path / "shared"), backend)
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    worker = context.Process(target=query_in_worker, args=(directory, queue))
+    worker.start()
+    matrix_type, writeable, (metadatas, documents, distances) = queue.get(timeout=60)
+    worker.join(timeout=10)
+
+    assert matrix_type == "memmap"
+    assert not writeable
+    assert documents[0] == "fait dodo"
+    assert metadatas[0] == {"dimension": "SLEEP_STATE", "canonical_value": "ASLEEP"}
+    assert distances[0] <= distances[1]
+
+
+def test_index_from_another_space_falls_back_to_the_store(vector_store, tmp_path, monkeypatch):
+    db_path, backend = vector_store
+    monkeypatch.setenv(ENV_INDEX_DIR, publish_shared_indexes(db_path, str(tmp_path / "shared"), backend))
+
+    other = HashingEmbeddingBackend(dimension=64)
+    retriever = VectorRAGRetriever(db_path=db_path, embedding_backend=other)
+
+    # Neither the shared index nor the store match the backend's space
+    assert retriever.retrieve_context("dodo") == "WARNING: Knowledge base not initialized."
+    assert retriever._index is None
+
+
+def test_compatibility_errors_from_the_shared_index_are_reported(vector_store, tmp_path, monkeypatch):
+    db_path, backend = vector_store
+    monkeypatch.setenv(ENV_INDEX_DIR, publish_shared_indexes(db_path, str(tmp_path / "shared"), backend))
+    rules = CompatibilityRAGRetriever(db_path=db_path, embedding_backend=backend)
+    rules._init_client()
+
+    def broken(*args, **kwargs):
+        raise ValueError("corrupt index")
+
+    monkeypatch.setattr(rules._index, "query", broken)
+    assert rules.retrieve_context("SLEEP_STATE") == "Error gathering compatibility rules: corrupt index"
@@ -1,4 +1,6 @@
 """Tests for tool_schema module."""
+import importlib.util
+
 import pytest
 from semantic_normalization.tool_schema import (
     mcp_to_openai_tool,
@@ -32,22 +34,40 @@ def test_mcp_to_openai_tool():
 
 
 def test_get_fallback_schema():
-    """Test fallback schema structure."""
+    """The fallback is the strict schema: one enum-constrained variant per dimension."""
+    from semantic_normalization.dimensions import DIMENSION_VALUES
+
     schema = get_fallback_schema()
 
     assert isinstance(schema, list)
     assert len(schema) == 1
     assert schema[0]["type"] == "function"
     assert schema[0]["function"]["name"] == "process_canonical_fact"
-    assert "parameters" in schema[0]["function"]
+    assert schema[0]["function"]["strict"] is True
 
-    # Check required properties
     params = schema[0]["function"]["parameters"]
-    assert "subjects" in params["properties"]
-    assert "dimension" in params["properties"]
-    assert "value" in params["properties"]
-    assert "confidence" in params["properties"]
-    assert params["required"] == ["subjects", "dimension", "value"]
+    assert params["required"] == ["subjects", "fact", "confidence"]
+    assert params["additionalProperties"] is False
+    variants = params["properties"]["fact"]["anyOf"]
+    assert {v["properties"]["dimension"]["enum"][0]: v["properties"]["value"]["enum"] for v in variants} == (
+        DIMENSION_VALUES
+    )
+    assert all(v["required"] == ["dimension", "value"] and v["additionalProperties"] is False for v in variants)
+    assert "default" not in str(params)
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("mcp_intent_gateway") is None,
+    reason="mcp_intent_gateway not installed",
+)
+def test_fallback_schema_matches_the_gateway():
+    """Apart from per-dimension descriptions, the fallback is the gateway's generated schema."""
+    from mcp_intent_gateway.domain.tool_schema import build_openai_tool_schema
+
+    generated = build_openai_tool_schema()
+    for variant in generated[0]["function"]["parameters"]["properties"]["fact"]["anyOf"]:
+        del variant["description"]
+    assert get_fallback_schema() == generated
 
 
 def test_clear_cache():
@@ -62,3 +82,92 @@ def test_clear_cache():
     # Clear cache
     clear_cache()
     assert tool_schema._CACHED_SCHEMA is None
+
+
+class FakeGateway:
+    """Counts gateway round trips; the schema hash can be changed."""
+
+    def __init__(self, schema_hash="hash-1", description="Process a canonical fact"):
+        self.schema_hash = schema_hash
+        self.description = description
+        self.list_tools_calls = 0
+        self.hash_calls = 0
+
+    async def execute_tool_call(self, name, arguments):
+        if name != "get_schema_hash":
+            raise ValueError(f"Unknown tool: {name}")  # Gateway without a generated schema
+        self.hash_calls += 1
+        return {"schema_hash": self.schema_hash}
+
+    async def list_tools(self):
+        from types import SimpleNamespace
+
+        self.list_tools_calls += 1
+        tool = SimpleNamespace(
+            name="process_canonical_fact",
+            description=self.description,
+            inputSchema={"type": "object", "properties": {}},
+        )
+        return SimpleNamespace(tools=[tool])
+
+
+@pytest.mark.asyncio
+async def test_schema_is_persisted_and_used_on_cold_start():
+    from semantic_normalization import tool_schema
+
+    gateway = FakeGateway()
+    first = await tool_schema.fetch_tool_schema_from_gateway(gateway)
+    assert gateway.list_tools_calls == 1
+    assert tool_schema.load_cached_schema() == ("hash-1", first)
+
+    # New process: served from disk, list_tools is not called again
+    clear_cache()
+    second = await tool_schema.fetch_tool_schema_from_gateway(gateway)
+    assert second == first
+    await tool_schema._REVALIDATION
+    assert gateway.list_tools_calls == 1
+    assert gateway.hash_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_schema_change_is_picked_up_in_background():
+    from semantic_normalization import tool_schema
+
+    await tool_schema.fetch_tool_schema_from_gateway(FakeGateway())
+    clear_cache()
+
+    changed = FakeGateway(schema_hash="hash-2", description="New description")
+    schema = await tool_schema.fetch_tool_schema_from_gateway(changed)
+    assert schema[0]["function"]["description"] == "Process a canonical fact"  # Disk copy
+
+    await tool_schema._REVALIDATION
+    assert schema[0]["function"]["description"] == "New description"  # Updated in place
+    assert tool_schema.load_cached_schema()[0] == "hash-2"
+
+
+def test_cache_from_other_version_is_ignored(tmp_path):
+    import json
+    from semantic_normalization import tool_schema
+
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps({"version": 0, "schema_hash": "x", "tools": []}))
+    assert tool_schema.load_cached_schema(path) is None
+    assert tool_schema.load_cached_schema(tmp_path / "missing.json") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    importlib.util.find_spec("mcp_intent_gateway") is None,
+    reason="mcp_intent_gateway not installed",
+)
+async def test_gateway_schema_constrains_values_per_dimension():
+    from semantic_normalization.mcp_client import IntentGatewayClient
+
+    async with IntentGatewayClient(transport="inprocess") as client:
+        schema = await client.get_tool_schema()
+
+    function = schema[0]["function"]
+    variants = function["parameters"]["properties"]["fact"]["anyOf"]
+    sleep = next(v for v in variants if v["properties"]["dimension"]["enum"] == ["SLEEP_STATE"])
+    assert function["strict"] is True
+    assert "ALL" not in sleep["properties"]["value"]["enum"]
@@ -0,0 +1,128 @@
+"""Tests for local tool call validation and repair."""
+import importlib.util
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from semantic_normalization.dimensions import DIMENSION_VALUES
+from semantic_normalization.normalizer import SemanticNormalizer
+from semantic_normalization.validation import (
+    ToolCallValidator,
+    canonicalize,
+    edit_distance,
+)
+
+TABLE = {
+    "MEAL_MAIN_CONSUMPTION": ["NOTHING", "QUARTER", "HALF", "THREE_QUARTERS", "ALL"],
+    "MEAL_TYPE": ["BREAKFAST", "LUNCH", "SNACK", "DINNER"],
+    "SLEEP_STATE": ["ASLEEP", "WOKE_UP", "RESTING", "REFUSED_SLEEP"],
+}
+
+
+@pytest.fixture
+def validator():
+    return ToolCallValidator(TABLE)
+
+
+def fact(dimension, value, confidence=1.0):
+    return {"subjects": ["Gabriel"], "dimension": dimension, "value": value, "confidence": confidence}
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("mcp_intent_gateway") is None,
+    reason="mcp_intent_gateway not installed",
+)
+def test_shared_table_matches_the_gateway():
+    from mcp_intent_gateway.domain.constants import DIMENSION_VALUES as GATEWAY_VALUES
+
+    assert DIMENSION_VALUES == {dimension.value: values for dimension, values in GATEWAY_VALUES.items()}
+
+
+def test_default_table_is_the_gateway_table():
+    validator = ToolCallValidator()
+
+    assert validator.enabled
+    assert validator.repair(fact("HEALTH_STATUS", "runny nose")).arguments["value"] == "RUNNY_NOSE"
+
+
+def test_valid_call_is_unchanged(validator):
+    result = validator.repair(fact("SLEEP_STATE", "ASLEEP", 0.9))
+
+    assert result.valid
+    assert result.arguments == fact("SLEEP_STATE", "ASLEEP", 0.9)
+    assert result.repairs == []
+
+
+def test_case_and_whitespace_are_normalized_without_penalty(validator):
+    result = validator.repair(fact(" meal main-consumption ", "all", 0.9))
+
+    assert result.valid
+    assert result.arguments["dimension"] == "MEAL_MAIN_CONSUMPTION"
+    assert result.arguments["value"] == "ALL"
+    assert result.arguments["confidence"] == 0.9
+
+
+def test_synonym_with_penalty(validator):
+    result = validator.repair(fact("MEAL_MAIN_CONSUMPTION", "HALF_EATEN", 0.9))
+
+    assert result.valid
+    assert result.arguments["value"] == "HALF"
+    assert result.arguments["confidence"] == pytest.approx(0.85)
+    assert "synonym" in result.repairs[0]
+
+
+def test_nearest_value_by_edit_distance(validator):
+    result = validator.repair(fact("SLEEP_STATE", "WOKEUP"))
+
+    assert result.valid
+    assert result.arguments["value"] == "WOKE_UP"
+    assert result.arguments["confidence"] == pytest.approx(0.9)
+
+
+def test_dimension_is_repaired_before_value(validator):
+    result = validator.repair(fact("sleep", "sleeping"))
+
+    assert result.valid
+    assert (result.arguments["dimension"], result.arguments["value"]) == ("SLEEP_STATE", "ASLEEP")
+
+
+def test_still_invalid_is_rejected(validator):
+    assert not validator.repair(fact("MEAL_TYPE", "ALL")).valid
+    assert not validator.repair(fact("WEATHER", "SUNNY")).valid
+    assert not validator.repair(fact("SLEEP_STATE", None)).valid
+
+
+def test_no_symptom_is_invented():
+    """Vague health reports are dropped, never mapped to a specific symptom."""
+    validator = ToolCallValidator()
+
+    assert not validator.repair(fact("HEALTH_STATUS", "SICK")).valid
+    assert not validator.repair(fact("HEALTH_STATUS", "TEMPERATURE")).valid
+
+
+def test_helpers():
+    assert canonicalize("  three quarters ") == "THREE_QUARTERS"
+    assert edit_distance("KITTEN", "SITTING") == 3
+    assert edit_distance("", "ABC") == 3
+
+
+@pytest.mark.asyncio
+async def test_dispatch_repairs_and_drops_locally():
+    """Validation applies with the default (free-string fallback) tool schema."""
+    normalizer = SemanticNormalizer(api_key="sk-test-dummy-key-for-testing")
+    calls = [
+        {"name": "process_canonical_fact", "arguments": fact("MEAL_MAIN_CONSUMPTION", "half eaten")},
+        {"name": "process_canonical_fact", "arguments": fact("MEAL_TYPE", "PIZZA")},
+    ]
+    mock_client = MagicMock()
+    mock_client.execute_tool_call = AsyncMock(return_value={"success": True})
+
+    with patch.object(normalizer, "normalize", return_value=(calls, "")):
+        result = await normalizer.normalize_and_dispatch("Gabriel a mangé la moitié", mock_client)
+
+    mock_client.execute_tool_call.assert_awaited_once()
+    dispatched = mock_client.execute_tool_call.await_args.args[1]
+    assert dispatched["value"] == "HALF"
+    assert result.tool_calls[0].success and result.tool_calls[0].repairs
+    assert result.tool_calls[1].error.startswith("Dropped before dispatch")
+    assert not result.all_succeeded
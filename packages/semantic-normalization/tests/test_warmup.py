@@ -0,0 +1,109 @@
+"""Tests for background warm-up and readiness."""
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from semantic_normalization.normalizer import SemanticNormalizer
+from semantic_normalization.warmup import WarmUp, WarmUpState
+
+
+def test_warm_up_runs_steps_and_reports_timings():
+    calls = []
+    warm_up = WarmUp([("a", lambda: calls.append("a")), ("b", lambda: calls.append("b"))])
+
+    assert warm_up.state == WarmUpState.PENDING
+    assert warm_up.wait() is True  # Not started: nothing to wait for
+
+    warm_up.start()
+    assert warm_up.wait(timeout=5)
+
+    report = warm_up.report()
+    assert calls == ["a", "b"]
+    assert report["state"] == "ready"
+    assert report["steps"]["a"]["seconds"] is not None
+    assert report["steps"]["b"]["error"] is None
+
+
+def test_warm_up_failed_step_is_degraded():
+    def boom():
+        raise RuntimeError("model missing")
+
+    warm_up = WarmUp([("model", boom), ("index", lambda: None)]).start()
+    assert warm_up.wait(timeout=5)
+
+    assert warm_up.state == WarmUpState.DEGRADED
+    assert warm_up.report()["steps"]["model"]["error"] == "model missing"
+    assert warm_up.report()["steps"]["index"]["seconds"] is not None
+
+
+@pytest.mark.asyncio
+async def test_ready_waits_for_background_thread():
+    release = threading.Event()
+    warm_up = WarmUp([("slow", lambda: release.wait(5))]).start()
+
+    assert await warm_up.ready(timeout=0.05) is False
+    release.set()
+    assert await warm_up.ready(timeout=5) is True
+    assert warm_up.is_ready
+
+
+@pytest.mark.asyncio
+async def test_normalizer_early_request_waits_for_warm_up(monkeypatch):
+    release = threading.Event()
+    rag = MagicMock()
+    rag.warm_up.side_effect = lambda queries: release.wait(5)
+    rag.retrieve_context.return_value = "RAG"
+
+    monkeypatch.setattr(SemanticNormalizer, "_warm_up_openai", lambda self: None)  # No network
+    normalizer = SemanticNormalizer(
+        api_key="sk-test-dummy-key-for-testing",
+        rag_retriever=rag,
+        compatibility_rag_retriever=MagicMock(),
+        warm_up=True,
+    )
+
+    assert await normalizer.ready(timeout=0.05) is False
+    release.set()
+    assert await normalizer.ready(timeout=5) is True
+
+    report = normalizer.warm_up_report()
+    assert report["state"] == "ready"
+    assert set(report["steps"]) == {
+        "embedding_model", "lexical_rag", "compatibility_rag", "openai_connection"
+    }
+    rag.warm_up.assert_called_once()
+
+
+def test_concurrent_first_queries_wait_for_the_store(monkeypatch, tmp_path):
+    """Queries arriving while the store opens get results, not "not initialized"."""
+    from semantic_normalization import rag_interface
+
+    opening = threading.Event()
+    release = threading.Event()
+    collection = MagicMock()
+    collection.query.return_value = {
+        "metadatas": [[{"dimension": "SLEEP_STATE", "canonical_value": "ASLEEP"}]],
+        "documents": [["fait dodo"]],
+        "distances": [[0.1]],
+    }
+
+    def slow_open(*args):
+        opening.set()
+        release.wait(5)
+        return collection
+
+    monkeypatch.setattr(rag_interface, "open_collection", slow_open)
+    retriever = rag_interface.VectorRAGRetriever(db_path=str(tmp_path))
+    results = []
+    first = threading.Thread(target=lambda: results.append(retriever.retrieve_context("dodo")))
+    second = threading.Thread(target=lambda: results.append(retriever.retrieve_context("dodo")))
+    first.start()
+    assert opening.wait(5)
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert len(results) == 2
+    assert all("fait dodo" in result for result in results)